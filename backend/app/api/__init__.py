@@ -1,6 +1,14 @@
-from .auth import router as auth_router
-from .sessions import router as sessions_router
+from .auth import async_router as async_auth_router, router as auth_router
+from .sessions import async_router as async_sessions_router, router as sessions_router
 from .admin import router as admin_router
-from .report import router as report_router
+from .report import async_router as async_report_router, router as report_router
 
-__all__ = ["auth_router", "sessions_router", "admin_router", "report_router"]
+__all__ = [
+    "auth_router",
+    "sessions_router",
+    "admin_router",
+    "report_router",
+    "async_auth_router",
+    "async_sessions_router",
+    "async_report_router",
+]
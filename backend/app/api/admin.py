@@ -5,16 +5,20 @@ import datetime as dt
 import io
 from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session as DBSession, joinedload
 
 from typing import Any, cast
 
+from ..core.db import write_transaction
 from ..core.deps import get_current_user, get_db, require_roles
 from ..core.exceptions import ErrorMessages
+from ..core.pagination import keyset_page
+from ..core.principal import Principal, principal_cache
 from ..core.security import get_password_hash
-from ..models.db import CasinoBalanceAdjustment, ChipOp, ChipPurchase, Seat, Session, Table, User
+from ..core.write_coordinator import write_coordinator
+from ..models.db import CasinoBalanceAdjustment, ChipPurchase, CreditLedgerEntry, Seat, Session, Table, User
 from ..models.schemas import (
     CasinoBalanceAdjustmentIn,
     CasinoBalanceAdjustmentOut,
@@ -22,13 +26,19 @@ from ..models.schemas import (
     CloseCreditIn,
     CloseCreditOut,
     ClosedSessionOut,
+    CreditLedgerEntryOut,
+    OpenDebtOut,
+    OpenDebtsOut,
+    PlayerDebtOut,
     TableCreateIn,
     TableOut,
     UserCreateIn,
     UserOut,
     UserUpdateIn,
 )
+from ..services.credit_ledger_service import CreditLedgerService
 from ..services.credit_service import CreditService
+from ..services.daily_summary_service import DailySummaryService
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -57,7 +67,7 @@ def _ascii_filename_component(name: str) -> str:
     return "".join(out)
 
 
-def _resolve_table_id_for_user(user: User, table_id: int | None = None) -> int:
+def _resolve_table_id_for_user(user: Principal, table_id: int | None = None) -> int:
     """
     Resolve the table_id to use based on user role and permissions.
     
@@ -94,7 +104,7 @@ def _resolve_table_id_for_user(user: User, table_id: int | None = None) -> int:
 @router.get("/tables", response_model=list[TableOut])
 def list_tables(
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     role = cast(str, user.role)
 
@@ -115,13 +125,14 @@ def create_table(payload: TableCreateIn, db: DBSession = Depends(get_db)) -> Tab
     if not name:
         raise HTTPException(status_code=400, detail="Table name is required")
 
-    existing = db.query(Table).filter(Table.name == name).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Table name already exists")
+    with write_transaction(db):
+        existing = db.query(Table).filter(Table.name == name).first()
+        if existing:
+            raise HTTPException(status_code=400, detail="Table name already exists")
+
+        t = Table(name=name, seats_count=payload.seats_count)
+        db.add(t)
 
-    t = Table(name=name, seats_count=payload.seats_count)
-    db.add(t)
-    db.commit()
     db.refresh(t)
     return TableOut.model_validate(t)
 
@@ -132,15 +143,22 @@ def list_users(db: DBSession = Depends(get_db)) -> list[UserOut]:
     return [UserOut.model_validate(u) for u in users]
 
 
-def _replace_existing_table_admin(db: DBSession, table_id: int, exclude_user_id: int | None = None):
-    """Remove table assignment from existing table_admin and assign to new user."""
+def _replace_existing_table_admin(db: DBSession, table_id: int, exclude_user_id: int | None = None) -> int | None:
+    """
+    Remove table assignment from existing table_admin and assign to new user.
+
+    Returns the ID of the table_admin it was removed from, whose cached principal
+    the caller invalidates once the change is committed.
+    """
     q = db.query(User).filter(User.role == "table_admin", User.table_id == table_id)
     if exclude_user_id is not None:
         q = q.filter(User.id != exclude_user_id)
     existing_admin = q.first()
-    if existing_admin:
-        # Remove table assignment from existing table_admin
-        existing_admin.table_id = None
+    if not existing_admin:
+        return None
+    # Remove table assignment from existing table_admin
+    existing_admin.table_id = None
+    return int(cast(int, existing_admin.id))
 
 
 @router.post("/users", response_model=UserOut, dependencies=[Depends(require_roles("superadmin"))])
@@ -149,136 +167,182 @@ def create_user(payload: UserCreateIn, db: DBSession = Depends(get_db)) -> UserO
     if not username:
         raise HTTPException(status_code=400, detail="Username is required")
 
-    if db.query(User).filter(User.username == username).first():
-        raise HTTPException(status_code=400, detail="Username already exists")
-
-    if payload.role == "table_admin":
-        # table_admin requires table_id
-        if payload.table_id is None:
-            raise HTTPException(status_code=400, detail="table_id is required for table_admin role")
-        if not db.query(Table).filter(Table.id == payload.table_id).first():
-            raise HTTPException(status_code=404, detail="Table not found")
-        _replace_existing_table_admin(db, payload.table_id)
-    elif payload.role == "dealer":
-        # dealer is not associated with tables, will be assigned to sessions
-        if payload.table_id is not None:
-            raise HTTPException(status_code=400, detail="dealer role should not have table_id")
-    elif payload.role == "waiter" and payload.table_id is not None:
-        # waiter can optionally have a table_id, validate it if provided
-        if not db.query(Table).filter(Table.id == payload.table_id).first():
-            raise HTTPException(status_code=404, detail="Table not found")
-
-    # hourly_rate is only applicable for dealer and waiter roles
-    hourly_rate = payload.hourly_rate if payload.role in ("dealer", "waiter") else None
-
-    u = User(
-        username=username,
-        password_hash=get_password_hash(payload.password),
-        role=payload.role,
-        table_id=payload.table_id if payload.role == "table_admin" else None,
-        is_active=payload.is_active,
-        hourly_rate=hourly_rate,
-    )
-    db.add(u)
-    db.commit()
+    # Hashing is slow on purpose: done before taking the write slot
+    password_hash = get_password_hash(payload.password)
+
+    replaced_admin_id = None
+    with write_transaction(db):
+        if db.query(User).filter(User.username == username).first():
+            raise HTTPException(status_code=400, detail="Username already exists")
+
+        if payload.role == "table_admin":
+            # table_admin requires table_id
+            if payload.table_id is None:
+                raise HTTPException(status_code=400, detail="table_id is required for table_admin role")
+            if not db.query(Table).filter(Table.id == payload.table_id).first():
+                raise HTTPException(status_code=404, detail="Table not found")
+            replaced_admin_id = _replace_existing_table_admin(db, payload.table_id)
+        elif payload.role == "dealer":
+            # dealer is not associated with tables, will be assigned to sessions
+            if payload.table_id is not None:
+                raise HTTPException(status_code=400, detail="dealer role should not have table_id")
+        elif payload.role == "waiter" and payload.table_id is not None:
+            # waiter can optionally have a table_id, validate it if provided
+            if not db.query(Table).filter(Table.id == payload.table_id).first():
+                raise HTTPException(status_code=404, detail="Table not found")
+
+        # hourly_rate is only applicable for dealer and waiter roles
+        hourly_rate = payload.hourly_rate if payload.role in ("dealer", "waiter") else None
+
+        u = User(
+            username=username,
+            password_hash=password_hash,
+            role=payload.role,
+            table_id=payload.table_id if payload.role == "table_admin" else None,
+            is_active=payload.is_active,
+            hourly_rate=hourly_rate,
+        )
+        db.add(u)
+
+    if replaced_admin_id is not None:
+        principal_cache.invalidate(replaced_admin_id)
     db.refresh(u)
     return UserOut.model_validate(u)
 
 
 @router.put("/users/{user_id}", response_model=UserOut, dependencies=[Depends(require_roles("superadmin"))])
 def update_user(user_id: int, payload: UserUpdateIn, db: DBSession = Depends(get_db)) -> UserOut:
-    u = db.query(User).filter(User.id == user_id).first()
-    if not u:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    if payload.role is not None:
-        u.role = cast(Any, str(payload.role))
-
-    if payload.table_id is not None:
-        u.table_id = cast(Any, payload.table_id)
-
-    if payload.is_active is not None:
-        u.is_active = cast(Any, payload.is_active)
-
-    if payload.password is not None:
-        u.password_hash = cast(Any, get_password_hash(payload.password))
-
-    if payload.hourly_rate is not None:
-        u.hourly_rate = cast(Any, payload.hourly_rate)
-
-    u_role = cast(str, u.role)
-
-    if u_role == "superadmin":
-        u.table_id = cast(Any, None)
-        u.hourly_rate = cast(Any, None)  # hourly_rate not applicable for superadmin
-    elif u_role == "dealer":
-        # dealer is not associated with tables, will be assigned to sessions
-        u.table_id = cast(Any, None)
-    elif u_role == "table_admin":
-        # table_admin requires table_id
-        if u.table_id is None:
-            raise HTTPException(status_code=400, detail="table_id is required for table_admin role")
-        if not db.query(Table).filter(Table.id == u.table_id).first():
-            raise HTTPException(status_code=404, detail="Table not found")
-        _replace_existing_table_admin(
-            db,
-            table_id=int(cast(int, u.table_id)),
-            exclude_user_id=int(cast(int, u.id)),
-        )
-        u.hourly_rate = cast(Any, None)  # hourly_rate not applicable for table_admin
-    elif u_role == "waiter":
-        # waiter can optionally have a table_id, validate it if provided
-        if u.table_id is not None:
+    # Hashing is slow on purpose: done before taking the write slot
+    password_hash = get_password_hash(payload.password) if payload.password is not None else None
+
+    replaced_admin_id = None
+    with write_transaction(db):
+        u = db.query(User).filter(User.id == user_id).first()
+        if not u:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        if payload.role is not None:
+            u.role = cast(Any, str(payload.role))
+
+        if payload.table_id is not None:
+            u.table_id = cast(Any, payload.table_id)
+
+        if payload.is_active is not None:
+            u.is_active = cast(Any, payload.is_active)
+
+        if password_hash is not None:
+            u.password_hash = cast(Any, password_hash)
+
+        if payload.hourly_rate is not None:
+            u.hourly_rate = cast(Any, payload.hourly_rate)
+
+        u_role = cast(str, u.role)
+
+        if u_role == "superadmin":
+            u.table_id = cast(Any, None)
+            u.hourly_rate = cast(Any, None)  # hourly_rate not applicable for superadmin
+        elif u_role == "dealer":
+            # dealer is not associated with tables, will be assigned to sessions
+            u.table_id = cast(Any, None)
+        elif u_role == "table_admin":
+            # table_admin requires table_id
+            if u.table_id is None:
+                raise HTTPException(status_code=400, detail="table_id is required for table_admin role")
             if not db.query(Table).filter(Table.id == u.table_id).first():
                 raise HTTPException(status_code=404, detail="Table not found")
-
-    db.commit()
+            replaced_admin_id = _replace_existing_table_admin(
+                db,
+                table_id=int(cast(int, u.table_id)),
+                exclude_user_id=int(cast(int, u.id)),
+            )
+            u.hourly_rate = cast(Any, None)  # hourly_rate not applicable for table_admin
+        elif u_role == "waiter":
+            # waiter can optionally have a table_id, validate it if provided
+            if u.table_id is not None:
+                if not db.query(Table).filter(Table.id == u.table_id).first():
+                    raise HTTPException(status_code=404, detail="Table not found")
+
+    # After the commit: requests that loaded the old rows cannot cache them again
+    principal_cache.invalidate(user_id)
+    if replaced_admin_id is not None:
+        principal_cache.invalidate(replaced_admin_id)
     db.refresh(u)
     return UserOut.model_validate(u)
 
 
+@router.get("/db-write-stats", dependencies=[Depends(require_roles("superadmin"))])
+def get_db_write_stats() -> dict[str, Any]:
+    """Queue depth and wait times of the in-process write coordinator."""
+    return write_coordinator.stats()
+
+
 @router.get(
     "/chip-purchases",
     response_model=list[ChipPurchaseOut],
     dependencies=[Depends(require_roles("superadmin"))],
 )
 def list_chip_purchases(
+    response: Response,
     limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
+    table_id: int | None = Query(default=None),
+    session_id: str | None = Query(default=None),
+    seat_no: int | None = Query(default=None),
+    payment_type: str | None = Query(default=None, pattern="^(cash|credit)$"),
+    created_by_user_id: int | None = Query(default=None),
+    created_from: dt.datetime | None = Query(default=None),
+    created_to: dt.datetime | None = Query(default=None),
     db: DBSession = Depends(get_db),
 ):
-    rows = (
-        db.query(ChipPurchase)
-        .options(joinedload(ChipPurchase.table), joinedload(ChipPurchase.created_by))
-        .order_by(ChipPurchase.id.desc())
-        .limit(limit)
-        .all()
+    """List chip purchases, newest first, one keyset page at a time."""
+    query = (
+        db.query(
+            ChipPurchase.id,
+            ChipPurchase.table_id,
+            Table.name,
+            ChipPurchase.session_id,
+            ChipPurchase.seat_no,
+            ChipPurchase.amount,
+            ChipPurchase.created_at,
+            ChipPurchase.created_by_user_id,
+            User.username,
+            ChipPurchase.payment_type,
+        )
+        .outerjoin(Table, Table.id == ChipPurchase.table_id)
+        .outerjoin(User, User.id == ChipPurchase.created_by_user_id)
     )
-
-    out: list[ChipPurchaseOut] = []
-    for p in rows:
-        table_name = ""
-        if p.table is not None:
-            table_name = cast(str, p.table.name)
-
-        created_by_username = None
-        if p.created_by is not None:
-            created_by_username = cast(str, p.created_by.username)
-
-        out.append(
-            ChipPurchaseOut(
-                id=int(cast(int, p.id)),
-                table_id=int(cast(int, p.table_id)),
-                table_name=table_name,
-                session_id=str(cast(str, p.session_id)) if p.session_id is not None else None,
-                seat_no=int(cast(int, p.seat_no)),
-                amount=int(cast(int, p.amount)),
-                created_at=cast(dt.datetime, p.created_at),
-                created_by_user_id=int(cast(int, p.created_by_user_id)) if p.created_by_user_id is not None else None,
-                created_by_username=created_by_username,
-            )
+    if table_id is not None:
+        query = query.filter(ChipPurchase.table_id == table_id)
+    if session_id is not None:
+        query = query.filter(ChipPurchase.session_id == session_id)
+    if seat_no is not None:
+        query = query.filter(ChipPurchase.seat_no == seat_no)
+    if payment_type is not None:
+        query = query.filter(ChipPurchase.payment_type == payment_type)
+    if created_by_user_id is not None:
+        query = query.filter(ChipPurchase.created_by_user_id == created_by_user_id)
+    if created_from is not None:
+        query = query.filter(ChipPurchase.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(ChipPurchase.created_at < created_to)
+
+    rows = keyset_page(query, ChipPurchase.created_at, ChipPurchase.id, cursor, limit, response)
+
+    return [
+        ChipPurchaseOut(
+            id=int(row.id),
+            table_id=int(row.table_id),
+            table_name=row.name or "",
+            session_id=str(row.session_id) if row.session_id is not None else None,
+            seat_no=int(row.seat_no),
+            amount=int(row.amount),
+            created_at=row.created_at,
+            created_by_user_id=int(row.created_by_user_id) if row.created_by_user_id is not None else None,
+            created_by_username=row.username,
+            payment_type=row.payment_type or "cash",
         )
-
-    return out
+        for row in rows
+    ]
 
 
 @router.post(
@@ -289,19 +353,20 @@ def list_chip_purchases(
 def create_balance_adjustment(
     payload: CasinoBalanceAdjustmentIn,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> CasinoBalanceAdjustmentOut:
     """Create a new casino balance adjustment (profit or expense)."""
     if payload.amount == 0:
         raise HTTPException(status_code=400, detail="Amount cannot be zero")
     
-    adjustment = CasinoBalanceAdjustment(
-        amount=payload.amount,
-        comment=payload.comment.strip(),
-        created_by_user_id=current_user.id,
-    )
-    db.add(adjustment)
-    db.commit()
+    with write_transaction(db):
+        adjustment = CasinoBalanceAdjustment(
+            amount=payload.amount,
+            comment=payload.comment.strip(),
+            created_by_user_id=current_user.id,
+        )
+        db.add(adjustment)
+
     db.refresh(adjustment)
     
     return CasinoBalanceAdjustmentOut(
@@ -320,36 +385,53 @@ def create_balance_adjustment(
     dependencies=[Depends(require_roles("superadmin"))],
 )
 def list_balance_adjustments(
+    response: Response,
     limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
+    created_by_user_id: int | None = Query(default=None),
+    created_from: dt.datetime | None = Query(default=None),
+    created_to: dt.datetime | None = Query(default=None),
     db: DBSession = Depends(get_db),
 ):
-    """List recent balance adjustments."""
-    adjustments = (
-        db.query(CasinoBalanceAdjustment)
-        .options(joinedload(CasinoBalanceAdjustment.created_by))
-        .order_by(CasinoBalanceAdjustment.created_at.desc())
-        .limit(limit)
-        .all()
+    """List balance adjustments, newest first, one keyset page at a time."""
+    query = (
+        db.query(
+            CasinoBalanceAdjustment.id,
+            CasinoBalanceAdjustment.created_at,
+            CasinoBalanceAdjustment.amount,
+            CasinoBalanceAdjustment.comment,
+            CasinoBalanceAdjustment.created_by_user_id,
+            User.username,
+        )
+        .outerjoin(User, User.id == CasinoBalanceAdjustment.created_by_user_id)
     )
-    
-    out: list[CasinoBalanceAdjustmentOut] = []
-    for adj in adjustments:
-        created_by_username = None
-        if adj.created_by is not None:
-            created_by_username = cast(str, adj.created_by.username)
-        
-        out.append(
-            CasinoBalanceAdjustmentOut(
-                id=int(cast(int, adj.id)),
-                created_at=cast(dt.datetime, adj.created_at),
-                amount=int(cast(int, adj.amount)),
-                comment=cast(str, adj.comment),
-                created_by_user_id=int(cast(int, adj.created_by_user_id)),
-                created_by_username=created_by_username,
-            )
+    if created_by_user_id is not None:
+        query = query.filter(CasinoBalanceAdjustment.created_by_user_id == created_by_user_id)
+    if created_from is not None:
+        query = query.filter(CasinoBalanceAdjustment.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(CasinoBalanceAdjustment.created_at < created_to)
+
+    rows = keyset_page(
+        query,
+        CasinoBalanceAdjustment.created_at,
+        CasinoBalanceAdjustment.id,
+        cursor,
+        limit,
+        response,
+    )
+
+    return [
+        CasinoBalanceAdjustmentOut(
+            id=int(row.id),
+            created_at=row.created_at,
+            amount=int(row.amount),
+            comment=row.comment,
+            created_by_user_id=int(row.created_by_user_id),
+            created_by_username=row.username,
         )
-    
-    return out
+        for row in rows
+    ]
 
 
 def _get_working_day_boundaries(date: dt.date) -> tuple[dt.datetime, dt.datetime]:
@@ -374,7 +456,7 @@ def export_day(
     table_id: int | None = Query(default=None),
     format: str = Query(default="tsv", pattern="^(tsv|csv)$"),
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     try:
         d = dt.date.fromisoformat(date)
@@ -468,14 +550,20 @@ def export_day(
     dependencies=[Depends(require_roles("superadmin", "table_admin"))],
 )
 def list_closed_sessions(
+    response: Response,
     table_id: int | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
+    created_from: dt.datetime | None = Query(default=None),
+    created_to: dt.datetime | None = Query(default=None),
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     """
-    Get closed sessions with credit information per player.
+    Get closed sessions with credit information per player, newest first.
     For table_admin: returns sessions for their assigned table only.
     For superadmin: returns sessions for specified table_id.
+    Pages are bounded by `limit`; follow the X-Next-Cursor header for older sessions.
     """
     tid = _resolve_table_id_for_user(user, table_id)
     
@@ -484,65 +572,30 @@ def list_closed_sessions(
     if not table:
         raise HTTPException(status_code=404, detail=ErrorMessages.TABLE_NOT_FOUND)
     
-    # Get closed sessions, sorted by created_at descending
-    sessions = (
+    # Get one page of closed sessions, sorted by created_at descending
+    query = (
         db.query(Session)
         .options(joinedload(Session.dealer), joinedload(Session.waiter))
         .filter(Session.table_id == tid, Session.status == "closed")
-        .order_by(Session.created_at.desc())
-        .all()
     )
+    if created_from is not None:
+        query = query.filter(Session.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(Session.created_at < created_to)
+    sessions = keyset_page(query, Session.created_at, Session.id, cursor, limit, response)
     
     if not sessions:
         return []
     
-    # Batch load all related data to avoid N+1 queries
-    session_ids = [s.id for s in sessions]
-    
-    # Load all seats for all sessions at once
-    all_seats = (
-        db.query(Seat)
-        .filter(Seat.session_id.in_(session_ids))
-        .all()
-    )
-    seats_by_session: dict[str, dict[int, Seat]] = {}
-    for seat in all_seats:
-        sid = cast(str, seat.session_id)
-        if sid not in seats_by_session:
-            seats_by_session[sid] = {}
-        seats_by_session[sid][int(cast(int, seat.seat_no))] = seat
-    
-    # Load all credit purchases for all sessions at once
-    all_credit_purchases = (
-        db.query(ChipPurchase)
-        .filter(
-            ChipPurchase.session_id.in_(session_ids),
-            ChipPurchase.payment_type == "credit",
-            ChipPurchase.amount > 0,
-        )
-        .all()
-    )
-    credit_by_session: dict[str, dict[int, int]] = {}
-    for cp in all_credit_purchases:
-        sid = cast(str, cp.session_id)
-        seat_no = int(cast(int, cp.seat_no))
-        amount = int(cast(int, cp.amount))
-        if sid not in credit_by_session:
-            credit_by_session[sid] = {}
-        credit_by_session[sid][seat_no] = credit_by_session[sid].get(seat_no, 0) + amount
-    
-    # Load all chip ops for all sessions at once
-    all_chip_ops = (
-        db.query(ChipOp)
-        .filter(ChipOp.session_id.in_(session_ids))
-        .all()
-    )
-    chip_ops_by_session: dict[str, list[ChipOp]] = {}
-    for op in all_chip_ops:
-        sid = cast(str, op.session_id)
-        if sid not in chip_ops_by_session:
-            chip_ops_by_session[sid] = []
-        chip_ops_by_session[sid].append(op)
+    # Outstanding credit per seat from the credit ledger, only for sessions that still have credit
+    credit_session_ids = [cast(str, s.id) for s in sessions if s.buyin_credit]
+    credits_by_session: dict[str, list[dict]] = {}
+    for balance in CreditLedgerService.get_open_balances(db, credit_session_ids):
+        credits_by_session.setdefault(cast(str, balance.session_id), []).append({
+            "seat_no": int(cast(int, balance.seat_no)),
+            "player_name": balance.player_name or None,
+            "amount": int(cast(int, balance.balance)),
+        })
     
     # Build response
     out: list[ClosedSessionOut] = []
@@ -556,25 +609,12 @@ def list_closed_sessions(
         if s.waiter is not None:
             waiter_username = cast(str, s.waiter.username)
         
-        # Get seats for this session
-        seat_info = seats_by_session.get(cast(str, s.id), {})
-        
-        # Build credits list with player names
-        credits = []
-        credit_by_seat = credit_by_session.get(cast(str, s.id), {})
-        for seat_no, amount in sorted(credit_by_seat.items()):
-            seat = seat_info.get(seat_no)
-            player_name = seat.player_name if seat and seat.player_name else None
-            credits.append({
-                "seat_no": seat_no,
-                "player_name": player_name,
-                "amount": amount
-            })
+        # Credits list with player names
+        credits = credits_by_session.get(cast(str, s.id), [])
         
-        # Calculate totals
-        chip_ops = chip_ops_by_session.get(cast(str, s.id), [])
-        total_buyins = sum(int(cast(int, op.amount)) for op in chip_ops if op.amount > 0)
-        total_cashouts = sum(int(cast(int, op.amount)) for op in chip_ops if op.amount < 0)
+        # Totals come from the running chip totals kept on the session
+        total_buyins = int(cast(int, s.total_buyins))
+        total_cashouts = -int(cast(int, s.total_cashouts))
         total_rake = total_buyins + total_cashouts  # cashouts are negative, so this gives the rake
         
         out.append(
@@ -608,77 +648,140 @@ def list_closed_sessions(
 def close_player_credit(
     payload: CloseCreditIn,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Close player credit by creating a balance adjustment and removing the credit from the session.
     """
-    # Verify session exists and is closed
-    session = db.query(Session).filter(Session.id == payload.session_id).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    if session.status != "closed":
-        raise HTTPException(status_code=400, detail="Can only close credit for closed sessions")
-    
-    # Check table access
-    role = cast(str, current_user.role)
-    if role == "table_admin":
-        if current_user.table_id is None:
-            raise HTTPException(status_code=403, detail="No table assigned")
-        if int(cast(int, session.table_id)) != int(cast(int, current_user.table_id)):
-            raise HTTPException(status_code=403, detail="Forbidden for this table")
-    
-    # Verify seat exists
-    seat = (
-        db.query(Seat)
-        .filter(Seat.session_id == payload.session_id, Seat.seat_no == payload.seat_no)
-        .first()
-    )
-    if not seat:
-        raise HTTPException(status_code=404, detail="Seat not found")
-    
-    # Get player name for the comment
-    player_name = seat.player_name if seat.player_name else f"Seat {payload.seat_no}"
-    
-    # Calculate total credit for this seat
-    credit_purchases = CreditService.get_credit_purchases_for_seat(
-        db, payload.session_id, payload.seat_no
-    )
-    total_credit = CreditService.calculate_total_credit(credit_purchases)
-    
-    if total_credit == 0:
-        raise HTTPException(status_code=400, detail="No credit found for this player")
-    
-    if payload.amount > total_credit:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Amount exceeds available credit. Available: {total_credit}, Requested: {payload.amount}"
-        )
-    
-    # Close the credit using the service
-    CreditService.close_credit(db, session, seat, payload.amount, current_user)
-    
-    # Get the adjustment that was just created
-    table = db.query(Table).filter(Table.id == session.table_id).first()
-    table_name = table.name if table else "Unknown"
-    session_date = session.date.strftime("%d.%m.%Y") if session.date else ""
-    
-    adjustment = (
-        db.query(CasinoBalanceAdjustment)
-        .filter(
-            CasinoBalanceAdjustment.comment == f"Долг ({player_name}) - {table_name} - {session_date}",
-            CasinoBalanceAdjustment.amount == payload.amount,
-            CasinoBalanceAdjustment.created_by_user_id == current_user.id,
+    with write_transaction(db):
+        # Verify session exists and is closed (row locked, as on the session write paths:
+        # the credit check below must still hold at commit)
+        session = db.query(Session).filter(Session.id == payload.session_id).with_for_update().first()
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        if session.status != "closed":
+            raise HTTPException(status_code=400, detail="Can only close credit for closed sessions")
+
+        # Check table access
+        role = cast(str, current_user.role)
+        if role == "table_admin":
+            if current_user.table_id is None:
+                raise HTTPException(status_code=403, detail="No table assigned")
+            if int(cast(int, session.table_id)) != int(cast(int, current_user.table_id)):
+                raise HTTPException(status_code=403, detail="Forbidden for this table")
+
+        # Verify seat exists
+        seat = (
+            db.query(Seat)
+            .filter(Seat.session_id == payload.session_id, Seat.seat_no == payload.seat_no)
+            .with_for_update()
+            .first()
         )
-        .order_by(CasinoBalanceAdjustment.id.desc())
-        .first()
-    )
-    
-    db.commit()
+        if not seat:
+            raise HTTPException(status_code=404, detail="Seat not found")
+
+        # Get player name for the comment
+        player_name = seat.player_name if seat.player_name else f"Seat {payload.seat_no}"
+
+        # Outstanding credit of this seat
+        total_credit = CreditLedgerService.get_balance(db, payload.session_id, payload.seat_no)
+
+        if total_credit == 0:
+            raise HTTPException(status_code=400, detail="No credit found for this player")
+
+        if payload.amount > total_credit:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Amount exceeds available credit. Available: {total_credit}, Requested: {payload.amount}"
+            )
+
+        # Close the credit using the service
+        totals_before = DailySummaryService.snapshot(session)
+        adjustment = CreditService.close_credit(db, session, seat, payload.amount, current_user)
+        DailySummaryService.record_session_change(db, session, totals_before)
+        adjustment_id = int(cast(int, adjustment.id))
     
     return CloseCreditOut(
         success=True,
         message=f"Successfully closed {payload.amount} credit for {player_name}",
-        adjustment_id=int(cast(int, adjustment.id)) if adjustment else None,
+        adjustment_id=adjustment_id,
     )
+
+
+@router.get(
+    "/credit/open-debts",
+    response_model=OpenDebtsOut,
+    dependencies=[Depends(require_roles("superadmin", "table_admin"))],
+)
+def list_open_debts(
+    table_id: int | None = Query(default=None),
+    player_name: str | None = Query(default=None),
+    limit: int = Query(default=500, ge=1, le=5000),
+    db: DBSession = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    """
+    List outstanding player credit across sessions, with totals per player.
+    For table_admin: debts of their assigned table only.
+    For superadmin: debts of all tables, or of table_id if given.
+    Totals cover all matching debts; the debts list is bounded by `limit`.
+    """
+    if cast(str, user.role) == "table_admin":
+        table_id = _resolve_table_id_for_user(user, table_id)
+
+    count, total = CreditLedgerService.open_debt_totals(db, table_id, player_name)
+    players = CreditLedgerService.open_debts_by_player(db, table_id, player_name)
+    debts = CreditLedgerService.list_open_debts(db, table_id, player_name, limit)
+
+    return OpenDebtsOut(
+        count=count,
+        total=total,
+        players=[PlayerDebtOut(player_name=name, count=n, amount=amount) for name, n, amount in players],
+        debts=[
+            OpenDebtOut(
+                session_id=cast(str, balance.session_id),
+                session_date=session_date,
+                table_id=int(cast(int, balance.table_id)),
+                table_name=table_name or "",
+                seat_no=int(cast(int, balance.seat_no)),
+                player_name=balance.player_name,
+                amount=int(cast(int, balance.balance)),
+                updated_at=cast(dt.datetime, balance.updated_at),
+            )
+            for balance, session_date, table_name in debts
+        ],
+    )
+
+
+@router.get(
+    "/credit/ledger",
+    response_model=list[CreditLedgerEntryOut],
+    dependencies=[Depends(require_roles("superadmin"))],
+)
+def list_credit_ledger(
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
+    table_id: int | None = Query(default=None),
+    session_id: str | None = Query(default=None),
+    seat_no: int | None = Query(default=None),
+    player_name: str | None = Query(default=None),
+    entry_type: str | None = Query(default=None, pattern="^(debit|repayment|reversal)$"),
+    db: DBSession = Depends(get_db),
+):
+    """List credit ledger entries, newest first, one keyset page at a time."""
+    query = db.query(CreditLedgerEntry)
+    if table_id is not None:
+        query = query.filter(CreditLedgerEntry.table_id == table_id)
+    if session_id is not None:
+        query = query.filter(CreditLedgerEntry.session_id == session_id)
+    if seat_no is not None:
+        query = query.filter(CreditLedgerEntry.seat_no == seat_no)
+    if player_name is not None:
+        query = query.filter(CreditLedgerEntry.player_name == player_name)
+    if entry_type is not None:
+        query = query.filter(CreditLedgerEntry.entry_type == entry_type)
+
+    rows = keyset_page(query, CreditLedgerEntry.created_at, CreditLedgerEntry.id, cursor, limit, response)
+    return [CreditLedgerEntryOut.model_validate(row) for row in rows]
@@ -3,10 +3,23 @@ from __future__ import annotations
 from typing import Any, cast
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..core.deps import get_current_user, get_db
-from ..core.security import create_access_token, verify_password
+from ..core.db import async_write_transaction, write_transaction
+from ..core.deps import (
+    get_async_db,
+    get_current_user,
+    get_current_user_async,
+    get_db,
+    require_roles,
+    require_roles_async,
+)
+from ..core.hashing_pool import hashing_pool
+from ..core.principal import Principal
+from ..core.security import create_access_token, verify_and_update_password
 from ..models.db import User
 from ..models.schemas import LoginIn, LoginOut, UserOut
 
@@ -28,18 +41,35 @@ def _as_int_or_none(v: Any) -> int | None:
 
 
 @router.post("/login", response_model=LoginOut)
-def login(payload: LoginIn, db: Session = Depends(get_db)) -> LoginOut:
-    user = db.query(User).filter(User.username == payload.username.strip()).first()
-
+async def login(payload: LoginIn, db: Session = Depends(get_db)) -> LoginOut:
+    # Only the hashing goes to the dedicated pool; DB work stays in the regular threadpool
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.username == payload.username.strip()).first()
+    )
 
     # user.is_active для Pylance = Column[bool], поэтому приводим к bool
     if (user is None) or (not _as_bool(user.is_active)):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     password_hash = _as_str(user.password_hash)
-    if not verify_password(payload.password, password_hash):
+    valid, new_hash = await hashing_pool.run(verify_and_update_password, payload.password, password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    if new_hash is not None:
+        # Hash cost changed since this password was stored: upgrade it transparently
+        await run_in_threadpool(_upgrade_password_hash, db, user, new_hash)
+
+    return _login_out(user)
+
+
+def _upgrade_password_hash(db: Session, user: User, new_hash: str) -> None:
+    with write_transaction(db):
+        user.password_hash = cast(Any, new_hash)
+    db.refresh(user)
+
+
+def _login_out(user: User) -> LoginOut:
     token = create_access_token(
         subject=str(_as_int_or_none(user.id) or 0),
         role=_as_str(user.role),
@@ -48,6 +78,48 @@ def login(payload: LoginIn, db: Session = Depends(get_db)) -> LoginOut:
     return LoginOut(access_token=token, user=UserOut.model_validate(user))
 
 
+@router.get("/hash-stats", dependencies=[Depends(require_roles("superadmin"))])
+def get_hash_stats() -> dict[str, Any]:
+    """Concurrency and queue metrics of the login password hashing pool."""
+    return hashing_pool.stats()
+
+
 @router.get("/me", response_model=UserOut)
-def me(user: User = Depends(get_current_user)) -> UserOut:
+def me(user: Principal = Depends(get_current_user)) -> UserOut:
+    return UserOut.model_validate(user)
+
+
+# Async handlers (DB_ASYNC), mounted instead of the ones above
+async_router = APIRouter(prefix="/api/auth", tags=["auth"])
+
+
+@async_router.post("/login", response_model=LoginOut)
+async def login_async(payload: LoginIn, db: AsyncSession = Depends(get_async_db)) -> LoginOut:
+    user = (
+        await db.execute(select(User).where(User.username == payload.username.strip()).limit(1))
+    ).scalars().first()
+
+    if (user is None) or (not _as_bool(user.is_active)):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    password_hash = _as_str(user.password_hash)
+    valid, new_hash = await hashing_pool.run(verify_and_update_password, payload.password, password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    if new_hash is not None:
+        async with async_write_transaction(db):
+            user.password_hash = cast(Any, new_hash)
+        await db.refresh(user)
+
+    return _login_out(user)
+
+
+@async_router.get("/hash-stats", dependencies=[Depends(require_roles_async("superadmin"))])
+async def get_hash_stats_async() -> dict[str, Any]:
+    return hashing_pool.stats()
+
+
+@async_router.get("/me", response_model=UserOut)
+async def me_async(user: Principal = Depends(get_current_user_async)) -> UserOut:
     return UserOut.model_validate(user)
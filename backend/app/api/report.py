@@ -9,20 +9,51 @@ Includes:
 from __future__ import annotations
 
 import datetime as dt
-import io
-from typing import Any, cast
+import logging
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, cast
 from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from openpyxl import Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DBSession, joinedload
-from sqlalchemy import func
+from sqlalchemy import case, func
+
+from ..core.constants import (
+    DATE_FORMAT_DISPLAY,
+    MAX_REPORT_RANGE_DAYS,
+    MEDIA_TYPE_XLSX,
+    XLSX_SPOOL_MAX_BYTES,
+    XLSX_STREAM_CHUNK_BYTES,
+)
+from ..core.datetime_utils import working_day_of
+from ..core.db import async_write_transaction, write_transaction
+from ..core.deps import (
+    get_async_db,
+    get_current_user,
+    get_current_user_async,
+    get_db,
+    require_roles,
+    require_roles_async,
+)
+from ..core.metrics import XLSX_GENERATION_SECONDS, XLSX_ROWS
+from ..core.principal import Principal
+from ..models.db import CasinoBalanceAdjustment, ChipPurchase, DailySummary, Seat, Session, Table, User
+from ..services.daily_summary_service import DailySummaryService
+from ..services.report_cache import ReportCache, report_cache
+from ..services.report_service import AdjustmentTotals, ChipTotals, ReportService
+from ..services.staff_hours_service import StaffHours, StaffHoursService
 
-from ..core.deps import get_current_user, get_db, require_roles
-from ..models.db import CasinoBalanceAdjustment, ChipPurchase, Seat, Session, Table, User, ChipOp
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -129,47 +160,29 @@ def get_day_summary(
 
     # Get working day boundaries (20:00 to 18:00 next day)
     start_time, end_time = _get_working_day_boundaries(d)
-    
-    # DIAGNOSTIC LOGGING
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.info(f"=== DAY SUMMARY DIAGNOSTICS FOR {date} ===")
-    logger.info(f"Working day boundaries: {start_time.isoformat()} to {end_time.isoformat()}")
 
-    # Fetch sessions for the working day
+    # Chip and adjustment totals of the day, summed in SQL
+    chips = ReportService.chip_totals(db, d)
+    adjustments = ReportService.adjustment_totals(db, d)
+
+    # Sessions are still needed for staff hours (open sessions count up to now)
     sessions = (
         db.query(Session)
-        .options(joinedload(Session.dealer), joinedload(Session.waiter))
         .filter(Session.created_at >= start_time, Session.created_at < end_time)
         .order_by(Session.table_id.asc(), Session.created_at.asc())
         .all()
     )
 
-    session_ids = [cast(str, s.id) for s in sessions]
-
-    # Fetch seats for all sessions
-    seats_by_session: dict[str, list[Seat]] = {}
-    if session_ids:
-        seats = (
-            db.query(Seat)
-            .filter(Seat.session_id.in_(session_ids))
-            .all()
-        )
-        for seat in seats:
-            sid = cast(str, seat.session_id)
-            seats_by_session.setdefault(sid, []).append(seat)
-
-    # Fetch all chip purchases for the date
-    purchases = (
-        db.query(ChipPurchase)
-        .filter(ChipPurchase.session_id.in_(session_ids))
-        .all()
-    ) if session_ids else []
-
     # Fetch balance adjustments for the working day
     balance_adjustments = (
-        db.query(CasinoBalanceAdjustment)
-        .options(joinedload(CasinoBalanceAdjustment.created_by))
+        db.query(
+            CasinoBalanceAdjustment.id,
+            CasinoBalanceAdjustment.created_at,
+            CasinoBalanceAdjustment.amount,
+            CasinoBalanceAdjustment.comment,
+            User.username,
+        )
+        .outerjoin(User, User.id == CasinoBalanceAdjustment.created_by_user_id)
         .filter(CasinoBalanceAdjustment.created_at >= start_time, CasinoBalanceAdjustment.created_at < end_time)
         .order_by(CasinoBalanceAdjustment.created_at.asc())
         .all()
@@ -178,56 +191,32 @@ def get_day_summary(
     # Fetch all staff
     staff = db.query(User).filter(User.role.in_(["dealer", "waiter"])).all()
 
-    # Calculate totals
-    total_chip_income_cash = 0  # Cash buyins (positive only)
-    total_chip_cashout = 0  # Cash cashouts (absolute value, negative amounts)
-    total_chip_income_credit = 0  # Credit buyins (expenses)
-    total_balance_adjustments_profit = 0  # Positive adjustments
-    total_balance_adjustments_expense = 0  # Negative adjustments (absolute value)
-
-    for p in purchases:
-        amount = int(cast(int, p.amount))
-        if amount > 0:  # Buyin
-            if p.payment_type == "credit":
-                total_chip_income_credit += amount
-            else:
-                total_chip_income_cash += amount
-        elif amount < 0:  # Cashout (negative amount = expense)
-            # Cashouts are always cash payments back to players
-            total_chip_cashout += abs(amount)  # Track cashouts separately
-
-    # Process balance adjustments
-    balance_adjustments_list = []
-    for adj in balance_adjustments:
-        amount = int(cast(int, adj.amount))
-        created_by_username = cast(str, adj.created_by.username) if adj.created_by else "—"
-        
-        adjustment_data = {
-            "id": int(cast(int, adj.id)),
-            "created_at": cast(dt.datetime, adj.created_at).isoformat(),
-            "amount": amount,
-            "comment": cast(str, adj.comment),
-            "created_by_username": created_by_username,
+    total_chip_income_cash = chips.buyin_cash  # Cash buyins (positive only)
+    total_chip_cashout = chips.cashout  # Cash cashouts (absolute value)
+    total_chip_income_credit = chips.buyin_credit  # Credit buyins (expenses)
+    total_balance_adjustments_profit = adjustments.profit  # Positive adjustments
+    total_balance_adjustments_expense = adjustments.expense  # Negative adjustments (absolute value)
+
+    balance_adjustments_list = [
+        {
+            "id": int(adj_id),
+            "created_at": created_at.isoformat(),
+            "amount": int(amount),
+            "comment": comment,
+            "created_by_username": username or "—",
         }
-        balance_adjustments_list.append(adjustment_data)
-        
-        if amount > 0:
-            total_balance_adjustments_profit += amount
-        else:
-            total_balance_adjustments_expense += abs(amount)
+        for adj_id, created_at, amount, comment, username in balance_adjustments
+    ]
 
     # Calculate staff salary
+    staff_hours = StaffHoursService.calculate(sessions)
     total_salary = 0
     staff_details = []
     for person in staff:
         role = cast(str, person.role)
         hourly_rate = int(cast(int, person.hourly_rate)) if person.hourly_rate else 0
 
-        if role == "dealer":
-            hours = _calculate_dealer_hours(sessions, int(cast(int, person.id)))
-        else:
-            hours = _calculate_waiter_hours(sessions, int(cast(int, person.id)))
-
+        hours = staff_hours.hours(int(cast(int, person.id)), role)
         salary = round(hours * hourly_rate)
         if hours > 0:
             staff_details.append({
@@ -239,38 +228,36 @@ def get_day_summary(
             })
         total_salary += salary
 
-    # Calculate net per-seat totals
-    total_player_balance = 0
-    for sid, seats in seats_by_session.items():
-        for seat in seats:
-            total_player_balance += int(cast(int, seat.total))
+    # Net per-seat totals
+    total_player_balance = chips.player_balance
 
     # Casino result
     casino_result = total_chip_income_cash - total_player_balance - total_salary - total_chip_income_credit + total_balance_adjustments_profit - total_balance_adjustments_expense
     
-    # DIAGNOSTIC LOGGING
-    logger.info(f"--- CALCULATION COMPONENTS ---")
-    logger.info(f"total_chip_income_cash (cash buyins): {total_chip_income_cash}")
-    logger.info(f"total_player_balance (chips players have): {total_player_balance}")
-    logger.info(f"total_salary: {total_salary}")
-    logger.info(f"total_chip_income_credit (credit buyins): {total_chip_income_credit}")
-    logger.info(f"total_balance_adjustments_profit: {total_balance_adjustments_profit}")
-    logger.info(f"total_balance_adjustments_expense: {total_balance_adjustments_expense}")
-    logger.info(f"--- FORMULA ---")
-    logger.info(f"casino_result = {total_chip_income_cash} - {total_player_balance} - {total_salary} - {total_chip_income_credit} + {total_balance_adjustments_profit} - {total_balance_adjustments_expense}")
-    logger.info(f"casino_result = {casino_result}")
-    logger.info(f"--- BALANCE ADJUSTMENTS DETAIL ---")
-    for adj in balance_adjustments_list:
-        logger.info(f"  ID {adj['id']}: {adj['comment']} = {adj['amount']} ₪ (by {adj['created_by_username']})")
-    logger.info(f"--- SESSIONS DETAIL ---")
-    for s in sessions:
-        sid = cast(str, s.id)
-        seats = seats_by_session.get(sid, [])
-        session_balance = sum(int(cast(int, seat.total)) for seat in seats)
-        logger.info(f"  Session {sid} (Table {s.table_id}, {s.status}): player_balance = {session_balance}")
-    logger.info(f"=== END DIAGNOSTICS ===")
-
-    open_sessions = len([s for s in sessions if s.status == "open"])
+    # DIAGNOSTIC LOGGING (DEBUG only: the tables detail costs an extra query)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"=== DAY SUMMARY DIAGNOSTICS FOR {date} ===")
+        logger.debug(f"Working day boundaries: {start_time.isoformat()} to {end_time.isoformat()}")
+        logger.debug(f"--- CALCULATION COMPONENTS ---")
+        logger.debug(f"total_chip_income_cash (cash buyins): {total_chip_income_cash}")
+        logger.debug(f"total_player_balance (chips players have): {total_player_balance}")
+        logger.debug(f"total_salary: {total_salary}")
+        logger.debug(f"total_chip_income_credit (credit buyins): {total_chip_income_credit}")
+        logger.debug(f"total_balance_adjustments_profit: {total_balance_adjustments_profit}")
+        logger.debug(f"total_balance_adjustments_expense: {total_balance_adjustments_expense}")
+        logger.debug(f"--- FORMULA ---")
+        logger.debug(f"casino_result = {total_chip_income_cash} - {total_player_balance} - {total_salary} - {total_chip_income_credit} + {total_balance_adjustments_profit} - {total_balance_adjustments_expense}")
+        logger.debug(f"casino_result = {casino_result}")
+        logger.debug(f"--- BALANCE ADJUSTMENTS DETAIL ---")
+        for adj in balance_adjustments_list:
+            logger.debug(f"  ID {adj['id']}: {adj['comment']} = {adj['amount']} ₪ (by {adj['created_by_username']})")
+        logger.debug(f"--- TABLES DETAIL ---")
+        for table_id, table_chips in ReportService.chip_totals_by_table(db, d).items():
+            logger.debug(
+                f"  Table {table_id}: sessions = {table_chips.sessions_count} ({table_chips.open_sessions} open), "
+                f"player_balance = {table_chips.player_balance}"
+            )
+        logger.debug(f"=== END DIAGNOSTICS ===")
 
     return {
         "date": date,
@@ -287,14 +274,48 @@ def get_day_summary(
         "result": casino_result,
         "info": {
             "player_balance": total_player_balance,
-            "total_sessions": len(sessions),
-            "open_sessions": open_sessions,
+            "total_sessions": chips.sessions_count,
+            "open_sessions": chips.open_sessions,
         },
         "staff": staff_details,
         "balance_adjustments": balance_adjustments_list,
     }
 
 
+@router.post("/day-summary/rebuild")
+def rebuild_day_summary(
+    date: str = Query(..., description="Date in YYYY-MM-DD format"),
+    db: DBSession = Depends(get_db),
+    current_user: Any = Depends(require_roles("superadmin")),
+):
+    """Recompute the materialized daily summary of a working day from raw rows."""
+    try:
+        d = dt.date.fromisoformat(date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+    with write_transaction(db):
+        summaries = DailySummaryService.rebuild_day(db, d)
+        # Built before the commit expires the rows
+        out = {
+            "date": date,
+            "tables": [
+                {
+                    "table_id": int(cast(int, row.table_id)),
+                    "sessions_count": int(cast(int, row.sessions_count)),
+                    "open_sessions": int(cast(int, row.open_sessions)),
+                    "buyin_cash": int(cast(int, row.buyin_cash)),
+                    "buyin_credit": int(cast(int, row.buyin_credit)),
+                    "cashout": int(cast(int, row.cashout)),
+                    "player_balance": int(cast(int, row.player_balance)),
+                }
+                for row in summaries
+            ],
+        }
+
+    return out
+
+
 # Style constants
 HEADER_FONT = Font(bold=True, color="FFFFFF")
 HEADER_FILL = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
@@ -311,90 +332,91 @@ THIN_BORDER = Border(
 )
 
 
-def _style_header(ws, row: int, cols: int):
-    """Apply header styling to a row."""
-    for col in range(1, cols + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.font = HEADER_FONT
-        cell.fill = HEADER_FILL
-        cell.alignment = Alignment(horizontal="center", vertical="center")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+
+
+def _cell(
+    ws: WriteOnlyWorksheet,
+    value: Any,
+    font: Font | None = None,
+    fill: PatternFill | None = None,
+) -> Cell:
+    """Create a styled cell for a write-only worksheet row."""
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    return cell
+
+
+def _money_cell(ws: WriteOnlyWorksheet, amount: int, font: Font | None = None) -> Cell:
+    """Create an amount cell colored green for positive and red for negative values."""
+    if amount > 0:
+        fill = MONEY_POSITIVE_FILL
+    elif amount < 0:
+        fill = MONEY_NEGATIVE_FILL
+    else:
+        fill = None
+    return _cell(ws, amount, font=font, fill=fill)
+
+
+def _header_row(ws: WriteOnlyWorksheet, headers: list[str]) -> list[Cell]:
+    """Create a row of styled header cells."""
+    row = []
+    for h in headers:
+        cell = _cell(ws, h, font=HEADER_FONT, fill=HEADER_FILL)
+        cell.alignment = HEADER_ALIGNMENT
         cell.border = THIN_BORDER
+        row.append(cell)
+    return row
 
 
-def _auto_width(ws):
-    """Auto-adjust column widths with better minimum width for readability."""
-    for column_cells in ws.columns:
-        max_length = 0
-        column = column_cells[0].column_letter
-        for cell in column_cells:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        # Increased minimum width from (max_length + 2) to (max_length + 4) for better fit
-        # Also increased maximum from 50 to 60 for longer text fields
-        adjusted_width = min(max_length + 4, 60)
-        # Ensure minimum width of 12 for very short columns
-        adjusted_width = max(adjusted_width, 12)
-        ws.column_dimensions[column].width = adjusted_width
-
-
-def _calculate_waiter_hours(
-    sessions: list[Session],
-    waiter_id: int,
-) -> float:
-    """
-    Calculate waiter working hours accounting for overlapping sessions.
-    Waiters can work on multiple sessions at a time, so we need to merge
-    overlapping time intervals.
+def _write_sheet(
+    wb: Workbook,
+    title: str,
+    rows: Callable[[WriteOnlyWorksheet], Iterable[list[Any]]],
+) -> int:
     """
-    intervals: list[tuple[dt.datetime, dt.datetime]] = []
+    Write a sheet of a write-only workbook with auto-adjusted column widths.
 
-    for s in sessions:
-        if s.waiter_id != waiter_id:
-            continue
-        start = cast(dt.datetime, s.created_at)
-        end = cast(dt.datetime, s.closed_at) if s.closed_at else dt.datetime.utcnow()
-        intervals.append((start, end))
-
-    if not intervals:
-        return 0.0
-
-    # Sort by start time
-    intervals.sort(key=lambda x: x[0])
-
-    # Merge overlapping intervals
-    merged: list[tuple[dt.datetime, dt.datetime]] = [intervals[0]]
-    for start, end in intervals[1:]:
-        last_start, last_end = merged[-1]
-        if start <= last_end:
-            # Overlapping, extend the end if needed
-            merged[-1] = (last_start, max(last_end, end))
-        else:
-            merged.append((start, end))
-
-    # Sum total hours
-    total_seconds = sum((end - start).total_seconds() for start, end in merged)
-    return total_seconds / 3600.0
-
-
-def _calculate_dealer_hours(
-    sessions: list[Session],
-    dealer_id: int,
-) -> float:
-    """
-    Calculate dealer working hours. Dealers can only work one session at a time,
-    so we just sum up the session durations.
+    Column widths have to be known before the first row is written, so the
+    row generator is run twice: once to track the running max length of every
+    column, then again to stream the rows. No cells are kept in memory.
+
+    Args:
+        wb: Write-only workbook
+        title: Sheet title
+        rows: Generator function yielding the rows (lists of values or cells)
+
+    Returns:
+        Number of rows written
     """
-    total_seconds = 0.0
-    for s in sessions:
-        if s.dealer_id != dealer_id:
-            continue
-        start = cast(dt.datetime, s.created_at)
-        end = cast(dt.datetime, s.closed_at) if s.closed_at else dt.datetime.utcnow()
-        total_seconds += (end - start).total_seconds()
-    return total_seconds / 3600.0
+    ws = wb.create_sheet(title=title)
+
+    max_lengths: dict[int, int] = {}
+    for row in rows(ws):
+        for col, value in enumerate(row, 1):
+            if isinstance(value, Cell):
+                value = value.value
+            length = len(str(value)) if value else 0
+            max_lengths[col] = max(max_lengths.get(col, 0), length)
+
+    for col, max_length in max_lengths.items():
+        # Min width 12 for very short columns, max 60 for long text fields
+        ws.column_dimensions[get_column_letter(col)].width = max(min(max_length + 4, 60), 12)
+
+    count = 0
+    for row in rows(ws):
+        ws.append(row)
+        count += 1
+    return count
+
+
+def _observe_xlsx(report: str, started: float, row_count: int) -> None:
+    """Record the build time (since `started`) and row count of a generated report."""
+    XLSX_GENERATION_SECONDS.observe(time.perf_counter() - started, report=report)
+    XLSX_ROWS.inc(row_count, report=report)
 
 
 @router.get(
@@ -403,15 +425,94 @@ def _calculate_dealer_hours(
 )
 def export_report(
     date: str = Query(..., description="YYYY-MM-DD"),
+    if_none_match: str | None = Header(default=None),
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     """Generate comprehensive XLSX report for a specific date."""
+    d, headers = _day_report_request(date)
+    cache_key, cached = _cached_day_report(db, d, date, if_none_match, headers)
+    if cached is not None:
+        return cached
+    return _day_report_response(_load_day_report(db, d), d, cache_key, headers)
+
+
+def _day_report_request(date: str) -> tuple[dt.date, dict[str, str]]:
+    """Parse the date of a day report and build its download headers."""
     try:
         d = dt.date.fromisoformat(date)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format (expected YYYY-MM-DD)")
 
+    filename = f"casino_report_{date}.xlsx"
+
+    headers = {
+        "Content-Disposition": (
+            f'attachment; filename="{filename}"; '
+            f"filename*=UTF-8''{quote(filename)}"
+        )
+    }
+    return d, headers
+
+
+def _cached_day_report(
+    db: DBSession,
+    d: dt.date,
+    date: str,
+    if_none_match: str | None,
+    headers: dict[str, str],
+) -> tuple[str | None, Response | None]:
+    """
+    Look the day report up in the report cache.
+
+    Finished days (no open sessions) are immutable until something in the
+    fingerprint changes, so they are served from the report cache.
+
+    Returns:
+        Cache key to store a generated report under (None if it must not be
+        cached) and the response to send instead of generating one, if any
+    """
+    if not report_cache.enabled:
+        return None, None
+
+    start_time, end_time = _get_working_day_boundaries(d)
+    fingerprint = _report_fingerprint(db, d, start_time, end_time)
+    if fingerprint is None:
+        return None, None
+
+    cache_key = ReportCache.make_key("export-report", date, fingerprint)
+    etag = f'"{cache_key}"'
+    headers["ETag"] = etag
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return cache_key, Response(status_code=304, headers={"ETag": etag})
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        return cache_key, FileResponse(cached, media_type=MEDIA_TYPE_XLSX, headers=headers)
+    return cache_key, None
+
+
+@dataclass
+class _DayReportData:
+    """Everything the day report shows, loaded before the workbook is built."""
+
+    tables: list[Table]
+    sessions: list[Session]
+    seats_by_session: dict[str, list[Seat]]
+    purchases: list[ChipPurchase]
+    balance_adjustments: list[CasinoBalanceAdjustment]
+    staff: list[User]
+    staff_hours: StaffHours
+    chip_totals: ChipTotals
+    adjustment_totals: AdjustmentTotals
+
+
+def _load_day_report(db: DBSession, d: dt.date) -> _DayReportData:
+    """
+    Load the rows of a working day's report.
+
+    Relationships the sheets show are eager-loaded, so building the workbook
+    needs no database access.
+    """
     # Get working day boundaries (20:00 to 18:00 next day)
     start_time, end_time = _get_working_day_boundaries(d)
 
@@ -461,31 +562,237 @@ def export_report(
     # Fetch all staff (dealers and waiters)
     staff = db.query(User).filter(User.role.in_(["dealer", "waiter"])).all()
 
-    # Create workbook
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
+    return _DayReportData(
+        tables=tables,
+        sessions=sessions,
+        seats_by_session=seats_by_session,
+        purchases=purchases,
+        balance_adjustments=balance_adjustments,
+        staff=staff,
+        staff_hours=StaffHoursService.calculate(sessions),
+        chip_totals=ReportService.chip_totals(db, d),
+        adjustment_totals=ReportService.adjustment_totals(db, d),
+    )
+
+
+def _day_report_response(
+    data: _DayReportData,
+    d: dt.date,
+    cache_key: str | None,
+    headers: dict[str, str],
+) -> Response:
+    """Build the day report workbook, store it in the report cache and return it."""
+    # Create workbook (write-only: rows are streamed to temporary files as they are written)
+    started = time.perf_counter()
+    wb = Workbook(write_only=True)
 
     # Sheet 1: Table States (per-seat summary for each table)
-    _create_table_states_sheet(wb, tables, sessions, seats_by_session)
+    row_count = _create_table_states_sheet(wb, data.tables, data.sessions, data.seats_by_session)
 
     # Sheet 2: Chip Purchase Chronology
-    _create_purchases_sheet(wb, purchases, tables, db)
+    row_count += _create_purchases_sheet(wb, data.purchases, data.tables)
 
     # Sheet 3: Staff Salaries
-    _create_staff_sheet(wb, sessions, staff, d)
+    row_count += _create_staff_sheet(wb, data.staff_hours, data.staff, d)
 
     # Sheet 4: Balance Adjustments
-    _create_balance_adjustments_sheet(wb, balance_adjustments, d)
+    row_count += _create_balance_adjustments_sheet(wb, data.balance_adjustments, d)
 
     # Sheet 5: Summary (Profit/Expense)
-    _create_summary_sheet(wb, sessions, seats_by_session, purchases, staff, balance_adjustments, d)
+    row_count += _create_summary_sheet(
+        wb, data.staff_hours, data.chip_totals, data.staff, data.adjustment_totals, d
+    )
 
-    # Generate file
-    output = io.BytesIO()
+    # Generate file, spooled to disk once it outgrows XLSX_SPOOL_MAX_BYTES
+    output = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES)
     wb.save(output)
     output.seek(0)
+    _observe_xlsx("day", started, row_count)
 
-    filename = f"casino_report_{date}.xlsx"
+    if cache_key is not None:
+        cached = report_cache.put(cache_key, output)
+        if cached is not None:
+            output.close()
+            return FileResponse(cached, media_type=MEDIA_TYPE_XLSX, headers=headers)
+        output.seek(0)
+
+    return StreamingResponse(
+        _iter_file_chunks(output),
+        media_type=MEDIA_TYPE_XLSX,
+        headers=headers,
+    )
+
+
+def _iter_file_chunks(f: BinaryIO) -> Iterator[bytes]:
+    """Stream a file in XLSX_STREAM_CHUNK_BYTES chunks, closing it afterwards."""
+    try:
+        while chunk := f.read(XLSX_STREAM_CHUNK_BYTES):
+            yield chunk
+    finally:
+        f.close()
+
+
+def _parse_date_range(from_date: str, to_date: str) -> tuple[dt.date, dt.date]:
+    """Parse and validate the from/to query parameters of the range reports."""
+    try:
+        start_day = dt.date.fromisoformat(from_date)
+        end_day = dt.date.fromisoformat(to_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+    if start_day > end_day:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (end_day - start_day).days + 1 > MAX_REPORT_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range is too long (max {MAX_REPORT_RANGE_DAYS} days)",
+        )
+    return start_day, end_day
+
+
+def _calculate_range_days(db: DBSession, start_day: dt.date, end_day: dt.date) -> list[dict[str, Any]]:
+    """
+    Compute the per working day totals of a date range.
+
+    Every table is read once for the combined window (20:00 of the first day to
+    18:00 after the last one) and grouped by working day.
+
+    Returns:
+        One dict per calendar day in the range (days without activity included)
+    """
+    start_time, _ = _get_working_day_boundaries(start_day)
+    _, end_time = _get_working_day_boundaries(end_day)
+
+    chips_by_day = ReportService.chip_totals_by_day(db, start_day, end_day)
+    adjustments_by_day = ReportService.adjustment_totals_by_day(db, start_day, end_day)
+
+    # Sessions are still needed for staff hours (open sessions count up to now)
+    sessions_by_day: dict[dt.date, list[Session]] = {}
+    sessions = (
+        db.query(Session)
+        .filter(Session.created_at >= start_time, Session.created_at < end_time)
+        .all()
+    )
+    for s in sessions:
+        day = working_day_of(cast(dt.datetime, s.created_at))
+        if day is not None:
+            sessions_by_day.setdefault(day, []).append(s)
+
+    staff = db.query(User).filter(User.role.in_(["dealer", "waiter"])).all()
+
+    now = dt.datetime.utcnow()
+    days = []
+    for offset in range((end_day - start_day).days + 1):
+        day = start_day + dt.timedelta(days=offset)
+
+        total_salary = 0
+        day_sessions = sessions_by_day.get(day, [])
+        if day_sessions:
+            day_hours = StaffHoursService.calculate(day_sessions, now=now)
+            for person in staff:
+                role = cast(str, person.role)
+                hourly_rate = int(cast(int, person.hourly_rate)) if person.hourly_rate else 0
+                hours = day_hours.hours(int(cast(int, person.id)), role)
+                total_salary += round(hours * hourly_rate)
+
+        day_adjustments = adjustments_by_day.get(day, AdjustmentTotals())
+        days.append({
+            "date": day,
+            **asdict(chips_by_day.get(day, ChipTotals())),
+            "salaries": total_salary,
+            "adjustments_profit": day_adjustments.profit,
+            "adjustments_expense": day_adjustments.expense,
+        })
+    return days
+
+
+def _range_day_out(day: dict[str, Any]) -> dict[str, Any]:
+    """Shape range totals like the day-summary response (same result formula)."""
+    result = (
+        day["buyin_cash"]
+        - day["player_balance"]
+        - day["salaries"]
+        - day["buyin_credit"]
+        + day["adjustments_profit"]
+        - day["adjustments_expense"]
+    )
+    return {
+        "income": {
+            "buyin_cash": day["buyin_cash"],
+            "balance_adjustments": day["adjustments_profit"],
+        },
+        "expenses": {
+            "salaries": day["salaries"],
+            "buyin_credit": day["buyin_credit"],
+            "cashout": day["cashout"],
+            "balance_adjustments": day["adjustments_expense"],
+        },
+        "result": result,
+        "info": {
+            "player_balance": day["player_balance"],
+            "total_sessions": day["sessions_count"],
+            "open_sessions": day["open_sessions"],
+        },
+    }
+
+
+def _sum_range_days(days: list[dict[str, Any]]) -> dict[str, Any]:
+    """Sum per-day range rows into range totals."""
+    totals: dict[str, Any] = {}
+    for day in days:
+        for key, value in day.items():
+            if key != "date":
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+@router.get("/range-summary")
+def get_range_summary(
+    from_date: str = Query(..., alias="from", description="First date in YYYY-MM-DD format"),
+    to_date: str = Query(..., alias="to", description="Last date in YYYY-MM-DD format"),
+    db: DBSession = Depends(get_db),
+    current_user: Any = Depends(require_roles("superadmin")),
+):
+    """Get profit/loss of every working day in a date range plus range totals."""
+    start_day, end_day = _parse_date_range(from_date, to_date)
+    days = _calculate_range_days(db, start_day, end_day)
+
+    return {
+        "from": start_day.isoformat(),
+        "to": end_day.isoformat(),
+        "days": [{"date": day["date"].isoformat(), **_range_day_out(day)} for day in days],
+        "totals": _range_day_out(_sum_range_days(days)),
+    }
+
+
+@router.get(
+    "/export-range-report",
+    dependencies=[Depends(require_roles("superadmin"))],
+)
+def export_range_report(
+    from_date: str = Query(..., alias="from", description="YYYY-MM-DD"),
+    to_date: str = Query(..., alias="to", description="YYYY-MM-DD"),
+    db: DBSession = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    """Generate XLSX profit/loss report with one row per working day of a date range."""
+    start_day, end_day = _parse_date_range(from_date, to_date)
+    days = _calculate_range_days(db, start_day, end_day)
+    return _range_report_response(days, start_day, end_day)
+
+
+def _range_report_response(days: list[dict[str, Any]], start_day: dt.date, end_day: dt.date) -> Response:
+    """Build the range report workbook and return it."""
+    started = time.perf_counter()
+    wb = Workbook(write_only=True)
+    row_count = _create_range_summary_sheet(wb, days)
+
+    output = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES)
+    wb.save(output)
+    output.seek(0)
+    _observe_xlsx("range", started, row_count)
+
+    filename = f"casino_report_{start_day.isoformat()}_{end_day.isoformat()}.xlsx"
 
     headers = {
         "Content-Disposition": (
@@ -495,334 +802,327 @@ def export_report(
     }
 
     return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        _iter_file_chunks(output),
+        media_type=MEDIA_TYPE_XLSX,
         headers=headers,
     )
 
 
+def _report_fingerprint(
+    db: DBSession,
+    report_date: dt.date,
+    start_time: dt.datetime,
+    end_time: dt.datetime,
+) -> str | None:
+    """
+    Cheap change fingerprint of everything the XLSX report of a working day shows.
+
+    Returns:
+        Fingerprint string, or None while the day still has open sessions
+    """
+    session_stats = (
+        db.query(
+            func.count(Session.id),
+            func.sum(case((Session.status == "open", 1), else_=0)),
+            func.max(Session.closed_at),
+        )
+        .filter(Session.created_at >= start_time, Session.created_at < end_time)
+        .one()
+    )
+    if session_stats[1]:
+        return None
+
+    day_sessions = (
+        db.query(Session.id)
+        .filter(Session.created_at >= start_time, Session.created_at < end_time)
+        .scalar_subquery()
+    )
+    purchase_stats = (
+        db.query(func.count(ChipPurchase.id), func.max(ChipPurchase.id), func.sum(ChipPurchase.amount))
+        .filter(ChipPurchase.session_id.in_(day_sessions))
+        .one()
+    )
+    adjustment_stats = (
+        db.query(
+            func.count(CasinoBalanceAdjustment.id),
+            func.max(CasinoBalanceAdjustment.id),
+            func.sum(CasinoBalanceAdjustment.amount),
+        )
+        .filter(CasinoBalanceAdjustment.created_at >= start_time, CasinoBalanceAdjustment.created_at < end_time)
+        .one()
+    )
+    summary_updated = (
+        db.query(func.max(DailySummary.updated_at))
+        .filter(DailySummary.working_day == report_date)
+        .scalar()
+    )
+    # Rows without update timestamps that still appear in the report
+    player_names = (
+        db.query(Seat.session_id, Seat.seat_no, Seat.player_name)
+        .filter(Seat.session_id.in_(day_sessions), Seat.player_name.isnot(None))
+        .order_by(Seat.session_id.asc(), Seat.seat_no.asc())
+        .all()
+    )
+    staff = (
+        db.query(User.id, User.username, User.role, User.hourly_rate)
+        .filter(User.role.in_(["dealer", "waiter"]))
+        .order_by(User.id.asc())
+        .all()
+    )
+    tables = db.query(Table.id, Table.name).order_by(Table.id.asc()).all()
+
+    return ReportCache.make_key(
+        tuple(session_stats),
+        tuple(purchase_stats),
+        tuple(adjustment_stats),
+        summary_updated,
+        [tuple(row) for row in player_names],
+        [tuple(row) for row in staff],
+        [tuple(row) for row in tables],
+    )
+
 
 def _create_table_states_sheet(
     wb: Workbook,
     tables: list[Table],
     sessions: list[Session],
     seats_by_session: dict[str, list[Seat]],
-):
+) -> int:
     """Create sheet with table states - seats, players, and totals."""
-    ws = wb.create_sheet(title="Состояние столов")
-
-    if not sessions:
-        ws.cell(row=1, column=1, value="Нет данных за выбранную дату")
-        ws.cell(row=1, column=1).font = Font(italic=True)
-        return
-
-    row = 1
-    for table in tables:
-        table_sessions = [s for s in sessions if s.table_id == table.id]
-        if not table_sessions:
-            continue
-
-        # Table header
-        ws.cell(row=row, column=1, value=f"Стол: {table.name}")
-        ws.cell(row=row, column=1).font = Font(bold=True, size=14)
-        row += 1
-
-        for session in table_sessions:
-            sid = cast(str, session.id)
-            seats = seats_by_session.get(sid, [])
-
-            # Session info
-            start_time = cast(dt.datetime, session.created_at).strftime("%H:%M")
-            if session.closed_at:
-                end_time = cast(dt.datetime, session.closed_at).strftime("%H:%M")
-            elif session.status == "closed":
-                end_time = "закрыта"
-            else:
-                end_time = "открыта"
-            dealer_name = session.dealer.username if session.dealer else "—"
-            waiter_name = session.waiter.username if session.waiter else "—"
-            status_text = "закрыта" if session.status == "closed" else "открыта"
-            chips_in_play = int(cast(int, session.chips_in_play))
-
-            ws.cell(row=row, column=1, value=f"Сессия: {start_time} - {end_time}")
-            ws.cell(row=row, column=2, value=f"Дилер: {dealer_name}")
-            ws.cell(row=row, column=3, value=f"Официант: {waiter_name}")
-            ws.cell(row=row, column=4, value=f"Статус: {status_text}")
-            row += 1
-
-            # Chips in play info
-            ws.cell(row=row, column=1, value=f"Фишек на столе: {chips_in_play}")
-            row += 1
-
-            # Seats header
-            headers = ["Место", "Игрок", "Итого фишек"]
-            for col, h in enumerate(headers, 1):
-                ws.cell(row=row, column=col, value=h)
-            _style_header(ws, row, len(headers))
-            row += 1
-
-            # Seat data - only show seats with players or non-zero totals
-            session_total = 0
-            for seat in seats:
-                total = int(cast(int, seat.total))
-                player = cast(str, seat.player_name) if seat.player_name else ""
-
-                # Show all seats that have activity
-                if player or total != 0:
-                    ws.cell(row=row, column=1, value=int(cast(int, seat.seat_no)))
-                    ws.cell(row=row, column=2, value=player)
-                    cell = ws.cell(row=row, column=3, value=total)
-                    if total > 0:
-                        cell.fill = MONEY_POSITIVE_FILL
-                    elif total < 0:
-                        cell.fill = MONEY_NEGATIVE_FILL
-                    row += 1
-                session_total += total
-
-            # Session total
-            ws.cell(row=row, column=2, value="ИТОГО сессии:")
-            ws.cell(row=row, column=2).font = Font(bold=True)
-            cell = ws.cell(row=row, column=3, value=session_total)
-            cell.font = Font(bold=True)
-            if session_total > 0:
-                cell.fill = MONEY_POSITIVE_FILL
-            elif session_total < 0:
-                cell.fill = MONEY_NEGATIVE_FILL
-            row += 2
-
-        row += 1  # Extra space between tables
-
-    _auto_width(ws)
+    def rows(ws: WriteOnlyWorksheet) -> Iterator[list[Any]]:
+        if not sessions:
+            yield [_cell(ws, "Нет данных за выбранную дату", font=Font(italic=True))]
+            return
+
+        for table in tables:
+            table_sessions = [s for s in sessions if s.table_id == table.id]
+            if not table_sessions:
+                continue
+
+            # Table header
+            yield [_cell(ws, f"Стол: {table.name}", font=Font(bold=True, size=14))]
+
+            for session in table_sessions:
+                sid = cast(str, session.id)
+                seats = seats_by_session.get(sid, [])
+
+                # Session info
+                start_time = cast(dt.datetime, session.created_at).strftime("%H:%M")
+                if session.closed_at:
+                    end_time = cast(dt.datetime, session.closed_at).strftime("%H:%M")
+                elif session.status == "closed":
+                    end_time = "закрыта"
+                else:
+                    end_time = "открыта"
+                dealer_name = session.dealer.username if session.dealer else "—"
+                waiter_name = session.waiter.username if session.waiter else "—"
+                status_text = "закрыта" if session.status == "closed" else "открыта"
+                chips_in_play = int(cast(int, session.chips_in_play))
+
+                yield [
+                    f"Сессия: {start_time} - {end_time}",
+                    f"Дилер: {dealer_name}",
+                    f"Официант: {waiter_name}",
+                    f"Статус: {status_text}",
+                ]
+
+                # Chips in play info
+                yield [f"Фишек на столе: {chips_in_play}"]
+
+                # Seats header
+                yield _header_row(ws, ["Место", "Игрок", "Итого фишек"])
+
+                # Seat data - only show seats with players or non-zero totals
+                session_total = 0
+                for seat in seats:
+                    total = int(cast(int, seat.total))
+                    player = cast(str, seat.player_name) if seat.player_name else ""
+
+                    # Show all seats that have activity
+                    if player or total != 0:
+                        yield [int(cast(int, seat.seat_no)), player, _money_cell(ws, total)]
+                    session_total += total
+
+                # Session total
+                yield [
+                    None,
+                    _cell(ws, "ИТОГО сессии:", font=Font(bold=True)),
+                    _money_cell(ws, session_total, font=Font(bold=True)),
+                ]
+                yield []
+
+            yield []  # Extra space between tables
+
+    return _write_sheet(wb, "Состояние столов", rows)
 
 
 def _create_purchases_sheet(
     wb: Workbook,
     purchases: list[ChipPurchase],
     tables: list[Table],
-    db: DBSession,
-):
+) -> int:
     """Create sheet with chip purchase chronology."""
-    ws = wb.create_sheet(title="Хронология покупок")
+    tables_by_id = {t.id: t for t in tables}
 
-    # Headers
-    headers = ["Время", "Стол", "Место", "Сумма", "Тип оплаты", "Выдал"]
-    for col, h in enumerate(headers, 1):
-        ws.cell(row=1, column=col, value=h)
-    _style_header(ws, 1, len(headers))
+    def rows(ws: WriteOnlyWorksheet) -> Iterator[list[Any]]:
+        yield _header_row(ws, ["Время", "Стол", "Место", "Сумма", "Тип оплаты", "Выдал"])
 
-    if not purchases:
-        ws.cell(row=2, column=1, value="Нет покупок за выбранную дату")
-        ws.cell(row=2, column=1).font = Font(italic=True)
-        _auto_width(ws)
-        return
+        if not purchases:
+            yield [_cell(ws, "Нет покупок за выбранную дату", font=Font(italic=True))]
+            return
 
-    tables_by_id = {t.id: t for t in tables}
+        for p in purchases:
+            time_str = cast(dt.datetime, p.created_at).strftime("%H:%M:%S")
+            table = tables_by_id.get(int(cast(int, p.table_id)))
+            table_name = cast(str, table.name) if table else f"ID {p.table_id}"
 
-    row = 2
-    for p in purchases:
-        time_str = cast(dt.datetime, p.created_at).strftime("%H:%M:%S")
-        table = tables_by_id.get(int(cast(int, p.table_id)))
-        table_name = cast(str, table.name) if table else f"ID {p.table_id}"
-
-        ws.cell(row=row, column=1, value=time_str)
-        ws.cell(row=row, column=2, value=table_name)
-        ws.cell(row=row, column=3, value=int(cast(int, p.seat_no)))
-
-        amount = int(cast(int, p.amount))
-        cell = ws.cell(row=row, column=4, value=amount)
-        # For cashouts (negative), show as expense (red)
-        # For buyins (positive), show as income (green)
-        if amount > 0:
-            cell.fill = MONEY_POSITIVE_FILL
-        elif amount < 0:
-            cell.fill = MONEY_NEGATIVE_FILL
-
-        # Payment type column
-        # For cashouts, show "выдача" (payout) instead of payment type
-        if amount < 0:
-            payment_text = "выдача"
-            payment_cell = ws.cell(row=row, column=5, value=payment_text)
-            payment_cell.fill = MONEY_NEGATIVE_FILL
-            payment_cell.font = Font(bold=True)
-        else:
-            payment_type = cast(str, p.payment_type) if p.payment_type else "cash"
-            payment_text = "наличные" if payment_type == "cash" else "кредит"
-            payment_cell = ws.cell(row=row, column=5, value=payment_text)
-            # Apply dark color coding for payment type
-            if payment_type == "cash":
-                payment_cell.fill = CASH_DARK_FILL
-                payment_cell.font = Font(color="FFFFFF", bold=True)
-            else:  # credit
-                payment_cell.fill = CREDIT_DARK_FILL
-                payment_cell.font = Font(color="FFFFFF", bold=True)
-
-        username = cast(str, p.created_by.username) if p.created_by else "—"
-        ws.cell(row=row, column=6, value=username)
-
-        row += 1
-
-    _auto_width(ws)
+            # For cashouts (negative), show as expense (red)
+            # For buyins (positive), show as income (green)
+            amount = int(cast(int, p.amount))
 
+            # Payment type column
+            # For cashouts, show "выдача" (payout) instead of payment type
+            if amount < 0:
+                payment_cell = _cell(ws, "выдача", font=Font(bold=True), fill=MONEY_NEGATIVE_FILL)
+            else:
+                payment_type = cast(str, p.payment_type) if p.payment_type else "cash"
+                payment_text = "наличные" if payment_type == "cash" else "кредит"
+                # Apply dark color coding for payment type
+                payment_cell = _cell(
+                    ws,
+                    payment_text,
+                    font=Font(color="FFFFFF", bold=True),
+                    fill=CASH_DARK_FILL if payment_type == "cash" else CREDIT_DARK_FILL,
+                )
+
+            username = cast(str, p.created_by.username) if p.created_by else "—"
+
+            yield [
+                time_str,
+                table_name,
+                int(cast(int, p.seat_no)),
+                _money_cell(ws, amount),
+                payment_cell,
+                username,
+            ]
+
+    return _write_sheet(wb, "Хронология покупок", rows)
 
 
 def _create_staff_sheet(
     wb: Workbook,
-    sessions: list[Session],
+    staff_hours: StaffHours,
     staff: list[User],
     report_date: dt.date,
-):
+) -> int:
     """Create sheet with staff working hours and salary calculations."""
-    ws = wb.create_sheet(title="Зарплаты персонала")
+    def rows(ws: WriteOnlyWorksheet) -> Iterator[list[Any]]:
+        yield _header_row(ws, ["Сотрудник", "Роль", "Часов", "Ставка/час", "Зарплата"])
 
-    # Headers
-    headers = ["Сотрудник", "Роль", "Часов", "Ставка/час", "Зарплата"]
-    for col, h in enumerate(headers, 1):
-        ws.cell(row=1, column=col, value=h)
-    _style_header(ws, 1, len(headers))
+        total_salary = 0
+        for person in staff:
+            username = cast(str, person.username)
+            role = cast(str, person.role)
+            hourly_rate = int(cast(int, person.hourly_rate)) if person.hourly_rate else 0
 
-    row = 2
-    total_salary = 0
+            hours = staff_hours.hours(int(cast(int, person.id)), role)
 
-    for person in staff:
-        username = cast(str, person.username)
-        role = cast(str, person.role)
-        hourly_rate = int(cast(int, person.hourly_rate)) if person.hourly_rate else 0
+            if hours == 0:
+                continue  # Skip staff with no hours
 
-        # Calculate hours based on role
-        if role == "dealer":
-            hours = _calculate_dealer_hours(sessions, int(cast(int, person.id)))
-        else:  # waiter
-            hours = _calculate_waiter_hours(sessions, int(cast(int, person.id)))
+            salary = round(hours * hourly_rate)
+            total_salary += salary
 
-        if hours == 0:
-            continue  # Skip staff with no hours
+            yield [
+                username,
+                "Дилер" if role == "dealer" else "Официант",
+                round(hours, 2),
+                hourly_rate,
+                salary,
+            ]
 
-        salary = round(hours * hourly_rate)
-        total_salary += salary
+        # Total row
+        yield []
+        yield [
+            None,
+            None,
+            None,
+            _cell(ws, "ИТОГО:", font=Font(bold=True)),
+            # Salary is an expense
+            _cell(ws, total_salary, font=Font(bold=True), fill=MONEY_NEGATIVE_FILL),
+        ]
 
-        ws.cell(row=row, column=1, value=username)
-        ws.cell(row=row, column=2, value="Дилер" if role == "dealer" else "Официант")
-        ws.cell(row=row, column=3, value=round(hours, 2))
-        ws.cell(row=row, column=4, value=hourly_rate)
-        ws.cell(row=row, column=5, value=salary)
-
-        row += 1
-
-    # Total row
-    row += 1
-    ws.cell(row=row, column=4, value="ИТОГО:")
-    ws.cell(row=row, column=4).font = Font(bold=True)
-    ws.cell(row=row, column=5, value=total_salary)
-    ws.cell(row=row, column=5).font = Font(bold=True)
-    ws.cell(row=row, column=5).fill = MONEY_NEGATIVE_FILL  # Salary is an expense
-
-    _auto_width(ws)
+    return _write_sheet(wb, "Зарплаты персонала", rows)
 
 
 def _create_balance_adjustments_sheet(
     wb: Workbook,
     balance_adjustments: list[CasinoBalanceAdjustment],
     report_date: dt.date,
-):
+) -> int:
     """Create sheet with balance adjustments for the working day."""
-    ws = wb.create_sheet(title="Корректировки баланса")
-
-    # Headers
-    headers = ["Время", "Тип", "Сумма", "Комментарий", "Создал"]
-    for col, h in enumerate(headers, 1):
-        ws.cell(row=1, column=col, value=h)
-    _style_header(ws, 1, len(headers))
-
-    if not balance_adjustments:
-        ws.cell(row=2, column=1, value="Нет корректировок за выбранную дату")
-        ws.cell(row=2, column=1).font = Font(italic=True)
-        _auto_width(ws)
-        return
-
-    row = 2
-    total_profit = 0
-    total_expense = 0
-
-    for adj in balance_adjustments:
-        time_str = cast(dt.datetime, adj.created_at).strftime("%H:%M:%S")
-        amount = int(cast(int, adj.amount))
-        
-        # Determine type (income/expense)
-        adj_type = "Доход" if amount > 0 else "Расход"
-        
-        ws.cell(row=row, column=1, value=time_str)
-        ws.cell(row=row, column=2, value=adj_type)
-        
-        amount_cell = ws.cell(row=row, column=3, value=amount)
-        if amount > 0:
-            amount_cell.fill = MONEY_POSITIVE_FILL
-            total_profit += amount
-        else:
-            amount_cell.fill = MONEY_NEGATIVE_FILL
-            total_expense += abs(amount)
-        
-        ws.cell(row=row, column=4, value=cast(str, adj.comment))
-        
-        username = cast(str, adj.created_by.username) if adj.created_by else "—"
-        ws.cell(row=row, column=5, value=username)
-        
-        row += 1
-
-    # Totals row
-    row += 1
-    ws.cell(row=row, column=4, value="ИТОГО доходы:")
-    ws.cell(row=row, column=4).font = Font(bold=True)
-    ws.cell(row=row, column=5, value=total_profit)
-    ws.cell(row=row, column=5).font = Font(bold=True)
-    ws.cell(row=row, column=5).fill = MONEY_POSITIVE_FILL
-    row += 1
-    
-    ws.cell(row=row, column=4, value="ИТОГО расходы:")
-    ws.cell(row=row, column=4).font = Font(bold=True)
-    ws.cell(row=row, column=5, value=total_expense)
-    ws.cell(row=row, column=5).font = Font(bold=True)
-    ws.cell(row=row, column=5).fill = MONEY_NEGATIVE_FILL
+    def rows(ws: WriteOnlyWorksheet) -> Iterator[list[Any]]:
+        yield _header_row(ws, ["Время", "Тип", "Сумма", "Комментарий", "Создал"])
+
+        if not balance_adjustments:
+            yield [_cell(ws, "Нет корректировок за выбранную дату", font=Font(italic=True))]
+            return
+
+        total_profit = 0
+        total_expense = 0
+
+        for adj in balance_adjustments:
+            time_str = cast(dt.datetime, adj.created_at).strftime("%H:%M:%S")
+            amount = int(cast(int, adj.amount))
+
+            # Determine type (income/expense)
+            adj_type = "Доход" if amount > 0 else "Расход"
+
+            if amount > 0:
+                amount_cell = _cell(ws, amount, fill=MONEY_POSITIVE_FILL)
+                total_profit += amount
+            else:
+                amount_cell = _cell(ws, amount, fill=MONEY_NEGATIVE_FILL)
+                total_expense += abs(amount)
+
+            username = cast(str, adj.created_by.username) if adj.created_by else "—"
+
+            yield [time_str, adj_type, amount_cell, cast(str, adj.comment), username]
+
+        # Totals rows
+        yield []
+        yield [
+            None,
+            None,
+            None,
+            _cell(ws, "ИТОГО доходы:", font=Font(bold=True)),
+            _cell(ws, total_profit, font=Font(bold=True), fill=MONEY_POSITIVE_FILL),
+        ]
+        yield [
+            None,
+            None,
+            None,
+            _cell(ws, "ИТОГО расходы:", font=Font(bold=True)),
+            _cell(ws, total_expense, font=Font(bold=True), fill=MONEY_NEGATIVE_FILL),
+        ]
 
-    _auto_width(ws)
+    return _write_sheet(wb, "Корректировки баланса", rows)
 
 
 def _create_summary_sheet(
     wb: Workbook,
-    sessions: list[Session],
-    seats_by_session: dict[str, list[Seat]],
-    purchases: list[ChipPurchase],
+    staff_hours: StaffHours,
+    chips: ChipTotals,
     staff: list[User],
-    balance_adjustments: list[CasinoBalanceAdjustment],
+    adjustments: AdjustmentTotals,
     report_date: dt.date,
-):
+) -> int:
     """Create summary sheet with profit/expense overview."""
-    ws = wb.create_sheet(title="Итоги дня")
-
-    # Calculate totals
-    total_chip_income_cash = 0  # Cash buyins (positive only)
-    total_chip_cashout = 0  # Cash cashouts (absolute value, negative amounts)
-    total_chip_income_credit = 0  # Credit buyins (expenses)
-    
-    for p in purchases:
-        amount = int(cast(int, p.amount))
-        if amount > 0:  # Buyin
-            if p.payment_type == "credit":
-                total_chip_income_credit += amount
-            else:
-                total_chip_income_cash += amount
-        elif amount < 0:  # Cashout (negative amount = expense)
-            # Cashouts are always cash payments back to players
-            total_chip_cashout += abs(amount)  # Track cashouts separately
-
-    # Calculate balance adjustments
-    total_balance_adjustments_profit = 0
-    total_balance_adjustments_expense = 0
-    for adj in balance_adjustments:
-        amount = int(cast(int, adj.amount))
-        if amount > 0:
-            total_balance_adjustments_profit += amount
-        else:
-            total_balance_adjustments_expense += abs(amount)
+    total_chip_income_cash = chips.buyin_cash  # Cash buyins (positive only)
+    total_chip_cashout = chips.cashout  # Cash cashouts (absolute value)
+    total_chip_income_credit = chips.buyin_credit  # Credit buyins (expenses)
+    total_balance_adjustments_profit = adjustments.profit
+    total_balance_adjustments_expense = adjustments.expense
 
     # Calculate staff salary
     total_salary = 0
@@ -830,105 +1130,194 @@ def _create_summary_sheet(
         role = cast(str, person.role)
         hourly_rate = int(cast(int, person.hourly_rate)) if person.hourly_rate else 0
 
-        if role == "dealer":
-            hours = _calculate_dealer_hours(sessions, int(cast(int, person.id)))
-        else:
-            hours = _calculate_waiter_hours(sessions, int(cast(int, person.id)))
-
+        hours = staff_hours.hours(int(cast(int, person.id)), role)
         total_salary += round(hours * hourly_rate)
 
-    # Calculate net per-seat totals (what players ended with)
-    total_player_balance = 0
-    for sid, seats in seats_by_session.items():
-        for seat in seats:
-            total_player_balance += int(cast(int, seat.total))
-
-    # Write summary
-    row = 1
-
-    ws.cell(row=row, column=1, value=f"Отчёт за {report_date.isoformat()}")
-    ws.cell(row=row, column=1).font = Font(bold=True, size=14)
-    row += 2
-
-    # Income section
-    ws.cell(row=row, column=1, value="ДОХОДЫ")
-    ws.cell(row=row, column=1).font = Font(bold=True)
-    ws.cell(row=row, column=1).fill = MONEY_POSITIVE_FILL
-    row += 1
-
-    ws.cell(row=row, column=1, value="Покупка фишек (наличные):")
-    ws.cell(row=row, column=2, value=total_chip_income_cash)
-    ws.cell(row=row, column=2).fill = MONEY_POSITIVE_FILL
-    row += 1
-
-    ws.cell(row=row, column=1, value="Корректировки баланса (доход):")
-    ws.cell(row=row, column=2, value=total_balance_adjustments_profit)
-    ws.cell(row=row, column=2).fill = MONEY_POSITIVE_FILL
-    row += 2
-
-    # Expense section
-    ws.cell(row=row, column=1, value="РАСХОДЫ")
-    ws.cell(row=row, column=1).font = Font(bold=True)
-    ws.cell(row=row, column=1).fill = MONEY_NEGATIVE_FILL
-    row += 1
-
-    ws.cell(row=row, column=1, value="Зарплаты персонала:")
-    ws.cell(row=row, column=2, value=total_salary)
-    ws.cell(row=row, column=2).fill = MONEY_NEGATIVE_FILL
-    row += 1
-
-    ws.cell(row=row, column=1, value="Покупка фишек (кредит):")
-    ws.cell(row=row, column=2, value=total_chip_income_credit)
-    ws.cell(row=row, column=2).fill = MONEY_NEGATIVE_FILL
-    row += 1
-
-    ws.cell(row=row, column=1, value="Корректировки баланса (расход):")
-    ws.cell(row=row, column=2, value=total_balance_adjustments_expense)
-    ws.cell(row=row, column=2).fill = MONEY_NEGATIVE_FILL
-    row += 2
+    # Net per-seat totals (what players ended with)
+    total_player_balance = chips.player_balance
 
     # Net result
     # Casino profit = cash_buyin - cashout - player_balance (what players have left) - salary - credit_buyin + adj_profit - adj_expense
     casino_result = total_chip_income_cash - total_chip_cashout - total_player_balance - total_salary - total_chip_income_credit + total_balance_adjustments_profit - total_balance_adjustments_expense
 
-    ws.cell(row=row, column=1, value="ИТОГО ЗА ДЕНЬ:")
-    ws.cell(row=row, column=1).font = Font(bold=True, size=12)
-    cell = ws.cell(row=row, column=2, value=casino_result)
-    cell.font = Font(bold=True, size=12)
-    if casino_result >= 0:
-        cell.fill = MONEY_POSITIVE_FILL
-    else:
-        cell.fill = MONEY_NEGATIVE_FILL
-    row += 2
-
-    # Additional info
-    ws.cell(row=row, column=1, value="Справочно:")
-    ws.cell(row=row, column=1).font = Font(bold=True)
-    row += 1
-
-    ws.cell(row=row, column=1, value="Баланс игроков (остаток фишек):")
-    ws.cell(row=row, column=2, value=total_player_balance)
-    row += 1
-
-    ws.cell(row=row, column=1, value="Выдано в кредит:")
-    ws.cell(row=row, column=2, value=total_chip_income_credit)
-    ws.cell(row=row, column=2).fill = CREDIT_DARK_FILL
-    ws.cell(row=row, column=2).font = Font(color="FFFFFF", bold=True)
-    row += 1
-    
-    # Add cashout line
-    ws.cell(row=row, column=1, value="Выдано игрокам (кэшаут):")
-    ws.cell(row=row, column=2, value=total_chip_cashout)
-    ws.cell(row=row, column=2).fill = MONEY_NEGATIVE_FILL
-    ws.cell(row=row, column=2).font = Font(bold=True)
-    row += 1
-
-    ws.cell(row=row, column=1, value="Количество сессий:")
-    ws.cell(row=row, column=2, value=len(sessions))
-    row += 1
-
-    open_sessions = len([s for s in sessions if s.status == "open"])
-    ws.cell(row=row, column=1, value="Открытых сессий:")
-    ws.cell(row=row, column=2, value=open_sessions)
-
-    _auto_width(ws)
\ No newline at end of file
+    def rows(ws: WriteOnlyWorksheet) -> Iterator[list[Any]]:
+        yield [_cell(ws, f"Отчёт за {report_date.isoformat()}", font=Font(bold=True, size=14))]
+        yield []
+
+        # Income section
+        yield [_cell(ws, "ДОХОДЫ", font=Font(bold=True), fill=MONEY_POSITIVE_FILL)]
+        yield ["Покупка фишек (наличные):", _cell(ws, total_chip_income_cash, fill=MONEY_POSITIVE_FILL)]
+        yield ["Корректировки баланса (доход):", _cell(ws, total_balance_adjustments_profit, fill=MONEY_POSITIVE_FILL)]
+        yield []
+
+        # Expense section
+        yield [_cell(ws, "РАСХОДЫ", font=Font(bold=True), fill=MONEY_NEGATIVE_FILL)]
+        yield ["Зарплаты персонала:", _cell(ws, total_salary, fill=MONEY_NEGATIVE_FILL)]
+        yield ["Покупка фишек (кредит):", _cell(ws, total_chip_income_credit, fill=MONEY_NEGATIVE_FILL)]
+        yield ["Корректировки баланса (расход):", _cell(ws, total_balance_adjustments_expense, fill=MONEY_NEGATIVE_FILL)]
+        yield []
+
+        yield [
+            _cell(ws, "ИТОГО ЗА ДЕНЬ:", font=Font(bold=True, size=12)),
+            _cell(
+                ws,
+                casino_result,
+                font=Font(bold=True, size=12),
+                fill=MONEY_POSITIVE_FILL if casino_result >= 0 else MONEY_NEGATIVE_FILL,
+            ),
+        ]
+        yield []
+
+        # Additional info
+        yield [_cell(ws, "Справочно:", font=Font(bold=True))]
+        yield ["Баланс игроков (остаток фишек):", total_player_balance]
+        yield [
+            "Выдано в кредит:",
+            _cell(ws, total_chip_income_credit, font=Font(color="FFFFFF", bold=True), fill=CREDIT_DARK_FILL),
+        ]
+        yield [
+            "Выдано игрокам (кэшаут):",
+            _cell(ws, total_chip_cashout, font=Font(bold=True), fill=MONEY_NEGATIVE_FILL),
+        ]
+        yield ["Количество сессий:", chips.sessions_count]
+        yield ["Открытых сессий:", chips.open_sessions]
+
+    return _write_sheet(wb, "Итоги дня", rows)
+
+
+def _create_range_summary_sheet(wb: Workbook, days: list[dict[str, Any]]) -> int:
+    """Create sheet with profit/expense totals of every working day in a range."""
+    def result_of(day: dict[str, Any]) -> int:
+        # Same formula as the single day summary sheet (cashout included)
+        return (
+            day["buyin_cash"]
+            - day["cashout"]
+            - day["player_balance"]
+            - day["salaries"]
+            - day["buyin_credit"]
+            + day["adjustments_profit"]
+            - day["adjustments_expense"]
+        )
+
+    def values_of(day: dict[str, Any]) -> list[Any]:
+        return [
+            day["buyin_cash"],
+            day["adjustments_profit"],
+            day["salaries"],
+            day["buyin_credit"],
+            day["adjustments_expense"],
+            day["cashout"],
+            day["player_balance"],
+            day["sessions_count"],
+        ]
+
+    def rows(ws: WriteOnlyWorksheet) -> Iterator[list[Any]]:
+        yield _header_row(ws, [
+            "Дата",
+            "Покупка фишек (наличные)",
+            "Корректировки (доход)",
+            "Зарплаты",
+            "Покупка фишек (кредит)",
+            "Корректировки (расход)",
+            "Кэшаут",
+            "Баланс игроков",
+            "Сессий",
+            "Итого за день",
+        ])
+
+        for day in days:
+            yield [
+                cast(dt.date, day["date"]).strftime(DATE_FORMAT_DISPLAY),
+                *values_of(day),
+                _money_cell(ws, result_of(day)),
+            ]
+
+        totals = _sum_range_days(days)
+        yield []
+        yield [
+            _cell(ws, "ИТОГО:", font=Font(bold=True)),
+            *[_cell(ws, value, font=Font(bold=True)) for value in values_of(totals)],
+            _money_cell(ws, result_of(totals), font=Font(bold=True)),
+        ]
+
+    return _write_sheet(wb, "Итоги по дням", rows)
+
+
+# Async handlers (DB_ASYNC), mounted instead of the ones above. Queries run
+# through AsyncSession.run_sync like the session handlers; workbooks are built
+# in a worker thread so a large export does not stall the event loop.
+async_router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@async_router.get("/day-summary/preselected-date")
+async def get_preselected_date_async(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Any = Depends(require_roles_async("superadmin")),
+):
+    return await db.run_sync(lambda sync_db: get_preselected_date(db=sync_db, current_user=current_user))
+
+
+@async_router.get("/day-summary")
+async def get_day_summary_async(
+    date: str = Query(..., description="Date in YYYY-MM-DD format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Any = Depends(require_roles_async("superadmin")),
+):
+    return await db.run_sync(lambda sync_db: get_day_summary(date, db=sync_db, current_user=current_user))
+
+
+@async_router.post("/day-summary/rebuild")
+async def rebuild_day_summary_async(
+    date: str = Query(..., description="Date in YYYY-MM-DD format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Any = Depends(require_roles_async("superadmin")),
+):
+    async with async_write_transaction(db):
+        return await db.run_sync(lambda sync_db: rebuild_day_summary(date, db=sync_db, current_user=current_user))
+
+
+@async_router.get(
+    "/export-report",
+    dependencies=[Depends(require_roles_async("superadmin"))],
+)
+async def export_report_async(
+    date: str = Query(..., description="YYYY-MM-DD"),
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    d, headers = _day_report_request(date)
+    cache_key, cached = await db.run_sync(
+        lambda sync_db: _cached_day_report(sync_db, d, date, if_none_match, headers)
+    )
+    if cached is not None:
+        return cached
+    data = await db.run_sync(_load_day_report, d)
+    return await run_in_threadpool(_day_report_response, data, d, cache_key, headers)
+
+
+@async_router.get("/range-summary")
+async def get_range_summary_async(
+    from_date: str = Query(..., alias="from", description="First date in YYYY-MM-DD format"),
+    to_date: str = Query(..., alias="to", description="Last date in YYYY-MM-DD format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Any = Depends(require_roles_async("superadmin")),
+):
+    return await db.run_sync(
+        lambda sync_db: get_range_summary(from_date, to_date, db=sync_db, current_user=current_user)
+    )
+
+
+@async_router.get(
+    "/export-range-report",
+    dependencies=[Depends(require_roles_async("superadmin"))],
+)
+async def export_range_report_async(
+    from_date: str = Query(..., alias="from", description="YYYY-MM-DD"),
+    to_date: str = Query(..., alias="to", description="YYYY-MM-DD"),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    start_day, end_day = _parse_date_range(from_date, to_date)
+    days = await db.run_sync(_calculate_range_days, start_day, end_day)
+    return await run_in_threadpool(_range_report_response, days, start_day, end_day)
@@ -3,14 +3,44 @@ from __future__ import annotations
 import datetime as dt
 from typing import Any, cast
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DBSession
 
+from ..core.constants import (
+    CREDIT_ENTRY_DEBIT,
+    CREDIT_ENTRY_REVERSAL,
+    IDEMPOTENCY_KEY_MAX_LENGTH,
+    IDEMPOTENT_REPLAY_HEADER,
+    MAX_CHIP_BATCH_SIZE,
+    MEDIA_TYPE_EVENT_STREAM,
+    PAYMENT_TYPE_CREDIT,
+    SESSION_EVENT_CHIPS,
+    SESSION_EVENT_CLOSE,
+    SESSION_EVENT_PLAYER,
+    SESSION_EVENT_UNDO,
+)
 from ..core.datetime_utils import utc_now
-from ..core.deps import get_current_user, get_db, require_roles
+from ..core.db import async_write_transaction, write_transaction
+from ..core.deps import (
+    get_async_db,
+    get_current_user,
+    get_current_user_async,
+    get_db,
+    require_roles,
+    require_roles_async,
+)
+from ..core.event_bus import event_bus
+from ..core.principal import Principal
 from ..models.db import ChipOp, ChipPurchase, Seat, Session, Table, User
 from ..models.schemas import ChipCreateIn, SeatAssignIn, SeatOut, SessionCreateIn, SessionOut, StaffOut, UndoIn
+from ..services.credit_ledger_service import CreditLedgerService
 from ..services.credit_service import CreditService
+from ..services.daily_summary_service import DailySummaryService
+from ..services.idempotency_service import idempotency_store
+from ..services.session_totals_service import SessionTotalsService
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
@@ -131,7 +161,7 @@ def get_available_waiters(
 def get_open_session(
     table_id: int | None = Query(default=None),
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     role = _role(user)
 
@@ -164,88 +194,88 @@ def get_open_session(
 def create_session(
     payload: SessionCreateIn,
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     tid = _resolve_table_id(user, payload.table_id)
     date = payload.date or dt.date.today()
 
-    table = db.query(Table).filter(Table.id == tid).first()
-    if not table:
-        raise HTTPException(status_code=404, detail="Table not found")
+    with write_transaction(db):
+        table = db.query(Table).filter(Table.id == tid).first()
+        if not table:
+            raise HTTPException(status_code=404, detail="Table not found")
 
-    existing = (
-        db.query(Session)
-        .filter(Session.table_id == tid, Session.status == "open")
-        .order_by(Session.created_at.desc())
-        .first()
-    )
-    if existing:
-        return SessionOut.model_validate(existing)
-
-    # Validate dealer_id is required
-    if payload.dealer_id is None:
-        raise HTTPException(status_code=400, detail="Dealer is required to start a session")
-
-    # Validate dealer exists and is active
-    dealer = db.query(User).filter(
-        User.id == payload.dealer_id,
-        User.role == "dealer",
-        User.is_active == True,
-    ).first()
-    if not dealer:
-        raise HTTPException(status_code=400, detail="Invalid dealer selected")
-
-    # Validate dealer is not already assigned to an active session (exclusive assignment)
-    dealer_assigned = (
-        db.query(Session)
-        .filter(
-            Session.status == "open",
-            Session.dealer_id == payload.dealer_id,
-        )
-        .first()
-    )
-    if dealer_assigned:
-        raise HTTPException(
-            status_code=400,
-            detail="Dealer is already assigned to another active session"
+        existing = (
+            db.query(Session)
+            .filter(Session.table_id == tid, Session.status == "open")
+            .order_by(Session.created_at.desc())
+            .first()
         )
+        if existing:
+            return SessionOut.model_validate(existing)
+
+        # Validate dealer_id is required
+        if payload.dealer_id is None:
+            raise HTTPException(status_code=400, detail="Dealer is required to start a session")
 
-    # Validate waiter if provided (optional, non-exclusive)
-    waiter_id = None
-    if payload.waiter_id is not None:
-        waiter = db.query(User).filter(
-            User.id == payload.waiter_id,
-            User.role == "waiter",
+        # Validate dealer exists and is active
+        dealer = db.query(User).filter(
+            User.id == payload.dealer_id,
+            User.role == "dealer",
             User.is_active == True,
         ).first()
-        if not waiter:
-            raise HTTPException(status_code=400, detail="Invalid waiter selected")
-        waiter_id = payload.waiter_id
-
-    seats_count = int(payload.seats_count) if payload.seats_count is not None else _as_int(table.seats_count)
-
-    s = Session(
-        table_id=tid,
-        date=date,
-        status=cast(Any, "open"),
-        dealer_id=cast(Any, payload.dealer_id),
-        waiter_id=cast(Any, waiter_id),
-        chips_in_play=cast(Any, payload.chips_in_play),
-    )
-    db.add(s)
-    db.flush()
-
-    for seat_no in range(1, seats_count + 1):
-        db.add(
-            Seat(
-                session_id=cast(Any, s.id),
-                seat_no=cast(Any, seat_no),
-                player_name=cast(Any, None),
-                total=cast(Any, 0),
+        if not dealer:
+            raise HTTPException(status_code=400, detail="Invalid dealer selected")
+
+        # Validate dealer is not already assigned to an active session (exclusive assignment)
+        dealer_assigned = (
+            db.query(Session)
+            .filter(
+                Session.status == "open",
+                Session.dealer_id == payload.dealer_id,
             )
+            .first()
+        )
+        if dealer_assigned:
+            raise HTTPException(
+                status_code=400,
+                detail="Dealer is already assigned to another active session"
+            )
+
+        # Validate waiter if provided (optional, non-exclusive)
+        waiter_id = None
+        if payload.waiter_id is not None:
+            waiter = db.query(User).filter(
+                User.id == payload.waiter_id,
+                User.role == "waiter",
+                User.is_active == True,
+            ).first()
+            if not waiter:
+                raise HTTPException(status_code=400, detail="Invalid waiter selected")
+            waiter_id = payload.waiter_id
+
+        seats_count = int(payload.seats_count) if payload.seats_count is not None else _as_int(table.seats_count)
+
+        s = Session(
+            table_id=tid,
+            date=date,
+            status=cast(Any, "open"),
+            dealer_id=cast(Any, payload.dealer_id),
+            waiter_id=cast(Any, waiter_id),
+            chips_in_play=cast(Any, payload.chips_in_play),
+        )
+        db.add(s)
+        db.flush()
+        DailySummaryService.apply(db, s, sessions_count=1, open_sessions=1)
+
+        # One executemany INSERT for all seats
+        db.execute(
+            insert(Seat),
+            [
+                {"session_id": s.id, "seat_no": seat_no, "player_name": None, "total": 0}
+                for seat_no in range(1, seats_count + 1)
+            ],
         )
 
-    db.commit()
     db.refresh(s)
     return SessionOut.model_validate(s)
 
@@ -258,7 +288,7 @@ def create_session(
 def list_seats(
     session_id: str,
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     s = db.query(Session).filter(Session.id == session_id).first()
     if not s:
@@ -274,6 +304,58 @@ def list_seats(
     return [SeatOut.model_validate(x) for x in seats]
 
 
+def _publish_seats(session_id: str, event_type: str, seats: list[SeatOut]) -> None:
+    """Publish committed seat changes to the session's event stream."""
+    event_bus.publish(session_id, event_type, {"seats": [seat.model_dump() for seat in seats]})
+
+
+@router.get(
+    "/{session_id}/events",
+    response_class=StreamingResponse,
+    dependencies=[Depends(require_roles("superadmin", "dealer", "table_admin"))],
+)
+def session_events(
+    session_id: str,
+    last_event_id: str | None = Header(default=None),
+    db: DBSession = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    """
+    Server-Sent Events stream of a session's seat changes.
+
+    Events: `chips`, `player` and `undo` carry the changed seats, `close`
+    carries the closing time and the seats that were cashed out, and ends the
+    stream. `resync` means events were missed and the seats must be refetched.
+    Reconnects resume after the Last-Event-ID header. Closed sessions answer
+    204 so EventSource clients stop reconnecting.
+    """
+    closed = _session_closed(db, session_id, user)
+
+    # The stream can stay open for hours; do not hold a pooled connection for it
+    db.close()
+
+    return _session_events_response(session_id, last_event_id, closed)
+
+
+def _session_closed(db: DBSession, session_id: str, user: Principal) -> bool:
+    """Whether the session is closed, after checking the user may follow it."""
+    s = db.query(Session).filter(Session.id == session_id).first()
+    if not s:
+        raise HTTPException(status_code=404, detail="Session not found")
+    _require_session_access(user, s)
+    return s.status == "closed"
+
+
+def _session_events_response(session_id: str, last_event_id: str | None, closed: bool) -> Response:
+    if closed:
+        return Response(status_code=204)
+    return StreamingResponse(
+        event_bus.stream(session_id, last_event_id),
+        media_type=MEDIA_TYPE_EVENT_STREAM,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.put(
     "/{session_id}/seats/{seat_no}",
     response_model=SeatOut,
@@ -284,25 +366,29 @@ def assign_player(
     seat_no: int,
     payload: SeatAssignIn,
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    s = db.query(Session).filter(Session.id == session_id).first()
-    if not s:
-        raise HTTPException(status_code=404, detail="Session not found")
-    _require_session_access(user, s)
+    with write_transaction(db):
+        s = db.query(Session).filter(Session.id == session_id).first()
+        if not s:
+            raise HTTPException(status_code=404, detail="Session not found")
+        _require_session_access(user, s)
+
+        seat = (
+            db.query(Seat)
+            .filter(Seat.session_id == session_id, Seat.seat_no == seat_no)
+            .first()
+        )
+        if not seat:
+            raise HTTPException(status_code=404, detail="Seat not found")
 
-    seat = (
-        db.query(Seat)
-        .filter(Seat.session_id == session_id, Seat.seat_no == seat_no)
-        .first()
-    )
-    if not seat:
-        raise HTTPException(status_code=404, detail="Seat not found")
+        seat.player_name = cast(Any, payload.player_name)
+        CreditLedgerService.rename_player(db, session_id, seat_no, payload.player_name)
 
-    seat.player_name = cast(Any, payload.player_name)
-    db.commit()
     db.refresh(seat)
-    return SeatOut.model_validate(seat)
+    out = SeatOut.model_validate(seat)
+    _publish_seats(session_id, SESSION_EVENT_PLAYER, [out])
+    return out
 
 
 @router.get(
@@ -312,7 +398,7 @@ def assign_player(
 def get_non_cash_purchases(
     session_id: str,
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     """Get credit purchases per player in a session."""
     s = db.query(Session).filter(Session.id == session_id).first()
@@ -320,36 +406,14 @@ def get_non_cash_purchases(
         raise HTTPException(status_code=404, detail="Session not found")
     _require_session_access(user, s)
 
-    purchases = (
-        db.query(ChipPurchase)
-        .filter(
-            ChipPurchase.session_id == session_id,
-            ChipPurchase.payment_type == "credit",
-            ChipPurchase.amount > 0,
-        )
-        .all()
-    )
-
-    # Group credit by seat_no to get per-player credit
-    credit_by_seat = {}
-    for p in purchases:
-        seat_no = int(cast(int, p.seat_no))
-        amount = int(cast(int, p.amount))
-        credit_by_seat[seat_no] = credit_by_seat.get(seat_no, 0) + amount
-
-    # Get seat info to include player names
-    seats = db.query(Seat).filter(Seat.session_id == session_id).all()
-    seat_info = {int(cast(int, s.seat_no)): s for s in seats}
-
-    # Build response with player names
+    # Outstanding credit per seat is maintained by the credit ledger
     credit_list = []
     total_credit = 0
-    for seat_no, amount in sorted(credit_by_seat.items()):
-        seat = seat_info.get(seat_no)
-        player_name = seat.player_name if seat else None
+    for balance in CreditLedgerService.get_open_balances(db, [session_id]):
+        amount = int(cast(int, balance.balance))
         credit_list.append({
-            "seat_no": seat_no,
-            "player_name": player_name,
+            "seat_no": int(cast(int, balance.seat_no)),
+            "player_name": balance.player_name,
             "amount": amount
         })
         total_credit += amount
@@ -368,61 +432,200 @@ def get_non_cash_purchases(
 def add_chips(
     session_id: str,
     payload: ChipCreateIn,
+    response: Response,
+    idempotency_key: str | None = Header(default=None, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    s = db.query(Session).filter(Session.id == session_id).first()
-    if not s:
-        raise HTTPException(status_code=404, detail="Session not found")
-    _require_session_access(user, s)
-
-    seat = (
-        db.query(Seat)
-        .filter(Seat.session_id == session_id, Seat.seat_no == payload.seat_no)
-        .first()
-    )
-    if not seat:
-        raise HTTPException(status_code=404, detail="Seat not found")
+    idem = idempotency_store.begin(db, user.id, idempotency_key, "add_chips", session_id, payload.model_dump())
+    if idem.replay is not None:
+        response.headers[IDEMPOTENT_REPLAY_HEADER] = "true"
+        return idem.replay
 
-    seat_total = _as_int(seat.total)
     delta = int(payload.amount)
-    seat.total = cast(Any, seat_total + delta)
+    # Only buyins get a ChipPurchase record; cashouts are not tracked as purchases
+    purchase_type = payload.payment_type if delta > 0 else None
+
+    with write_transaction(db):
+        # Running totals and the seat total are updated in place, as increments of
+        # the stored values. The UPDATEs take the row locks (no-ops on SQLite, where
+        # BEGIN IMMEDIATE already serializes writers), the session row first, then
+        # the seat, in that order on every write path, and return the rows instead
+        # of loading them first. A zero op changes no total: its no-op assignment
+        # still locks and returns the session row.
+        s = db.scalars(
+            update(Session)
+            .where(Session.id == session_id)
+            .values(SessionTotalsService.op_values(delta, purchase_type) or {"total_buyins": Session.total_buyins})
+            .returning(Session)
+        ).first()
+        if not s:
+            raise HTTPException(status_code=404, detail="Session not found")
+        _require_session_access(user, s)
+
+        seat = db.execute(
+            update(Seat)
+            .where(Seat.session_id == session_id, Seat.seat_no == payload.seat_no)
+            .values(total=Seat.total + delta)
+            .returning(Seat.seat_no, Seat.player_name, Seat.total)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if not seat:
+            raise HTTPException(status_code=404, detail="Seat not found")
 
-    op = ChipOp(
-        session_id=cast(Any, session_id),
-        seat_no=cast(Any, payload.seat_no),
-        amount=cast(Any, delta),
-    )
-    db.add(op)
-    db.flush()
-
-    # Only create ChipPurchase record for positive amounts (buyin)
-    # Negative amounts (cashout) are not tracked as purchases
-    if delta > 0:
-        purchase = ChipPurchase(
-            table_id=_as_int(s.table_id),
-            session_id=str(cast(str, s.id)),
-            seat_no=int(payload.seat_no),
-            amount=delta,
-            chip_op_id=_as_int(op.id),
-            created_by_user_id=_as_int(user.id),
-            payment_type=cast(Any, payload.payment_type),
+        op = ChipOp(
+            session_id=cast(Any, session_id),
+            seat_no=cast(Any, payload.seat_no),
+            amount=cast(Any, delta),
+        )
+        db.add(op)
+        db.flush()
+
+        if purchase_type is not None:
+            purchase = ChipPurchase(
+                table_id=_as_int(s.table_id),
+                session_id=str(cast(str, s.id)),
+                seat_no=int(payload.seat_no),
+                amount=delta,
+                chip_op_id=_as_int(op.id),
+                created_by_user_id=_as_int(user.id),
+                payment_type=cast(Any, purchase_type),
+            )
+            db.add(purchase)
+
+            if purchase_type == PAYMENT_TYPE_CREDIT:
+                CreditLedgerService.record(db, s, [{
+                    "seat_no": int(payload.seat_no),
+                    "player_name": seat.player_name,
+                    "entry_type": CREDIT_ENTRY_DEBIT,
+                    "amount": delta,
+                    "chip_op_id": _as_int(op.id),
+                    "created_by_user_id": _as_int(user.id),
+                }])
+
+        # The daily summary moves by the same deltas as the session totals
+        is_credit = purchase_type == PAYMENT_TYPE_CREDIT
+        DailySummaryService.apply(
+            db,
+            s,
+            buyin_cash=delta if purchase_type is not None and not is_credit else 0,
+            buyin_credit=delta if is_credit else 0,
+            player_balance=delta,
         )
-        db.add(purchase)
 
-        # Auto-increment chips_in_play if total chips bought exceed current chips_in_play
-        current_chips_in_play = _as_int(s.chips_in_play)
-        total_chips_bought = sum(
-            int(cast(int, p.amount))
-            for p in db.query(ChipPurchase).filter(ChipPurchase.session_id == session_id).all()
-        ) + delta  # Include the current purchase
+        out = SeatOut.model_validate(seat)
+        idem.save(db, out.model_dump())
 
-        if total_chips_bought > current_chips_in_play:
-            s.chips_in_play = cast(Any, total_chips_bought)
+    idem.remember()
+    _publish_seats(session_id, SESSION_EVENT_CHIPS, [out])
+    return out
 
-    db.commit()
-    db.refresh(seat)
-    return SeatOut.model_validate(seat)
+
+@router.post(
+    "/{session_id}/chips/batch",
+    response_model=list[SeatOut],
+    dependencies=[Depends(require_roles("superadmin", "dealer", "table_admin"))],
+)
+def add_chips_batch(
+    session_id: str,
+    response: Response,
+    payload: list[ChipCreateIn] = Body(..., min_length=1, max_length=MAX_CHIP_BATCH_SIZE),
+    idempotency_key: str | None = Header(default=None, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+    db: DBSession = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    """
+    Apply several chip operations atomically in one transaction.
+
+    Operations are applied in order; chip ops and purchases are written with
+    bulk inserts. Returns the updated seats ordered by seat number.
+    """
+    idem = idempotency_store.begin(
+        db, user.id, idempotency_key, "add_chips_batch", session_id, [item.model_dump() for item in payload]
+    )
+    if idem.replay is not None:
+        response.headers[IDEMPOTENT_REPLAY_HEADER] = "true"
+        return idem.replay
+
+    with write_transaction(db):
+        # Locked session row, then seat rows, same as add_chips
+        s = db.query(Session).filter(Session.id == session_id).with_for_update().first()
+        if not s:
+            raise HTTPException(status_code=404, detail="Session not found")
+        _require_session_access(user, s)
+        totals_before = DailySummaryService.snapshot(s)
+
+        seat_nos = {item.seat_no for item in payload}
+        seats = {
+            _as_int(seat.seat_no): seat
+            for seat in db.query(Seat)
+            .filter(Seat.session_id == session_id, Seat.seat_no.in_(seat_nos))
+            .order_by(Seat.seat_no.asc())
+            .with_for_update()
+            .all()
+        }
+        if len(seats) != len(seat_nos):
+            raise HTTPException(status_code=404, detail="Seat not found")
+
+        # One INSERT for all chip ops; the insert sentinel of chip_ops keeps the
+        # returned IDs in item order on every backend
+        op_ids = db.scalars(
+            insert(ChipOp).returning(ChipOp.id, sort_by_parameter_order=True),
+            [
+                {"session_id": session_id, "seat_no": item.seat_no, "amount": int(item.amount), "created_at": utc_now()}
+                for item in payload
+            ],
+        ).all()
+
+        purchase_rows = []
+        credit_entries = []
+        for item, op_id in zip(payload, op_ids):
+            delta = int(item.amount)
+            seat = seats[item.seat_no]
+            seat.total = cast(Any, _as_int(seat.total) + delta)
+
+            # Only buyins are tracked as purchases, same as add_chips
+            if delta > 0:
+                purchase_rows.append({
+                    "table_id": _as_int(s.table_id),
+                    "session_id": str(cast(str, s.id)),
+                    "seat_no": int(item.seat_no),
+                    "amount": delta,
+                    "chip_op_id": int(op_id),
+                    "created_at": utc_now(),
+                    "created_by_user_id": _as_int(user.id),
+                    "payment_type": item.payment_type,
+                })
+                if item.payment_type == PAYMENT_TYPE_CREDIT:
+                    credit_entries.append({
+                        "seat_no": int(item.seat_no),
+                        "player_name": seat.player_name,
+                        "entry_type": CREDIT_ENTRY_DEBIT,
+                        "amount": delta,
+                        "chip_op_id": int(op_id),
+                        "created_by_user_id": _as_int(user.id),
+                    })
+            SessionTotalsService.record_op(s, delta, item.payment_type if delta > 0 else None)
+
+        if purchase_rows:
+            db.execute(insert(ChipPurchase), purchase_rows)
+            CreditLedgerService.record(db, s, credit_entries)
+
+            # Auto-increment chips_in_play if total chips bought exceed current chips_in_play
+            total_chips_bought = SessionTotalsService.purchases_total(s)
+            if total_chips_bought > _as_int(s.chips_in_play):
+                s.chips_in_play = cast(Any, total_chips_bought)
+
+        DailySummaryService.record_session_change(
+            db, s, totals_before, player_balance=sum(int(item.amount) for item in payload)
+        )
+
+        out = [SeatOut.model_validate(seats[seat_no]) for seat_no in sorted(seats)]
+        idem.save(db, [seat.model_dump() for seat in out])
+
+    idem.remember()
+    _publish_seats(session_id, SESSION_EVENT_CHIPS, out)
+    return out
 
 
 @router.post(
@@ -434,43 +637,61 @@ def undo_last(
     session_id: str,
     payload: UndoIn,
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    s = db.query(Session).filter(Session.id == session_id).first()
-    if not s:
-        raise HTTPException(status_code=404, detail="Session not found")
-    _require_session_access(user, s)
-
-    seat = (
-        db.query(Seat)
-        .filter(Seat.session_id == session_id, Seat.seat_no == payload.seat_no)
-        .first()
-    )
-    if not seat:
-        raise HTTPException(status_code=404, detail="Seat not found")
-
-    last = (
-        db.query(ChipOp)
-        .filter(ChipOp.session_id == session_id, ChipOp.seat_no == payload.seat_no)
-        .order_by(ChipOp.id.desc())
-        .first()
-    )
-    if not last:
-        raise HTTPException(status_code=400, detail="No history")
-
-    seat.total = cast(Any, _as_int(seat.total) - _as_int(last.amount))
+    with write_transaction(db):
+        # Locked session row, then the seat, same as add_chips: the op undone is
+        # then the seat's last one until commit
+        s = db.query(Session).filter(Session.id == session_id).with_for_update().first()
+        if not s:
+            raise HTTPException(status_code=404, detail="Session not found")
+        _require_session_access(user, s)
+        totals_before = DailySummaryService.snapshot(s)
+
+        seat = (
+            db.query(Seat)
+            .filter(Seat.session_id == session_id, Seat.seat_no == payload.seat_no)
+            .with_for_update()
+            .first()
+        )
+        if not seat:
+            raise HTTPException(status_code=404, detail="Seat not found")
 
-    purchase = db.query(ChipPurchase).filter(ChipPurchase.chip_op_id == last.id).first()
-    if purchase:
-        db.delete(purchase)
+        last = (
+            db.query(ChipOp)
+            .filter(ChipOp.session_id == session_id, ChipOp.seat_no == payload.seat_no)
+            .order_by(ChipOp.id.desc())
+            .first()
+        )
+        if not last:
+            raise HTTPException(status_code=400, detail="No history")
+
+        seat.total = cast(Any, _as_int(seat.total) - _as_int(last.amount))
+
+        purchase = db.query(ChipPurchase).filter(ChipPurchase.chip_op_id == last.id).first()
+        SessionTotalsService.revert_op(s, last, purchase)
+        if purchase:
+            if purchase.payment_type == PAYMENT_TYPE_CREDIT:
+                CreditLedgerService.record(db, s, [{
+                    "seat_no": int(payload.seat_no),
+                    "player_name": seat.player_name,
+                    "entry_type": CREDIT_ENTRY_REVERSAL,
+                    "amount": -_as_int(purchase.amount),
+                    "chip_op_id": _as_int(last.id),
+                    "created_by_user_id": _as_int(user.id),
+                }])
+            db.delete(purchase)
+
+        db.delete(last)
+        DailySummaryService.record_session_change(db, s, totals_before, player_balance=-_as_int(last.amount))
 
-    db.delete(last)
-    db.commit()
     db.refresh(seat)
-    return SeatOut.model_validate(seat)
+    out = SeatOut.model_validate(seat)
+    _publish_seats(session_id, SESSION_EVENT_UNDO, [out])
+    return out
 
 
-def _validate_and_get_session(db: DBSession, session_id: str, user: User) -> Session:
+def _validate_and_get_session(db: DBSession, session_id: str, user: Principal) -> Session:
     """
     Validate session exists and user has access to it.
     
@@ -485,96 +706,81 @@ def _validate_and_get_session(db: DBSession, session_id: str, user: User) -> Ses
     Raises:
         HTTPException: If session not found or user doesn't have access
     """
-    s = db.query(Session).filter(Session.id == session_id).first()
+    # Locked like add_chips: closing rewrites the seats and running totals
+    s = db.query(Session).filter(Session.id == session_id).with_for_update().first()
     if not s:
         raise HTTPException(status_code=404, detail="Session not found")
     _require_session_access(user, s)
     return s
 
 
-def _get_session_seats(db: DBSession, session_id: str) -> list[Seat]:
+def _get_seats_with_chips(db: DBSession, session_id: str) -> list[tuple[int, str | None, int]]:
     """
-    Get all seats for a session.
+    Get the seats of a session that still hold chips.
     
     Args:
         db: Database session
         session_id: Session ID
         
     Returns:
-        List of seats
+        List of (seat_no, player_name, total) ordered by seat number
     """
-    return db.query(Seat).filter(Seat.session_id == session_id).all()
-
-
-def _close_seat_credit(
-    db: DBSession,
-    session: Session,
-    seat: Seat,
-    seat_total: int,
-    user: User,
-) -> int:
-    """
-    Close credit for a seat and return the amount closed.
-    
-    Args:
-        db: Database session
-        session: Session object
-        seat: Seat object
-        seat_total: Total chips in seat
-        user: Current user
-        
-    Returns:
-        Amount of credit that was closed
-    """
-    if seat_total <= 0:
-        return 0
-    
-    # Close credit using the service
-    credit_closed = CreditService.close_credit_for_session(db, session, seat, user)
-    
-    return credit_closed
+    rows = (
+        db.query(Seat.seat_no, Seat.player_name, Seat.total)
+        .filter(Seat.session_id == session_id, Seat.total > 0)
+        .order_by(Seat.seat_no.asc())
+        .all()
+    )
+    return [(int(seat_no), player_name, int(total)) for seat_no, player_name, total in rows]
 
 
-def _cashout_seat_chips(
+def _cashout_seats_chips(
     db: DBSession,
     session: Session,
-    seat: Seat,
-    chips_to_cashout: int,
-    user: User,
+    cashouts: list[tuple[int, int]],
+    user: Principal,
 ) -> None:
     """
-    Cash out chips for a seat.
+    Cash out chips for several seats with bulk inserts.
     
     Args:
         db: Database session
         session: Session object
-        seat: Seat object
-        chips_to_cashout: Number of chips to cash out (positive number)
+        cashouts: (seat_no, chips_to_cashout) pairs, chips as positive numbers
         user: Current user
     """
-    if chips_to_cashout <= 0:
+    if not cashouts:
         return
     
-    # Create chip operation for cashout
-    op = ChipOp(
-        session_id=cast(Any, session.id),
-        seat_no=cast(Any, seat.seat_no),
-        amount=cast(Any, -chips_to_cashout),  # Negative for cashout
-    )
-    db.add(op)
-    db.flush()
+    # Create chip operations for cashouts (negative amounts), IDs in cashout order
+    op_ids = db.scalars(
+        insert(ChipOp).returning(ChipOp.id, sort_by_parameter_order=True),
+        [
+            {"session_id": session.id, "seat_no": seat_no, "amount": -chips, "created_at": utc_now()}
+            for seat_no, chips in cashouts
+        ],
+    ).all()
     
-    # Create ChipPurchase record for cashout (negative amount = expense)
-    purchase = ChipPurchase(
-        table_id=_as_int(session.table_id),
-        session_id=str(cast(str, session.id)),
-        seat_no=int(seat.seat_no),
-        amount=-chips_to_cashout,  # Negative for cashout
-        chip_op_id=_as_int(op.id),
-        created_by_user_id=_as_int(user.id),
-        payment_type=cast(Any, "cash"),  # Cashouts are always cash
+    # Create ChipPurchase records for cashouts (negative amount = expense)
+    db.execute(
+        insert(ChipPurchase),
+        [
+            {
+                "table_id": _as_int(session.table_id),
+                "session_id": str(cast(str, session.id)),
+                "seat_no": seat_no,
+                "amount": -chips,
+                "chip_op_id": int(op_id),
+                "created_at": utc_now(),
+                "created_by_user_id": _as_int(user.id),
+                "payment_type": "cash",  # Cashouts are always cash
+            }
+            for (seat_no, chips), op_id in zip(cashouts, op_ids)
+        ],
     )
-    db.add(purchase)
+
+    for _, chips in cashouts:
+        SessionTotalsService.record_op(session, -chips, "cash")
 
 
 def _finalize_session(db: DBSession, session: Session) -> None:
@@ -596,38 +802,258 @@ def _finalize_session(db: DBSession, session: Session) -> None:
 )
 def close_session(
     session_id: str,
+    response: Response,
+    idempotency_key: str | None = Header(default=None, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
     db: DBSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    # Validate session and user access
-    s = _validate_and_get_session(db, session_id, user)
-    
-    # Get all seats for this session
-    seats = _get_session_seats(db, session_id)
-    
-    # Cash out all player chips
-    for seat in seats:
-        seat_total = _as_int(seat.total)
-        if seat_total > 0:
-            # Close credit first (if any)
-            credit_closed = _close_seat_credit(db, s, seat, seat_total, user)
-            
-            # Calculate remaining chips after credit reduction
-            remaining_chips = seat_total - credit_closed
-            
-            # Cash out remaining chips (if any)
+    # A retried close finds the session already closed, so replay before validating
+    idem = idempotency_store.begin(db, user.id, idempotency_key, "close_session", session_id)
+    if idem.replay is not None:
+        response.headers[IDEMPOTENT_REPLAY_HEADER] = "true"
+        return idem.replay
+
+    with write_transaction(db):
+        # Validate session and user access
+        s = _validate_and_get_session(db, session_id, user)
+        totals_before = DailySummaryService.snapshot(s)
+
+        seats = _get_seats_with_chips(db, session_id)
+
+        # Close credit first (if any); running session totals tell us whether any is left
+        credit_by_seat: dict[int, int] = {}
+        if _as_int(s.buyin_credit) > 0:
+            credit_by_seat = CreditService.close_credit_for_session(
+                db, s, [(seat_no, player_name) for seat_no, player_name, _ in seats], user
+            )
+
+        # Cash out chips remaining after credit reduction
+        cashouts = []
+        for seat_no, _, seat_total in seats:
+            remaining_chips = seat_total - credit_by_seat.get(seat_no, 0)
             if remaining_chips > 0:
-                _cashout_seat_chips(db, s, seat, remaining_chips, user)
-            
-            # Set seat total to 0 after cashing out
-            seat.total = cast(Any, 0)
-    
-    # Finalize session
-    _finalize_session(db, s)
-    
-    db.commit()
-    db.refresh(s)
-    return SessionOut.model_validate(s)
+                cashouts.append((seat_no, remaining_chips))
+        _cashout_seats_chips(db, s, cashouts, user)
+
+        # Set seat totals to 0 after cashing out
+        if seats:
+            db.execute(
+                update(Seat)
+                .where(Seat.session_id == session_id, Seat.total > 0)
+                .values(total=0)
+                .execution_options(synchronize_session=False)
+            )
+
+        # Seats holding chips are zeroed; the session leaves the open count
+        DailySummaryService.record_session_change(
+            db,
+            s,
+            totals_before,
+            player_balance=-sum(seat_total for _, _, seat_total in seats),
+            open_sessions=-1 if s.status == "open" else 0,
+        )
+
+        # Finalize session
+        _finalize_session(db, s)
+
+        db.flush()
+        db.refresh(s)
+        out = SessionOut.model_validate(s)
+        idem.save(db, out.model_dump(mode="json"))
+
+    idem.remember()
+    event_bus.publish(session_id, SESSION_EVENT_CLOSE, {
+        "closed_at": out.closed_at.isoformat() if out.closed_at else None,
+        "seats": [
+            SeatOut(seat_no=seat_no, player_name=player_name, total=0).model_dump()
+            for seat_no, player_name, _ in seats
+        ],
+    })
+    return out
 
 
+# Async handlers (DB_ASYNC), mounted instead of the ones above. Each runs its
+# sync counterpart through AsyncSession.run_sync: statements are awaited on the
+# event loop instead of holding a threadpool thread, and both modes share one
+# implementation while routes are migrated.
+async_router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
+_SESSION_ROLES = ("superadmin", "dealer", "table_admin")
+_MANAGER_ROLES = ("superadmin", "table_admin")
+
+
+@async_router.get(
+    "/available-dealers",
+    response_model=list[StaffOut],
+    dependencies=[Depends(require_roles_async(*_MANAGER_ROLES))],
+)
+async def get_available_dealers_async(db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(get_available_dealers)
+
+
+@async_router.get(
+    "/available-waiters",
+    response_model=list[StaffOut],
+    dependencies=[Depends(require_roles_async(*_MANAGER_ROLES))],
+)
+async def get_available_waiters_async(db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(get_available_waiters)
+
+
+@async_router.get(
+    "/open",
+    response_model=SessionOut | None,
+    dependencies=[Depends(require_roles_async(*_SESSION_ROLES))],
+)
+async def get_open_session_async(
+    table_id: int | None = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    return await db.run_sync(lambda sync_db: get_open_session(table_id, db=sync_db, user=user))
+
+
+@async_router.post(
+    "",
+    response_model=SessionOut,
+    dependencies=[Depends(require_roles_async(*_MANAGER_ROLES))],
+)
+async def create_session_async(
+    payload: SessionCreateIn,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    async with async_write_transaction(db):
+        return await db.run_sync(lambda sync_db: create_session(payload, db=sync_db, user=user))
+
+
+@async_router.get(
+    "/{session_id}/seats",
+    response_model=list[SeatOut],
+    dependencies=[Depends(require_roles_async(*_SESSION_ROLES))],
+)
+async def list_seats_async(
+    session_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    return await db.run_sync(lambda sync_db: list_seats(session_id, db=sync_db, user=user))
+
+
+@async_router.get(
+    "/{session_id}/events",
+    response_class=StreamingResponse,
+    dependencies=[Depends(require_roles_async(*_SESSION_ROLES))],
+)
+async def session_events_async(
+    session_id: str,
+    last_event_id: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    closed = await db.run_sync(lambda sync_db: _session_closed(sync_db, session_id, user))
+    # The stream can stay open for hours: end the read transaction to give back the
+    # pooled connection; the session itself stays with get_async_db
+    await db.rollback()
+    return _session_events_response(session_id, last_event_id, closed)
+
+
+@async_router.put(
+    "/{session_id}/seats/{seat_no}",
+    response_model=SeatOut,
+    dependencies=[Depends(require_roles_async(*_SESSION_ROLES))],
+)
+async def assign_player_async(
+    session_id: str,
+    seat_no: int,
+    payload: SeatAssignIn,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    async with async_write_transaction(db):
+        return await db.run_sync(
+            lambda sync_db: assign_player(session_id, seat_no, payload, db=sync_db, user=user)
+        )
+
+
+@async_router.get(
+    "/{session_id}/non-cash-purchases",
+    dependencies=[Depends(require_roles_async(*_SESSION_ROLES))],
+)
+async def get_non_cash_purchases_async(
+    session_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    return await db.run_sync(lambda sync_db: get_non_cash_purchases(session_id, db=sync_db, user=user))
+
+
+@async_router.post(
+    "/{session_id}/chips",
+    response_model=SeatOut,
+    dependencies=[Depends(require_roles_async(*_SESSION_ROLES))],
+)
+async def add_chips_async(
+    session_id: str,
+    payload: ChipCreateIn,
+    response: Response,
+    idempotency_key: str | None = Header(default=None, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    async with async_write_transaction(db):
+        return await db.run_sync(
+            lambda sync_db: add_chips(session_id, payload, response, idempotency_key, db=sync_db, user=user)
+        )
+
+
+@async_router.post(
+    "/{session_id}/chips/batch",
+    response_model=list[SeatOut],
+    dependencies=[Depends(require_roles_async(*_SESSION_ROLES))],
+)
+async def add_chips_batch_async(
+    session_id: str,
+    response: Response,
+    payload: list[ChipCreateIn] = Body(..., min_length=1, max_length=MAX_CHIP_BATCH_SIZE),
+    idempotency_key: str | None = Header(default=None, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    async with async_write_transaction(db):
+        return await db.run_sync(
+            lambda sync_db: add_chips_batch(session_id, response, payload, idempotency_key, db=sync_db, user=user)
+        )
+
+
+@async_router.post(
+    "/{session_id}/chips/undo",
+    response_model=SeatOut,
+    dependencies=[Depends(require_roles_async(*_SESSION_ROLES))],
+)
+async def undo_last_async(
+    session_id: str,
+    payload: UndoIn,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    async with async_write_transaction(db):
+        return await db.run_sync(lambda sync_db: undo_last(session_id, payload, db=sync_db, user=user))
+
+
+@async_router.post(
+    "/{session_id}/close",
+    response_model=SessionOut,
+    dependencies=[Depends(require_roles_async(*_SESSION_ROLES))],
+)
+async def close_session_async(
+    session_id: str,
+    response: Response,
+    idempotency_key: str | None = Header(default=None, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    async with async_write_transaction(db):
+        return await db.run_sync(
+            lambda sync_db: close_session(session_id, response, idempotency_key, db=sync_db, user=user)
+        )
@@ -0,0 +1,129 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.cli migrate [--status]
+    python -m app.cli reconcile-totals [--session-id ID ...]
+    python -m app.cli check-query-plans [--verbose]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+
+from .core.datetime_utils import working_day_of
+from .core.db import SessionLocal, engine, transaction
+from .core.migrations import LATEST_VERSION, get_schema_version, migrate
+from .core.query_plans import check_query_plans
+from .models.db import Session
+from .services.daily_summary_service import DailySummaryService
+from .services.session_totals_service import SessionTotalsService
+
+
+def run_migrations(status_only: bool) -> int:
+    """Apply pending schema migrations, or just report the schema version."""
+    version = get_schema_version(engine)
+    if status_only:
+        print(f"Schema version {version} (latest {LATEST_VERSION})")
+        return 0 if version >= LATEST_VERSION else 1
+
+    version = migrate(engine)
+    print(f"Schema is at version {version}")
+    return 0
+
+
+def reconcile_totals(session_ids: list[str] | None) -> int:
+    """
+    Rebuild running chip totals of sessions from chip_ops and chip_purchases,
+    then the daily summary rows of their working days, which derive from them.
+    """
+    db = SessionLocal()
+    try:
+        with transaction(db):
+            count = SessionTotalsService.rebuild(db, session_ids)
+            if session_ids is None:
+                days = DailySummaryService.rebuild_all(db)
+            else:
+                working_days = {
+                    working_day_of(created_at)
+                    for (created_at,) in db.query(Session.created_at).filter(Session.id.in_(session_ids))
+                }
+                working_days.discard(None)
+                for day in sorted(working_days):
+                    DailySummaryService.rebuild_day(db, day)
+                days = len(working_days)
+    finally:
+        db.close()
+    print(f"Reconciled chip totals for {count} session(s) and the daily summary of {days} working day(s)")
+    return 0
+
+
+def run_query_plan_check(verbose: bool) -> int:
+    """Fail (exit code 1) if a hot query does a full table scan or misses its index."""
+    if engine.dialect.name != "sqlite":
+        print(f"Query plan check supports SQLite only (database is {engine.dialect.name})")
+        return 0
+
+    migrate(engine)
+    with engine.connect() as conn:
+        results = check_query_plans(conn)
+
+    failed = 0
+    for result in results:
+        if result["problems"]:
+            failed += 1
+            print(f"FAIL  {result['name']}: {'; '.join(result['problems'])}")
+            print(f"      plan: {'; '.join(result['plan'])}")
+        elif verbose:
+            print(f"ok    {result['name']}: {'; '.join(result['plan'])}")
+    print(f"{len(results) - failed}/{len(results)} hot queries use their index")
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_cmd = commands.add_parser("migrate", help="Apply pending schema migrations")
+    migrate_cmd.add_argument(
+        "--status",
+        action="store_true",
+        help="Only print the schema version (exit code 1 if migrations are pending)",
+    )
+
+    reconcile = commands.add_parser(
+        "reconcile-totals",
+        help="Rebuild running session chip totals from chip_ops, and the daily summary of their days",
+    )
+    reconcile.add_argument(
+        "--session-id",
+        action="append",
+        dest="session_ids",
+        help="Session to rebuild (repeatable, default: all sessions)",
+    )
+
+    plans = commands.add_parser(
+        "check-query-plans",
+        help="Explain the hot queries and fail if any does a full table scan or misses its index",
+    )
+    plans.add_argument("--verbose", action="store_true", help="Print the plans of all queries")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+
+    if args.command == "migrate":
+        return run_migrations(args.status)
+
+    if args.command == "reconcile-totals":
+        return reconcile_totals(args.session_ids)
+
+    if args.command == "check-query-plans":
+        return run_query_plan_check(args.verbose)
+
+    parser.error(f"Unknown command: {args.command}")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
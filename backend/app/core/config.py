@@ -3,10 +3,36 @@ from __future__ import annotations
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from .constants import (
+    AUTH_CACHE_DEFAULT_MAX_SIZE,
+    AUTH_CACHE_DEFAULT_TTL_SECONDS,
     DEFAULT_CORS_ORIGINS,
+    DEFAULT_DB_MAX_OVERFLOW,
+    DEFAULT_DB_POOL_RECYCLE_SECONDS,
+    DEFAULT_DB_POOL_SIZE,
+    DEFAULT_DB_POOL_TIMEOUT_SECONDS,
     DEFAULT_DB_URL,
+    DEFAULT_EVENTS_HISTORY_SESSIONS,
+    DEFAULT_EVENTS_HISTORY_SIZE,
+    DEFAULT_EVENTS_QUEUE_SIZE,
+    DEFAULT_IDEMPOTENCY_CACHE_MAX_SIZE,
+    DEFAULT_IDEMPOTENCY_TTL_SECONDS,
+    DEFAULT_REPORT_CACHE_DIR,
+    DEFAULT_REPORT_CACHE_MAX_BYTES,
+    DEFAULT_SQL_DEBUG_REPEAT_THRESHOLD,
+    DEFAULT_SQLITE_BUSY_TIMEOUT_MS,
+    DEFAULT_SQLITE_CACHE_SIZE,
+    DEFAULT_SQLITE_JOURNAL_MODE,
+    DEFAULT_SQLITE_MMAP_SIZE,
+    DEFAULT_SQLITE_SYNCHRONOUS,
+    DEFAULT_SQLITE_TEMP_STORE,
     JWT_ALGORITHM,
+    PASSWORD_HASH_DEFAULT_MAX_PENDING,
+    PASSWORD_HASH_DEFAULT_ROUNDS,
+    PASSWORD_HASH_DEFAULT_WORKERS,
     JWT_DEFAULT_EXPIRES_MINUTES,
+    VALID_SQLITE_JOURNAL_MODES,
+    VALID_SQLITE_SYNCHRONOUS,
+    VALID_SQLITE_TEMP_STORES,
 )
 
 
@@ -15,12 +41,70 @@ class Settings(BaseSettings):
 
     DB_URL: str = DEFAULT_DB_URL
 
+    DB_POOL_SIZE: int = DEFAULT_DB_POOL_SIZE
+    DB_MAX_OVERFLOW: int = DEFAULT_DB_MAX_OVERFLOW
+    DB_POOL_TIMEOUT_SECONDS: int = DEFAULT_DB_POOL_TIMEOUT_SECONDS
+    # Server databases: test connections on checkout and replace them after this age,
+    # so connections dropped by the server or a proxy (pgbouncer, failover) are not handed out
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_RECYCLE_SECONDS: int = DEFAULT_DB_POOL_RECYCLE_SECONDS
+
+    SQLITE_JOURNAL_MODE: str = DEFAULT_SQLITE_JOURNAL_MODE
+    SQLITE_SYNCHRONOUS: str = DEFAULT_SQLITE_SYNCHRONOUS
+    SQLITE_BUSY_TIMEOUT_MS: int = DEFAULT_SQLITE_BUSY_TIMEOUT_MS
+    SQLITE_CACHE_SIZE: int = DEFAULT_SQLITE_CACHE_SIZE
+    SQLITE_MMAP_SIZE: int = DEFAULT_SQLITE_MMAP_SIZE
+    SQLITE_TEMP_STORE: str = DEFAULT_SQLITE_TEMP_STORE
+    SQLITE_FOREIGN_KEYS: bool = True
+
+    # Apply pending schema migrations on startup (otherwise run `python -m app.cli migrate`)
+    DB_AUTO_MIGRATE: bool = True
+
+    # Serialize write transactions inside each worker process
+    DB_SERIALIZE_WRITES: bool = False
+
+    # Serve the auth, session and report routes with async handlers on an async
+    # engine (aiosqlite/asyncpg, same DB_URL and pool sizes) instead of the threadpool
+    DB_ASYNC: bool = False
+
     JWT_SECRET: str
     JWT_ALGORITHM: str = JWT_ALGORITHM
     JWT_EXPIRES_MINUTES: int = JWT_DEFAULT_EXPIRES_MINUTES
 
+    # Password hashing cost (existing hashes are rehashed on login when it changes)
+    PASSWORD_HASH_ROUNDS: int = PASSWORD_HASH_DEFAULT_ROUNDS
+    # Dedicated login hashing pool: worker threads and max logins waiting for one
+    PASSWORD_HASH_WORKERS: int = PASSWORD_HASH_DEFAULT_WORKERS
+    PASSWORD_HASH_MAX_PENDING: int = PASSWORD_HASH_DEFAULT_MAX_PENDING
+
+    # Cache of active users used by get_current_user (TTL 0 disables it)
+    AUTH_CACHE_TTL_SECONDS: float = AUTH_CACHE_DEFAULT_TTL_SECONDS
+    AUTH_CACHE_MAX_SIZE: int = AUTH_CACHE_DEFAULT_MAX_SIZE
+
     CORS_ORIGINS: str = DEFAULT_CORS_ORIGINS
 
+    # Cache of XLSX reports for finished working days (max size 0 disables it)
+    REPORT_CACHE_DIR: str = DEFAULT_REPORT_CACHE_DIR
+    REPORT_CACHE_MAX_BYTES: int = DEFAULT_REPORT_CACHE_MAX_BYTES
+
+    # Stored responses of requests sent with an Idempotency-Key (TTL 0 disables it)
+    IDEMPOTENCY_TTL_SECONDS: int = DEFAULT_IDEMPOTENCY_TTL_SECONDS
+    IDEMPOTENCY_CACHE_MAX_SIZE: int = DEFAULT_IDEMPOTENCY_CACHE_MAX_SIZE
+
+    # Session event stream: per-subscriber queue and per-session resume history
+    EVENTS_QUEUE_SIZE: int = DEFAULT_EVENTS_QUEUE_SIZE
+    EVENTS_HISTORY_SIZE: int = DEFAULT_EVENTS_HISTORY_SIZE
+    EVENTS_HISTORY_SESSIONS: int = DEFAULT_EVENTS_HISTORY_SESSIONS
+
+    # Prometheus text endpoint at /metrics (per worker process, unauthenticated)
+    METRICS_ENABLED: bool = True
+
+    # SQL debug mode (app.core.sql_debug): per-route statement budgets and repeated
+    # statement detection, logged as warnings or, when strict, failing the request
+    SQL_DEBUG: bool = False
+    SQL_DEBUG_STRICT: bool = False
+    SQL_DEBUG_REPEAT_THRESHOLD: int = DEFAULT_SQL_DEBUG_REPEAT_THRESHOLD
+
     SUPERADMIN_USERNAME: str
     SUPERADMIN_PASSWORD: str
 
@@ -51,6 +135,21 @@ def get_settings() -> Settings:
             "Please set it in your .env file or environment variables."
         )
     
+    if settings.SQLITE_JOURNAL_MODE.upper() not in VALID_SQLITE_JOURNAL_MODES:
+        raise ValueError(
+            f"SQLITE_JOURNAL_MODE must be one of: {', '.join(VALID_SQLITE_JOURNAL_MODES)}"
+        )
+
+    if settings.SQLITE_SYNCHRONOUS.upper() not in VALID_SQLITE_SYNCHRONOUS:
+        raise ValueError(
+            f"SQLITE_SYNCHRONOUS must be one of: {', '.join(VALID_SQLITE_SYNCHRONOUS)}"
+        )
+
+    if settings.SQLITE_TEMP_STORE.upper() not in VALID_SQLITE_TEMP_STORES:
+        raise ValueError(
+            f"SQLITE_TEMP_STORE must be one of: {', '.join(VALID_SQLITE_TEMP_STORES)}"
+        )
+    
     return settings
 
 
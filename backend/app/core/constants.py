@@ -18,10 +18,22 @@ DEFAULT_SEATS_COUNT = 24
 MIN_SEATS_COUNT = 1
 MAX_SEATS_COUNT = 100
 
+# Chip operations
+MAX_CHIP_BATCH_SIZE = 200
+
 # JWT settings
 JWT_DEFAULT_EXPIRES_MINUTES = 60 * 24 * 7  # 7 days
 JWT_ALGORITHM = "HS256"
 
+# Password hashing (pbkdf2_sha256)
+PASSWORD_HASH_DEFAULT_ROUNDS = 29000  # passlib default
+PASSWORD_HASH_DEFAULT_WORKERS = 2
+PASSWORD_HASH_DEFAULT_MAX_PENDING = 32
+
+# Authenticated user cache
+AUTH_CACHE_DEFAULT_TTL_SECONDS = 30
+AUTH_CACHE_DEFAULT_MAX_SIZE = 1024
+
 # User roles
 ROLE_SUPERADMIN = "superadmin"
 ROLE_TABLE_ADMIN = "table_admin"
@@ -42,6 +54,11 @@ PAYMENT_TYPE_CREDIT = "credit"
 
 VALID_PAYMENT_TYPES = [PAYMENT_TYPE_CASH, PAYMENT_TYPE_CREDIT]
 
+# Credit ledger entry types
+CREDIT_ENTRY_DEBIT = "debit"  # Credit buy-in
+CREDIT_ENTRY_REPAYMENT = "repayment"  # Credit closed with a balance adjustment
+CREDIT_ENTRY_REVERSAL = "reversal"  # Credit buy-in undone
+
 # Table name constraints
 TABLE_NAME_MIN_LENGTH = 1
 TABLE_NAME_MAX_LENGTH = 120
@@ -67,9 +84,71 @@ VALID_EXPORT_FORMATS = [EXPORT_FORMAT_TSV, EXPORT_FORMAT_CSV]
 # Export media types
 MEDIA_TYPE_TSV = "text/tab-separated-values"
 MEDIA_TYPE_CSV = "text/csv"
+MEDIA_TYPE_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MEDIA_TYPE_EVENT_STREAM = "text/event-stream"
+
+# Keyset pagination: response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Longest date range accepted by the range reports (days)
+MAX_REPORT_RANGE_DAYS = 366
+
+# XLSX report generation (files above the spool size are buffered on disk)
+XLSX_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+XLSX_STREAM_CHUNK_BYTES = 64 * 1024
+
+# Rendered report cache
+DEFAULT_REPORT_CACHE_DIR = "./report_cache"
+DEFAULT_REPORT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Idempotency-Key header on chip operations
+IDEMPOTENCY_KEY_MAX_LENGTH = 128
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+DEFAULT_IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_IDEMPOTENCY_CACHE_MAX_SIZE = 1024
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = 10 * 60
+
+# Session event stream (SSE)
+SESSION_EVENT_CHIPS = "chips"  # Seat totals changed
+SESSION_EVENT_PLAYER = "player"  # Player assigned to a seat
+SESSION_EVENT_UNDO = "undo"  # Last chip operation of a seat undone
+SESSION_EVENT_CLOSE = "close"  # Session closed, last event of a stream
+SESSION_EVENT_RESYNC = "resync"  # Events were lost, refetch the seats
+DEFAULT_EVENTS_QUEUE_SIZE = 256  # Undelivered events per subscriber
+DEFAULT_EVENTS_HISTORY_SIZE = 512  # Events kept per session for Last-Event-ID resume
+DEFAULT_EVENTS_HISTORY_SESSIONS = 256  # Sessions with kept history
+EVENTS_KEEPALIVE_SECONDS = 15
+EVENTS_RETRY_MS = 3000
+
+# SQL debug mode: executions of one statement shape per request reported as a likely N+1
+DEFAULT_SQL_DEBUG_REPEAT_THRESHOLD = 4
 
 # CORS
 DEFAULT_CORS_ORIGINS = "http://localhost:3000,http://127.0.0.1:3000"
 
 # Database
 DEFAULT_DB_URL = "sqlite:///./chips.db"
+
+# Async driver used by the async engine (DB_ASYNC) per database backend of DB_URL
+ASYNC_DB_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+# Connection pool
+DEFAULT_DB_POOL_SIZE = 5
+DEFAULT_DB_MAX_OVERFLOW = 10
+DEFAULT_DB_POOL_TIMEOUT_SECONDS = 30
+DEFAULT_DB_POOL_RECYCLE_SECONDS = -1  # -1 = never recycle connections by age
+
+# SQLite connection profile (applied as PRAGMAs on every connection)
+DEFAULT_SQLITE_JOURNAL_MODE = "WAL"
+DEFAULT_SQLITE_SYNCHRONOUS = "NORMAL"
+DEFAULT_SQLITE_BUSY_TIMEOUT_MS = 5000
+DEFAULT_SQLITE_CACHE_SIZE = -20000  # Negative value = size in KiB (~20 MB)
+DEFAULT_SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_SQLITE_TEMP_STORE = "MEMORY"
+
+VALID_SQLITE_JOURNAL_MODES = ["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"]
+VALID_SQLITE_SYNCHRONOUS = ["OFF", "NORMAL", "FULL", "EXTRA"]
+VALID_SQLITE_TEMP_STORES = ["DEFAULT", "FILE", "MEMORY"]
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import Date, Interval, Time, case, cast, func, literal
+from sqlalchemy.sql.elements import ColumnElement
 
 
 def utc_now() -> datetime:
@@ -30,3 +33,49 @@ def to_utc(dt: datetime) -> datetime:
         # Naive datetime, assume it's already UTC
         return dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
+
+
+# Working day: 20:00 (8 PM) to 18:00 (6 PM) of next day
+WORKING_DAY_START = time(20, 0, 0)
+WORKING_DAY_END = time(18, 0, 0)
+
+
+def working_day_of(dt: datetime) -> date | None:
+    """
+    Get the working day a (naive UTC) timestamp belongs to.
+    
+    Args:
+        dt: Timestamp, e.g. session created_at
+        
+    Returns:
+        Calendar date the working day starts on, or None for the
+        18:00-20:00 gap that belongs to no working day
+    """
+    if dt.time() >= WORKING_DAY_START:
+        return dt.date()
+    if dt.time() < WORKING_DAY_END:
+        return dt.date() - timedelta(days=1)
+    return None
+
+
+def working_day_sql(column: ColumnElement) -> ColumnElement:
+    """
+    SQL expression of `working_day_of` for a (naive UTC) timestamp column, on PostgreSQL.
+
+    Shifting the timestamp back by the working day start turns working days
+    into calendar days, which `date_trunc` buckets natively; what lands past
+    the working day's length is the 18:00-20:00 gap and yields NULL.
+
+    Args:
+        column: Timestamp column, e.g. Session.created_at
+
+    Returns:
+        DATE expression, NULL for timestamps outside any working day
+    """
+    start = timedelta(hours=WORKING_DAY_START.hour, minutes=WORKING_DAY_START.minute)
+    length = timedelta(days=1, hours=WORKING_DAY_END.hour, minutes=WORKING_DAY_END.minute) - start
+    shifted = column - literal(start, Interval())
+    return case(
+        (cast(shifted, Time) >= (datetime.min + length).time(), None),
+        else_=cast(func.date_trunc("day", shifted), Date),
+    )
@@ -1,18 +1,122 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
-from typing import Generator
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import URL, create_engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from .config import settings
+from .constants import ASYNC_DB_DRIVERS
+from .metrics import TimedAsyncQueuePool, TimedQueuePool, instrument_engine
+from .write_coordinator import write_coordinator
 
-_connect_args = {}
-if settings.DB_URL.startswith("sqlite"):
-    _connect_args = {"check_same_thread": False}
+logger = logging.getLogger(__name__)
+
+IS_SQLITE = settings.DB_URL.startswith("sqlite")
+_IS_SQLITE_MEMORY = IS_SQLITE and (settings.DB_URL in ("sqlite://", "sqlite:///") or ":memory:" in settings.DB_URL)
+
+_connect_args: dict[str, Any] = {}
+_engine_kwargs: dict[str, Any] = {}
+if IS_SQLITE:
+    _connect_args = {
+        "check_same_thread": False,
+        "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+    }
+
+# In-memory SQLite keeps SQLAlchemy's single-connection pool; everything else gets a sized pool
+if not _IS_SQLITE_MEMORY:
+    _engine_kwargs = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "poolclass": TimedQueuePool,
+    }
+
+engine = create_engine(settings.DB_URL, connect_args=_connect_args, **_engine_kwargs)
+instrument_engine(engine)
+
+
+def _sqlite_pragmas() -> list[tuple[str, Any]]:
+    """PRAGMAs applied to every new SQLite connection, in order."""
+    pragmas: list[tuple[str, Any]] = [
+        ("busy_timeout", int(settings.SQLITE_BUSY_TIMEOUT_MS)),
+        ("synchronous", settings.SQLITE_SYNCHRONOUS.upper()),
+        ("cache_size", int(settings.SQLITE_CACHE_SIZE)),
+        ("mmap_size", int(settings.SQLITE_MMAP_SIZE)),
+        ("temp_store", settings.SQLITE_TEMP_STORE.upper()),
+        ("foreign_keys", "ON" if settings.SQLITE_FOREIGN_KEYS else "OFF"),
+    ]
+    # journal_mode is persistent and cannot be changed for in-memory databases
+    if not _IS_SQLITE_MEMORY:
+        pragmas.insert(0, ("journal_mode", settings.SQLITE_JOURNAL_MODE.upper()))
+    return pragmas
+
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in _sqlite_pragmas():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def async_url(url: str) -> URL:
+    """`url` with its driver replaced by the async driver of the same backend."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DB_DRIVERS:
+        raise ValueError(f"DB_ASYNC is not supported for {backend} databases")
+    return parsed.set(drivername=ASYNC_DB_DRIVERS[backend])
+
+
+# Engine of the async route handlers (DB_ASYNC). It keeps its own pool next to
+# the sync engine, which still serves migrations, the CLI and the sync routes.
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+if settings.DB_ASYNC:
+    if _IS_SQLITE_MEMORY:
+        raise ValueError("DB_ASYNC requires a database file: in-memory SQLite is private to one engine")
+    async_engine = create_async_engine(
+        async_url(settings.DB_URL),
+        connect_args=_connect_args,
+        **{**_engine_kwargs, "poolclass": TimedAsyncQueuePool},
+    )
+    instrument_engine(async_engine.sync_engine)
+    if IS_SQLITE:
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
+
+
+def log_database_profile() -> None:
+    """Log the effective connection pool and SQLite settings."""
+    logger.info(
+        f"Database pool: {engine.pool.__class__.__name__} "
+        f"(size={settings.DB_POOL_SIZE}, max_overflow={settings.DB_MAX_OVERFLOW}, "
+        f"timeout={settings.DB_POOL_TIMEOUT_SECONDS}s, pre_ping={settings.DB_POOL_PRE_PING}, "
+        f"recycle={settings.DB_POOL_RECYCLE_SECONDS}s)"
+    )
+    if async_engine is not None:
+        logger.info(f"Async engine: {async_engine.url.drivername} ({async_engine.pool.__class__.__name__})")
+    if not IS_SQLITE:
+        return
+
+    with engine.connect() as conn:
+        effective = {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name, _ in _sqlite_pragmas()
+        }
+    logger.info(
+        "SQLite profile: " + ", ".join(f"{name}={value}" for name, value in effective.items())
+    )
 
-engine = create_engine(settings.DB_URL, connect_args=_connect_args)
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
@@ -45,3 +149,57 @@ def transaction(db: Session) -> Generator[Session, None, None]:
     except Exception:
         db.rollback()
         raise
+
+
+# Session.info flag: the session is inside async_write_transaction
+_IN_WRITE_TRANSACTION = "in_write_transaction"
+
+
+@contextmanager
+def write_transaction(db: Session) -> Generator[Session, None, None]:
+    """
+    Write section of a handler.
+
+    Waits for the worker's write slot (when DB_SERIALIZE_WRITES is on) and, on
+    SQLite, opens the transaction with BEGIN IMMEDIATE so the write lock is
+    taken up front and waits on busy_timeout instead of failing on upgrade.
+    Commits when the block exits (rolls back on an exception) and releases
+    both, so authentication before the block and response serialization
+    after it run outside the serialized window. Enter it before the first
+    statement whose result the writes depend on (row locks, checks).
+
+    Inside async_write_transaction the slot and the transaction are already
+    taken, and the block only commits.
+    """
+    if db.info.get(_IN_WRITE_TRANSACTION):
+        with transaction(db):
+            yield db
+        return
+
+    with write_coordinator.acquire():
+        if IS_SQLITE:
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+        with transaction(db):
+            yield db
+
+
+@asynccontextmanager
+async def async_write_transaction(db: AsyncSession) -> AsyncGenerator[AsyncSession, None]:
+    """
+    write_transaction of the async handlers (DB_ASYNC), around their run_sync call.
+
+    Takes the write slot without blocking the event loop; the write_transaction
+    of the sync handler run inside then only commits.
+    """
+    async with write_coordinator.acquire_async():
+        if IS_SQLITE:
+            await (await db.connection()).exec_driver_sql("BEGIN IMMEDIATE")
+        db.info[_IN_WRITE_TRANSACTION] = True
+        try:
+            yield db
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+        finally:
+            db.info.pop(_IN_WRITE_TRANSACTION, None)
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from typing import Any, Callable, cast
+from typing import Any, Awaitable, Callable, cast
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DBSession
 
-from .db import SessionLocal
+from .db import AsyncSessionLocal, SessionLocal
+from .principal import Principal, principal_cache
 from .security import decode_token
+from .sql_debug import unbudgeted
 from ..models.db import User
 
 
@@ -26,10 +30,15 @@ def get_db():
         db.close()
 
 
-def get_current_user(
-    db: DBSession = Depends(get_db),
-    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
-) -> User:
+async def get_async_db():
+    """Async counterpart of get_db for the async handlers (DB_ASYNC)."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database session requested with DB_ASYNC off")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _token_user_id(creds: HTTPAuthorizationCredentials | None) -> int:
     if creds is None or not creds.credentials:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
@@ -41,24 +50,69 @@ def get_current_user(
 
     # id может быть int или str — нормализуем
     try:
-        user_id = int(sub)
+        return int(sub)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+
+def _active_principal(user: User | None, generation: int) -> Principal:
     if user is None or not _as_bool(user.is_active):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    principal = Principal.from_user(user)
+    principal_cache.put(principal, generation)
+    return principal
 
+
+def get_current_user(
+    db: DBSession = Depends(get_db),
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+) -> Principal:
+    user_id = _token_user_id(creds)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        # Read before the query: an invalidation during the load keeps the result out of the cache
+        generation = principal_cache.generation(user_id)
+        with unbudgeted():
+            user = db.query(User).filter(User.id == user_id).first()
+        principal = _active_principal(user, generation)
+    return principal
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+) -> Principal:
+    """Async counterpart of get_current_user (same principal cache)."""
+    user_id = _token_user_id(creds)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        generation = principal_cache.generation(user_id)
+        with unbudgeted():
+            user = (await db.execute(select(User).where(User.id == user_id).limit(1))).scalars().first()
+        principal = _active_principal(user, generation)
+    return principal
+
+
+def _check_role(user: Principal, allowed: set[str]) -> Principal:
+    if user.role not in allowed:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
     return user
 
 
-def require_roles(*roles: str) -> Callable[[User], User]:
+def require_roles(*roles: str) -> Callable[[Principal], Principal]:
+    allowed = set(roles)
+
+    def _dep(user: Principal = Depends(get_current_user)) -> Principal:
+        return _check_role(user, allowed)
+
+    return _dep
+
+
+def require_roles_async(*roles: str) -> Callable[[Principal], Awaitable[Principal]]:
+    """require_roles on get_current_user_async."""
     allowed = set(roles)
 
-    def _dep(user: User = Depends(get_current_user)) -> User:
-        role = cast(str, user.role)
-        if role not in allowed:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-        return user
+    async def _dep(user: Principal = Depends(get_current_user_async)) -> Principal:
+        return _check_role(user, allowed)
 
     return _dep
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import secrets
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+from .config import settings
+from .constants import (
+    EVENTS_KEEPALIVE_SECONDS,
+    EVENTS_RETRY_MS,
+    SESSION_EVENT_CLOSE,
+    SESSION_EVENT_RESYNC,
+)
+
+
+@dataclass(frozen=True)
+class SessionEvent:
+    """One committed change of a session, as sent on the SSE stream."""
+
+    seq: int
+    id: str  # "<boot>-<seq>", sent as the SSE id and echoed back in Last-Event-ID
+    type: str
+    data: dict[str, Any]
+
+    def encode(self) -> bytes:
+        payload = json.dumps(self.data, separators=(",", ":"), ensure_ascii=False)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n".encode("utf-8")
+
+
+@dataclass
+class _SessionLog:
+    """Recent events of one session; events up to `truncated_through` may be missing."""
+
+    events: deque[SessionEvent] = field(default_factory=deque)
+    truncated_through: int = 0
+
+
+class Subscription:
+    """
+    One SSE client of a session.
+
+    Events are handed over from publishing threads to the subscriber's event
+    loop through a bounded queue. A subscriber that falls `queue_size` events
+    behind has its backlog replaced by a single resync event, so a slow client
+    costs bounded memory and never holds up publishers or other clients.
+    """
+
+    def __init__(self, session_id: str, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.session_id = session_id
+        self.resyncs = 0
+        self._loop = loop
+        self._queue: asyncio.Queue[SessionEvent] = asyncio.Queue(maxsize=queue_size)
+
+    def deliver(self, event: SessionEvent) -> None:
+        """Queue `event` from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._offer, event)
+        except RuntimeError:
+            pass  # Loop already closed, the stream is gone
+
+    def _offer(self, event: SessionEvent) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self.resyncs += 1
+            self._queue.put_nowait(SessionEvent(event.seq, event.id, SESSION_EVENT_RESYNC, {}))
+
+    async def next(self, timeout: float) -> SessionEvent | None:
+        """Wait for the next event, or return None after `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """
+    In-process pub/sub of session events for the SSE endpoint.
+
+    Handlers publish after committing. Each session keeps its last
+    `history_size` events so a reconnecting client can resume from its
+    Last-Event-ID; when the events it missed are no longer kept (or the
+    process restarted) it gets a resync event and refetches the seats.
+    Subscribers only see events of the worker process they are connected to.
+    """
+
+    def __init__(self, queue_size: int, history_size: int, history_sessions: int):
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self.history_sessions = history_sessions
+        self._boot = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._evicted_through = 0
+        self._logs: OrderedDict[str, _SessionLog] = OrderedDict()
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._published = 0
+        self._resyncs = 0
+
+    def _log(self, session_id: str) -> _SessionLog:
+        """Get the log of a session, creating it (and evicting the oldest) under the lock."""
+        log = self._logs.get(session_id)
+        if log is None:
+            # Events of this session may have been in an evicted log
+            log = self._logs[session_id] = _SessionLog(truncated_through=self._evicted_through)
+            while len(self._logs) > self.history_sessions:
+                _, evicted = self._logs.popitem(last=False)
+                if evicted.events:
+                    self._evicted_through = max(self._evicted_through, evicted.events[-1].seq)
+        else:
+            self._logs.move_to_end(session_id)
+        return log
+
+    def publish(self, session_id: str, event_type: str, data: dict[str, Any]) -> SessionEvent:
+        """
+        Record an event of a session and deliver it to its subscribers.
+
+        Args:
+            session_id: Session ID
+            event_type: One of the SESSION_EVENT_* types
+            data: JSON-serializable payload
+
+        Returns:
+            Published event
+        """
+        with self._lock:
+            self._seq += 1
+            event = SessionEvent(self._seq, f"{self._boot}-{self._seq}", event_type, data)
+            self._published += 1
+
+            log = self._log(session_id)
+            log.events.append(event)
+            if len(log.events) > self.history_size:
+                log.truncated_through = log.events.popleft().seq
+
+            # Delivered under the lock so every subscriber sees events in publish order
+            for subscription in self._subscribers.get(session_id, ()):
+                subscription.deliver(event)
+        return event
+
+    def _parse_event_id(self, event_id: str) -> int | None:
+        boot, _, seq = event_id.strip().partition("-")
+        if boot != self._boot or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def subscribe(self, session_id: str, last_event_id: str | None = None) -> tuple[Subscription, list[SessionEvent]]:
+        """
+        Subscribe the running event loop to a session.
+
+        Args:
+            session_id: Session ID
+            last_event_id: Last-Event-ID sent by a reconnecting client
+
+        Returns:
+            (subscription, events to send before the live ones)
+        """
+        subscription = Subscription(session_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(session_id, set()).add(subscription)
+            if last_event_id is None:
+                return subscription, []
+
+            log = self._log(session_id)
+            last_seq = self._parse_event_id(last_event_id)
+            if last_seq is None or last_seq < log.truncated_through or last_seq > self._seq:
+                self._resyncs += 1
+                return subscription, [SessionEvent(self._seq, f"{self._boot}-{self._seq}", SESSION_EVENT_RESYNC, {})]
+            return subscription, [event for event in log.events if event.seq > last_seq]
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.session_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.session_id]
+            self._resyncs += subscription.resyncs
+
+    async def stream(self, session_id: str, last_event_id: str | None = None) -> AsyncIterator[bytes]:
+        """
+        Encoded SSE stream of a session, ending after its close event.
+
+        Args:
+            session_id: Session ID
+            last_event_id: Last-Event-ID sent by a reconnecting client
+        """
+        subscription, backlog = self.subscribe(session_id, last_event_id)
+        try:
+            yield f"retry: {EVENTS_RETRY_MS}\n\n".encode("ascii")
+            for event in backlog:
+                yield event.encode()
+                if event.type == SESSION_EVENT_CLOSE:
+                    return
+
+            while True:
+                event = await subscription.next(EVENTS_KEEPALIVE_SECONDS)
+                if event is None:
+                    # Comment line keeps proxies from timing out an idle stream
+                    yield b": keepalive\n\n"
+                    continue
+                yield event.encode()
+                if event.type == SESSION_EVENT_CLOSE:
+                    return
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of stream metrics."""
+        with self._lock:
+            return {
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "sessions_with_history": len(self._logs),
+                "published_total": self._published,
+                "resyncs_total": self._resyncs + sum(
+                    sub.resyncs for subs in self._subscribers.values() for sub in subs
+                ),
+            }
+
+
+event_bus = EventBus(settings.EVENTS_QUEUE_SIZE, settings.EVENTS_HISTORY_SIZE, settings.EVENTS_HISTORY_SESSIONS)
@@ -124,6 +124,9 @@ class ErrorMessages:
     TABLE_NAME_EXISTS = "Table name already exists"
     
     INVALID_DATE_FORMAT = "Invalid date format (expected YYYY-MM-DD)"
+    INVALID_CURSOR = "Invalid cursor"
+    IDEMPOTENCY_KEY_REUSED = "Idempotency-Key was already used for a different request"
+    IDEMPOTENCY_KEY_IN_PROGRESS = "A request with this Idempotency-Key is in progress, retry later"
     AMOUNT_CANNOT_BE_ZERO = "Amount cannot be zero"
     NO_CREDIT_FOUND = "No credit found for this player"
     AMOUNT_EXCEEDS_CREDIT = "Amount exceeds available credit"
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+from .config import settings
+
+T = TypeVar("T")
+
+
+class HashingPool:
+    """
+    Dedicated, size-limited thread pool for CPU-bound password hashing.
+
+    Login hashing runs here instead of in Starlette's shared threadpool, so a
+    burst of logins at shift change cannot starve chip-entry requests.
+    pbkdf2 runs in hashlib and releases the GIL, so worker threads hash in
+    parallel. Logins beyond `max_pending` are rejected with 503 instead of
+    queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._max_pending_seen = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run `fn(*args)` on the pool and await its result."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent logins, please retry",
+                )
+            self._pending += 1
+            self._max_pending_seen = max(self._max_pending_seen, self._pending)
+
+        submitted = time.perf_counter()
+
+        def _timed() -> T:
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._total_wait += started - submitted
+                    self._total_run += finished - started
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, _timed)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of pool metrics."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "max_pending_seen": self._max_pending_seen,
+                "completed_total": self._completed,
+                "rejected_total": self._rejected,
+                "queue_wait_seconds_total": round(self._total_wait, 6),
+                "hash_seconds_total": round(self._total_run, 6),
+            }
+
+
+hashing_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,363 @@
+"""
+Versioned schema migrations.
+
+The database records the version it is at in `schema_version`. Startup reads
+it with a single query and only runs the migration steps when it is behind,
+so boot time does not grow with the number of migrations shipped.
+
+To add a migration, append a step to MIGRATIONS with the next version number.
+New tables and columns of brand-new databases come from the models via
+`create_all`, so steps must be written to be no-ops when their change is
+already present.
+
+Steps are frozen once shipped: they are plain SQL (index definitions and
+backfills included) and never call the services or read the models, which
+keep changing after the step was written. A database that runs a step late
+must get the same result as one that ran it on release.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import logging
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import DateTime, bindparam, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from ..models.db import Base
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+# Key of the PostgreSQL advisory lock that serializes migrating workers
+_MIGRATION_LOCK_KEY = 72_431_001
+
+
+def _timestamp_type(conn: Connection) -> str:
+    """DDL type of a naive UTC timestamp column on the connection's database."""
+    return "TIMESTAMP WITHOUT TIME ZONE" if conn.dialect.name == "postgresql" else "DATETIME"
+
+
+def _add_missing_columns(conn: Connection, table: str, columns: list[tuple[str, str]]) -> None:
+    """Add the columns (name, DDL type) that `table` does not have yet."""
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    for name, ddl in columns:
+        if name not in existing:
+            logger.info(f"Adding column {table}.{name}")
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
+def _create_missing_indexes(conn: Connection, table: str, indexes: dict[str, str]) -> None:
+    """Create the indexes (name -> column list) that `table` does not have yet."""
+    existing = {i["name"] for i in inspect(conn).get_indexes(table)}
+    for name, columns in indexes.items():
+        if name not in existing:
+            logger.info(f"Creating index {name}")
+            conn.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+
+
+def _now() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+
+def _legacy_columns(conn: Connection) -> None:
+    # Columns that used to be added by probing in main.py startup
+    _add_missing_columns(conn, "sessions", [
+        ("dealer_id", "INTEGER REFERENCES users(id)"),
+        ("waiter_id", "INTEGER REFERENCES users(id)"),
+        ("closed_at", _timestamp_type(conn)),
+        ("rake_in", "INTEGER NOT NULL DEFAULT 0"),
+        ("rake_out", "INTEGER NOT NULL DEFAULT 0"),
+        ("chips_in_play", "INTEGER NOT NULL DEFAULT 0"),
+    ])
+    _add_missing_columns(conn, "users", [
+        ("hourly_rate", "INTEGER"),
+    ])
+    _add_missing_columns(conn, "chip_purchases", [
+        ("payment_type", "VARCHAR(16) NOT NULL DEFAULT 'cash'"),
+    ])
+
+
+# Running chip totals of every session, from chip_ops (buyins and cashouts)
+# and chip_purchases (cash and credit buyins, cashouts recorded on close)
+_SESSION_TOTALS_SQL = """
+UPDATE sessions SET
+    total_buyins = COALESCE((
+        SELECT SUM(amount) FROM chip_ops
+        WHERE chip_ops.session_id = sessions.id AND amount > 0), 0),
+    total_cashouts = COALESCE((
+        SELECT SUM(-amount) FROM chip_ops
+        WHERE chip_ops.session_id = sessions.id AND amount < 0), 0),
+    buyin_cash = COALESCE((
+        SELECT SUM(amount) FROM chip_purchases
+        WHERE chip_purchases.session_id = sessions.id AND amount > 0 AND payment_type != 'credit'), 0),
+    buyin_credit = COALESCE((
+        SELECT SUM(amount) FROM chip_purchases
+        WHERE chip_purchases.session_id = sessions.id AND amount > 0 AND payment_type = 'credit'), 0),
+    closing_cashout = COALESCE((
+        SELECT SUM(-amount) FROM chip_purchases
+        WHERE chip_purchases.session_id = sessions.id AND amount < 0), 0)
+"""
+
+
+def _session_chip_totals(conn: Connection) -> None:
+    existing = {c["name"] for c in inspect(conn).get_columns("sessions")}
+    if "total_buyins" in existing:
+        return
+
+    _add_missing_columns(conn, "sessions", [
+        ("total_buyins", "INTEGER NOT NULL DEFAULT 0"),
+        ("total_cashouts", "INTEGER NOT NULL DEFAULT 0"),
+        ("buyin_cash", "INTEGER NOT NULL DEFAULT 0"),
+        ("buyin_credit", "INTEGER NOT NULL DEFAULT 0"),
+        ("closing_cashout", "INTEGER NOT NULL DEFAULT 0"),
+    ])
+    rebuilt = conn.execute(text(_SESSION_TOTALS_SQL)).rowcount
+    logger.info(f"Backfilled running chip totals for {rebuilt} sessions")
+
+
+def _working_day_sql(conn: Connection, column: str) -> str:
+    """
+    Working day of a timestamp column, as of migration 3: from 20:00 to 18:00
+    the next day, NULL in the 18:00-20:00 gap.
+
+    SQLite compares the stored "YYYY-MM-DD HH:MM:SS[.ffffff]" text: its date
+    functions round to milliseconds, which would move 17:59:59.9999 into the gap.
+    """
+    if conn.dialect.name == "postgresql":
+        return (
+            f"CASE WHEN CAST({column} AS TIME) >= TIME '20:00' THEN CAST({column} AS DATE) "
+            f"WHEN CAST({column} AS TIME) < TIME '18:00' THEN CAST({column} AS DATE) - 1 END"
+        )
+    return (
+        f"CASE WHEN substr({column}, 12, 8) >= '20:00:00' THEN substr({column}, 1, 10) "
+        f"WHEN substr({column}, 12, 8) < '18:00:00' THEN date(substr({column}, 1, 10), '-1 day') END"
+    )
+
+
+def _daily_summary(conn: Connection) -> None:
+    # Table itself comes from create_all; fill it for the history we already have
+    conn.execute(text(_SESSION_TOTALS_SQL))
+    conn.execute(text("DELETE FROM daily_summary"))
+    days = conn.execute(
+        text(f"""
+            INSERT INTO daily_summary (
+                working_day, table_id, sessions_count, open_sessions,
+                buyin_cash, buyin_credit, cashout, player_balance, updated_at
+            )
+            SELECT
+                working_day, table_id, COUNT(*),
+                SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END),
+                SUM(buyin_cash), SUM(buyin_credit), SUM(closing_cashout), SUM(player_balance), :now
+            FROM (
+                SELECT
+                    {_working_day_sql(conn, "sessions.created_at")} AS working_day,
+                    sessions.table_id, sessions.status,
+                    sessions.buyin_cash, sessions.buyin_credit, sessions.closing_cashout,
+                    COALESCE((SELECT SUM(total) FROM seats WHERE seats.session_id = sessions.id), 0)
+                        AS player_balance
+                FROM sessions
+            ) AS by_session
+            WHERE working_day IS NOT NULL
+            GROUP BY working_day, table_id
+        """).bindparams(bindparam("now", type_=DateTime())),
+        {"now": _now()},
+    ).rowcount
+    logger.info(f"Backfilled daily summary for {days} table working days")
+
+
+def _keyset_indexes(conn: Connection) -> None:
+    _create_missing_indexes(conn, "chip_purchases", {
+        "ix_chip_purchases_created_id": "created_at, id",
+        "ix_chip_purchases_table_created_id": "table_id, created_at, id",
+    })
+    _create_missing_indexes(conn, "casino_balance_adjustments", {
+        "ix_casino_balance_adjustments_created_id": "created_at, id",
+    })
+
+
+def _closed_sessions_index(conn: Connection) -> None:
+    _create_missing_indexes(conn, "sessions", {
+        "ix_sessions_table_status_created_id": "table_id, status, created_at, id",
+    })
+
+
+def _credit_ledger(conn: Connection) -> None:
+    # Tables come from create_all; open a debit for every outstanding credit
+    # purchase (settled credit was deleted from chip_purchases before the
+    # ledger existed, so that is all the history there is to recover)
+    if (
+        conn.execute(text("SELECT 1 FROM credit_ledger LIMIT 1")).first() is not None
+        or conn.execute(text("SELECT 1 FROM credit_balances LIMIT 1")).first() is not None
+    ):
+        raise RuntimeError("Credit ledger is not empty: its history cannot be rebuilt")
+
+    conn.execute(text("""
+        INSERT INTO credit_ledger (
+            session_id, table_id, seat_no, player_name, entry_type, amount,
+            chip_op_id, adjustment_id, created_at, created_by_user_id
+        )
+        SELECT
+            chip_purchases.session_id, chip_purchases.table_id, chip_purchases.seat_no,
+            seats.player_name, 'debit', chip_purchases.amount,
+            chip_purchases.chip_op_id, NULL, chip_purchases.created_at, chip_purchases.created_by_user_id
+        FROM chip_purchases
+        LEFT JOIN seats
+            ON seats.session_id = chip_purchases.session_id AND seats.seat_no = chip_purchases.seat_no
+        WHERE chip_purchases.payment_type = 'credit' AND chip_purchases.amount > 0
+        ORDER BY chip_purchases.id
+    """))
+    seats = conn.execute(
+        text("""
+            INSERT INTO credit_balances (session_id, seat_no, table_id, player_name, balance, updated_at)
+            SELECT session_id, seat_no, table_id, MAX(player_name), SUM(amount), :now
+            FROM credit_ledger
+            GROUP BY session_id, seat_no, table_id
+        """).bindparams(bindparam("now", type_=DateTime())),
+        {"now": _now()},
+    ).rowcount
+    logger.info(f"Backfilled credit ledger for {seats} seats with outstanding credit")
+
+
+def _idempotency_keys(conn: Connection) -> None:
+    # Table comes from create_all
+    _create_missing_indexes(conn, "idempotency_keys", {"ix_idempotency_keys_expires_at": "expires_at"})
+
+
+# Single-column indexes made redundant by the composite indexes of migration 8
+_REDUNDANT_INDEXES = [
+    "ix_sessions_status",
+    "ix_chip_ops_session_id",
+    "ix_chip_purchases_session_id",
+    "ix_chip_purchases_seat_no",
+    "ix_chip_purchases_table_id",
+    "ix_chip_purchases_created_at",
+    "ix_casino_balance_adjustments_created_at",
+]
+
+
+def _hot_query_indexes(conn: Connection) -> None:
+    _create_missing_indexes(conn, "sessions", {
+        "ix_sessions_status_created": "status, created_at",
+        "ix_sessions_status_dealer": "status, dealer_id",
+    })
+    _create_missing_indexes(conn, "chip_ops", {"ix_chip_ops_session_seat_id": "session_id, seat_no, id"})
+    _create_missing_indexes(conn, "chip_purchases", {
+        "ix_chip_purchases_session_seat_type": "session_id, seat_no, payment_type",
+    })
+    _create_missing_indexes(conn, "casino_balance_adjustments", {
+        "ix_casino_balance_adjustments_created_amount": "created_at, amount",
+    })
+    for name in _REDUNDANT_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def _chip_ops_sentinel(conn: Connection) -> None:
+    _add_missing_columns(conn, "chip_ops", [("_sentinel", "INTEGER")])
+
+
+def _balance_adjustments_sentinel(conn: Connection) -> None:
+    _add_missing_columns(conn, "casino_balance_adjustments", [("_sentinel", "INTEGER")])
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "Legacy columns added by startup probes", _legacy_columns),
+    Migration(2, "Running chip totals on sessions", _session_chip_totals),
+    Migration(3, "Materialized daily summary", _daily_summary),
+    Migration(4, "Keyset pagination indexes", _keyset_indexes),
+    Migration(5, "Closed sessions listing index", _closed_sessions_index),
+    Migration(6, "Credit ledger", _credit_ledger),
+    Migration(7, "Idempotency keys", _idempotency_keys),
+    Migration(8, "Composite indexes for the hot queries", _hot_query_indexes),
+    Migration(9, "Insert sentinel of chip_ops", _chip_ops_sentinel),
+    Migration(10, "Insert sentinel of casino_balance_adjustments", _balance_adjustments_sentinel),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(engine: Engine) -> int:
+    """Read the current schema version (0 for databases without schema_version)."""
+    try:
+        with engine.connect() as conn:
+            version = conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    except DBAPIError:
+        return 0
+    return int(version or 0)
+
+
+def _read_version(conn: Connection) -> int:
+    conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    return int(conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0)
+
+
+def migrate(engine: Engine) -> int:
+    """
+    Bring the database schema up to LATEST_VERSION.
+
+    Runs inside a single transaction (taken with BEGIN IMMEDIATE on SQLite and
+    under a transaction-scoped advisory lock on PostgreSQL, so concurrent
+    workers wait for each other) and re-reads the version under the lock, so
+    only one process applies the steps.
+
+    Returns:
+        Schema version after migrating
+    """
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        elif engine.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _MIGRATION_LOCK_KEY})
+
+        current = _read_version(conn)
+        if current >= LATEST_VERSION:
+            conn.rollback()
+            return current
+
+        Base.metadata.create_all(bind=conn)
+
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+            logger.info(f"Applying migration {migration.version}: {migration.description}")
+            migration.apply(conn)
+            conn.execute(text("DELETE FROM schema_version"))
+            conn.execute(
+                text("INSERT INTO schema_version (version) VALUES (:version)"),
+                {"version": migration.version},
+            )
+
+        conn.commit()
+
+    logger.info(f"Database schema migrated from version {current} to {LATEST_VERSION}")
+    return LATEST_VERSION
+
+
+def ensure_schema(engine: Engine, auto_migrate: bool = True) -> None:
+    """
+    Check the schema version on startup, migrating if allowed.
+
+    Raises:
+        RuntimeError: If the database is behind and auto_migrate is off
+    """
+    version = get_schema_version(engine)
+    if version >= LATEST_VERSION:
+        logger.info(f"Database schema is up to date (version {version})")
+        return
+
+    if not auto_migrate:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {LATEST_VERSION}. "
+            "Run `python -m app.cli migrate` before starting the application."
+        )
+
+    migrate(engine)
@@ -0,0 +1,90 @@
+"""
+Keyset (cursor) pagination over (created_at, id), newest first.
+
+Cursors are opaque to clients: the (created_at, id) of the last row of a
+page, base64-encoded. The next page seeks past it with a row-value
+comparison, so deep pages cost the same index seek as the first one.
+List endpoints return the cursor of the next page in the X-Next-Cursor
+response header (absent on the last page).
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import datetime as dt
+import json
+from typing import Any
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from .constants import NEXT_CURSOR_HEADER
+from .exceptions import ErrorMessages
+
+
+def encode_cursor(created_at: dt.datetime, row_id: int | str) -> str:
+    """Encode the position of a row as a cursor string."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[dt.datetime, int | str]:
+    """
+    Decode a cursor string.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(row_id, (int, str)):
+            raise ValueError(row_id)
+        return dt.datetime.fromisoformat(created_at), row_id
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=ErrorMessages.INVALID_CURSOR)
+
+
+def keyset_page(
+    query: Query,
+    created_at_column: Any,
+    id_column: Any,
+    cursor: str | None,
+    limit: int,
+    response: Response,
+) -> list[Any]:
+    """
+    Fetch one page of `query`, newest first.
+
+    Args:
+        query: Filtered query of an entity, or of columns including `created_at_column` and `id_column`
+        created_at_column: Timestamp column to order by
+        id_column: Unique tie-breaker column
+        cursor: Cursor of the previous page, or None for the first page
+        limit: Page size
+        response: Response to set the X-Next-Cursor header on
+
+    Returns:
+        Rows of the page
+    """
+    if cursor is not None:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_at_column, id_column) < tuple_(created_at, row_id))
+
+    rows = (
+        query.order_by(created_at_column.desc(), id_column.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if hasattr(last, "_mapping"):
+            position = (last._mapping[created_at_column], last._mapping[id_column])
+        else:
+            # Entity query: read the columns off the ORM object
+            position = (getattr(last, created_at_column.key), getattr(last, id_column.key))
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*position)
+    return rows
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, cast
+
+from .config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by request handlers (detached from the DB session)."""
+
+    id: int
+    username: str
+    role: str
+    table_id: int | None
+    is_active: bool
+    hourly_rate: int | None
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        return cls(
+            id=int(cast(int, user.id)),
+            username=cast(str, user.username),
+            role=cast(str, user.role),
+            table_id=int(cast(int, user.table_id)) if user.table_id is not None else None,
+            is_active=bool(cast(bool, user.is_active)),
+            hourly_rate=int(cast(int, user.hourly_rate)) if user.hourly_rate is not None else None,
+        )
+
+
+class PrincipalCache:
+    """
+    In-process TTL/LRU cache of active users keyed by id.
+
+    Lets get_current_user skip the users query on the hot path. Entries are
+    dropped when a user is changed through the admin API; the TTL bounds how
+    long other worker processes may keep serving a stale entry.
+
+    Each user id has a generation that `invalidate` bumps. A loader reads
+    `generation` before querying the user and passes it to `put`, which drops
+    the principal if the user was invalidated in between: a request that
+    loaded the old row cannot cache it again after the change.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, user_id: int) -> Principal | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def generation(self, user_id: int) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(self, principal: Principal, generation: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._generations.get(principal.id, 0) != generation:
+                return
+            self._entries[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+)
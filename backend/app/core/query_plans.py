@@ -0,0 +1,204 @@
+"""
+Query plan checks for the hot queries.
+
+Each entry mirrors a query issued on a hot path (chip operations, undo,
+credit, day reports, paginated listings) with representative parameters.
+`check_query_plans` runs EXPLAIN QUERY PLAN on each of them and reports the
+ones that fall back to a full table scan or stop using the index designed
+for them, so a dropped or mismatched index is caught before it reaches
+production (`python -m app.cli check-query-plans`, tests/test_query_plans.py).
+"""
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any, NamedTuple
+
+from sqlalchemy import case, func, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from ..models.db import (
+    CasinoBalanceAdjustment,
+    ChipOp,
+    ChipPurchase,
+    CreditBalance,
+    DailySummary,
+    IdempotencyKey,
+    Seat,
+    Session,
+)
+
+_SESSION_ID = "00000000-0000-0000-0000-000000000000"
+_START = dt.datetime(2024, 1, 1, 20, 0)
+_END = dt.datetime(2024, 1, 2, 18, 0)
+
+
+class HotQuery(NamedTuple):
+    name: str
+    statement: Select
+    index: str | None  # Index the plan must use (None: any lookup, e.g. by primary key)
+
+
+def hot_queries() -> list[HotQuery]:
+    """Queries whose plans are checked."""
+    amount = CasinoBalanceAdjustment.amount
+    return [
+        # api/sessions.py
+        HotQuery(
+            "seat by session and number",
+            select(Seat).where(Seat.session_id == _SESSION_ID, Seat.seat_no == 1),
+            None,
+        ),
+        HotQuery(
+            "open session of a table",
+            select(Session)
+            .where(Session.table_id == 1, Session.status == "open")
+            .order_by(Session.created_at.desc())
+            .limit(1),
+            "ix_sessions_table_status_created_id",
+        ),
+        HotQuery(
+            "open session of a dealer",
+            select(Session).where(Session.status == "open", Session.dealer_id == 1).limit(1),
+            "ix_sessions_status_dealer",
+        ),
+        HotQuery(
+            "undo: last chip op of a seat",
+            select(ChipOp)
+            .where(ChipOp.session_id == _SESSION_ID, ChipOp.seat_no == 1)
+            .order_by(ChipOp.id.desc())
+            .limit(1),
+            "ix_chip_ops_session_seat_id",
+        ),
+        HotQuery(
+            "undo: purchase of a chip op",
+            select(ChipPurchase).where(ChipPurchase.chip_op_id == 1),
+            None,
+        ),
+        # services/credit_service.py
+        HotQuery(
+            "credit purchases of a seat",
+            select(ChipPurchase).where(
+                ChipPurchase.session_id == _SESSION_ID,
+                ChipPurchase.seat_no == 1,
+                ChipPurchase.payment_type == "credit",
+                ChipPurchase.amount > 0,
+            ),
+            "ix_chip_purchases_session_seat_type",
+        ),
+        HotQuery(
+            "credit purchases of closing seats",
+            select(ChipPurchase.id, ChipPurchase.seat_no, ChipPurchase.amount).where(
+                ChipPurchase.session_id == _SESSION_ID,
+                ChipPurchase.seat_no.in_([1, 2, 3]),
+                ChipPurchase.payment_type == "credit",
+                ChipPurchase.amount > 0,
+            ),
+            "ix_chip_purchases_session_seat_type",
+        ),
+        HotQuery(
+            "credit balance of a seat",
+            select(CreditBalance.balance).where(
+                CreditBalance.session_id == _SESSION_ID, CreditBalance.seat_no == 1
+            ),
+            None,
+        ),
+        HotQuery(
+            "open debts of a table",
+            select(func.count(), func.sum(CreditBalance.balance)).where(
+                CreditBalance.balance > 0, CreditBalance.table_id == 1
+            ),
+            "ix_credit_balances_open",
+        ),
+        # api/report.py
+        HotQuery(
+            "open sessions of a working day",
+            select(Session)
+            .where(Session.created_at >= _START, Session.created_at < _END, Session.status == "open")
+            .limit(1),
+            "ix_sessions_status_created",
+        ),
+        HotQuery(
+            "sessions of a working day",
+            select(Session)
+            .where(Session.created_at >= _START, Session.created_at < _END)
+            .order_by(Session.table_id.asc(), Session.created_at.asc()),
+            "ix_sessions_created_at",
+        ),
+        HotQuery(
+            "adjustment totals of a working day",
+            select(
+                func.sum(case((amount > 0, amount), else_=0)),
+                func.sum(case((amount <= 0, -amount), else_=0)),
+            ).where(CasinoBalanceAdjustment.created_at >= _START, CasinoBalanceAdjustment.created_at < _END),
+            "ix_casino_balance_adjustments_created_amount",
+        ),
+        HotQuery(
+            "daily summary of a working day",
+            select(DailySummary).where(DailySummary.working_day == _START.date()),
+            None,
+        ),
+        # api/admin.py
+        HotQuery(
+            "chip purchases page",
+            select(ChipPurchase)
+            .where(tuple_(ChipPurchase.created_at, ChipPurchase.id) < tuple_(_END, 1000))
+            .order_by(ChipPurchase.created_at.desc(), ChipPurchase.id.desc())
+            .limit(101),
+            "ix_chip_purchases_created_id",
+        ),
+        HotQuery(
+            "balance adjustments page",
+            select(CasinoBalanceAdjustment)
+            .where(tuple_(CasinoBalanceAdjustment.created_at, CasinoBalanceAdjustment.id) < tuple_(_END, 1000))
+            .order_by(CasinoBalanceAdjustment.created_at.desc(), CasinoBalanceAdjustment.id.desc())
+            .limit(101),
+            "ix_casino_balance_adjustments_created_id",
+        ),
+        HotQuery(
+            "closed sessions page",
+            select(Session)
+            .where(Session.table_id == 1, Session.status == "closed")
+            .order_by(Session.created_at.desc(), Session.id.desc())
+            .limit(101),
+            "ix_sessions_table_status_created_id",
+        ),
+        HotQuery(
+            "idempotency key lookup",
+            select(IdempotencyKey.request_hash, IdempotencyKey.response_body).where(
+                IdempotencyKey.user_id == 1,
+                IdempotencyKey.key == "key",
+                IdempotencyKey.expires_at > _START,
+            ),
+            None,
+        ),
+    ]
+
+
+def _problems(plan: list[str], index: str | None) -> list[str]:
+    # "SCAN t" reads every row; "SCAN t USING [COVERING] INDEX i" walks an index in order
+    problems = [line for line in plan if line.startswith("SCAN ") and " INDEX " not in f"{line} "]
+    if index is not None and not any(f" INDEX {index} " in f"{line} " for line in plan):
+        problems.append(f"does not use {index}")
+    return problems
+
+
+def check_query_plans(conn: Connection) -> list[dict[str, Any]]:
+    """
+    Explain every hot query.
+
+    Args:
+        conn: SQLite connection to a migrated database
+
+    Returns:
+        One dict per query with its name, plan lines and problems (full table
+        scans, designed index not used)
+    """
+    results = []
+    for query in hot_queries():
+        compiled = query.statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+        params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+        plan = [str(row[-1]) for row in rows]
+        results.append({"name": query.name, "plan": plan, "problems": _problems(plan, query.index)})
+    return results
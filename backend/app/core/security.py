@@ -10,9 +10,14 @@ from passlib.context import CryptContext
 from .config import settings
 
 
+# min/max rounds equal to the default make hashes with any other cost "need update",
+# so changing PASSWORD_HASH_ROUNDS rehashes passwords on next login
 pwd_context = CryptContext(
     schemes=["pbkdf2_sha256"],
     deprecated="auto",
+    pbkdf2_sha256__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=settings.PASSWORD_HASH_ROUNDS,
 )
 
 
@@ -20,6 +25,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password and rehash it if its hash uses outdated settings.
+
+    Returns:
+        Tuple of (password is valid, new hash to store or None)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
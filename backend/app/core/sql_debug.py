@@ -0,0 +1,123 @@
+"""
+SQL debug mode: per-request statement budgets and N+1 detection.
+
+Enabled with SQL_DEBUG. Every request then records the shape of each SQL
+statement it executes (see `metrics.statement_shape`), and once it finishes
+`check_request` reports:
+
+- routes that executed more statements than their budget in
+  `SQL_STATEMENT_BUDGETS` (statements run inside `unbudgeted` blocks left
+  out),
+- statement shapes executed SQL_DEBUG_REPEAT_THRESHOLD times or more in
+  one request, the usual sign of a query issued per row in a loop.
+
+Problems are logged as warnings; with SQL_DEBUG_STRICT the request fails
+with a 500 instead, so a test run against the API catches hot-path
+regressions. `count_statements` gives the same numbers for code run outside
+a request (tests calling services directly, scripts).
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Generator
+
+from .metrics import RequestDBStats, request_db_stats
+
+# Statement ceilings of the hot endpoints, keyed by "<METHOD> <route template>",
+# enforced on every request of the route. A budget covers the route's own work
+# on its hot path, BEGIN IMMEDIATE of write transactions on SQLite included.
+# Bookkeeping that only some requests do runs in `unbudgeted` blocks instead:
+# the user lookup on a principal cache miss, Idempotency-Key lookups and
+# stores, and credit ledger writes. tests/test_sql_budgets.py drives each route
+# and checks that it stays within its budget.
+SQL_STATEMENT_BUDGETS: dict[str, int] = {
+    "POST /api/sessions/{session_id}/chips": 6,
+    "POST /api/sessions/{session_id}/chips/batch": 9,
+    "POST /api/sessions/{session_id}/chips/undo": 11,
+    "PUT /api/sessions/{session_id}/seats/{seat_no}": 6,
+    "GET /api/sessions/{session_id}/seats": 2,
+    "GET /api/sessions/{session_id}/non-cash-purchases": 2,
+    "GET /api/sessions/open": 3,
+    "POST /api/sessions/{session_id}/close": 15,
+    "POST /api/admin/close-credit": 10,
+    "GET /api/admin/closed-sessions": 3,
+    "GET /api/admin/chip-purchases": 1,
+    "GET /api/admin/balance-adjustments": 1,
+    "GET /api/admin/credit/open-debts": 3,
+    "GET /api/admin/credit/ledger": 1,
+    "GET /api/admin/day-summary": 5,
+    "GET /api/admin/export-report": 15,
+}
+
+
+def route_key(method: str, route: str) -> str:
+    return f"{method} {route}"
+
+
+def check_request(
+    method: str,
+    route: str,
+    stats: RequestDBStats,
+    repeat_threshold: int,
+) -> list[str]:
+    """
+    Check the statements of a finished request.
+
+    Args:
+        method: HTTP method
+        route: Route template
+        stats: Statements executed by the request (with shapes)
+        repeat_threshold: Executions of one shape reported as a likely N+1 (0 disables)
+
+    Returns:
+        Problems found, empty if none
+    """
+    problems = []
+    budget = SQL_STATEMENT_BUDGETS.get(route_key(method, route))
+    budgeted = stats.statements - stats.unbudgeted
+    if budget is not None and budgeted > budget:
+        problems.append(f"{budgeted} SQL statements, budget is {budget}")
+    if repeat_threshold > 0:
+        for shape, count in stats.shapes.most_common():
+            if count < repeat_threshold:
+                break
+            problems.append(f"statement executed {count} times: {shape[:200]}")
+    return problems
+
+
+@contextmanager
+def unbudgeted() -> Generator[None, None, None]:
+    """
+    Leave the statements of the block out of the current request's budget.
+
+    They are still counted (metrics, logs) and checked for repeats. Blocks
+    must not be nested.
+    """
+    stats = request_db_stats.get()
+    if stats is None:
+        yield
+        return
+    before = stats.statements
+    try:
+        yield
+    finally:
+        stats.unbudgeted += stats.statements - before
+
+
+@contextmanager
+def count_statements() -> Generator[RequestDBStats, None, None]:
+    """
+    Count the SQL statements executed in the block (in this context and the
+    threads it hands work to).
+
+    Example:
+        with count_statements() as stats:
+            CreditService.close_credit(db, session, seat, 100, user)
+        assert stats.statements <= 6, stats.shapes
+    """
+    stats = RequestDBStats(track_shapes=True)
+    token = request_db_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        request_db_stats.reset(token)
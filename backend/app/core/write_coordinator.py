@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, Generator
+
+import anyio
+
+from .config import settings
+
+
+class WriteCoordinator:
+    """
+    In-process serializer for write transactions.
+
+    SQLite allows a single writer at a time. When enabled, write endpoints
+    queue on this lock instead of racing each other for the database lock,
+    so a worker never has several of its own threads spinning on
+    `database is locked`. Queue depth and wait times are tracked for metrics.
+    Sync and async handlers (DB_ASYNC) share the one slot.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._waiting = 0
+        self._max_waiting = 0
+        self._acquired = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _enqueue(self) -> float:
+        with self._stats_lock:
+            self._waiting += 1
+            self._max_waiting = max(self._max_waiting, self._waiting)
+        return time.perf_counter()
+
+    def _dequeue(self, started: float) -> None:
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self._waiting -= 1
+            self._acquired += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    @contextmanager
+    def acquire(self) -> Generator[None, None, None]:
+        """Hold the write slot for the duration of the block."""
+        if not self.enabled:
+            yield
+            return
+
+        started = self._enqueue()
+        self._lock.acquire()
+        self._dequeue(started)
+
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    @asynccontextmanager
+    async def acquire_async(self) -> AsyncGenerator[None, None]:
+        """Hold the write slot for the duration of the block without blocking the event loop."""
+        if not self.enabled:
+            yield
+            return
+
+        started = self._enqueue()
+        if not self._lock.acquire(blocking=False):
+            # Only a contended slot costs a worker thread. Shielded, so a
+            # cancelled request cannot leave the lock taken by the thread behind
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(self._lock.acquire)
+        self._dequeue(started)
+
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of queue metrics."""
+        with self._stats_lock:
+            return {
+                "enabled": self.enabled,
+                "queue_depth": self._waiting,
+                "max_queue_depth": self._max_waiting,
+                "acquired_total": self._acquired,
+                "wait_seconds_total": round(self._total_wait, 6),
+                "wait_seconds_max": round(self._max_wait, 6),
+            }
+
+
+write_coordinator = WriteCoordinator(settings.DB_SERIALIZE_WRITES)
@@ -2,16 +2,31 @@ from __future__ import annotations
 
 import logging
 import sys
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import text
-
-from .api import admin_router, auth_router, sessions_router, report_router
+from fastapi.responses import JSONResponse, Response
+from .api import (
+    admin_router,
+    async_auth_router,
+    async_report_router,
+    async_sessions_router,
+    auth_router,
+    report_router,
+    sessions_router,
+)
 from .core.config import settings
-from .core.db import SessionLocal, engine
+from .core.constants import IDEMPOTENT_REPLAY_HEADER, NEXT_CURSOR_HEADER
+from .core import metrics, sql_debug
+from .core.db import SessionLocal, async_engine, engine, log_database_profile
+from .core.event_bus import event_bus
+from .core.migrations import ensure_schema
 from .core.security import get_password_hash
-from .models.db import Base, User
+from .core.write_coordinator import write_coordinator
+from .models.db import User
 
 
 def configure_logging() -> None:
@@ -31,8 +46,67 @@ logger = logging.getLogger(__name__)
 configure_logging()
 
 
+def register_runtime_metrics() -> None:
+    """Expose the gauges of the process-wide pools and queues on /metrics."""
+    metrics.registry.register(metrics.CallbackGauge(
+        "db_pool_connections_checked_out", "Pooled connections in use (sync and async engine).",
+        lambda: sum(
+            getattr(pool, "checkedout", lambda: 0)()
+            for pool in (engine.pool, async_engine.pool if async_engine is not None else None)
+            if pool is not None
+        ),
+    ))
+    metrics.registry.register(metrics.CallbackGauge(
+        "db_write_queue_depth", "Write transactions waiting for the write slot.",
+        lambda: write_coordinator.stats()["queue_depth"],
+    ))
+    metrics.registry.register(metrics.CallbackGauge(
+        "session_event_subscribers", "Open session event streams.",
+        lambda: event_bus.stats()["subscribers"],
+    ))
+
+
+def startup() -> None:
+    """Migrate the schema and create the default superadmin."""
+    logger.info("Starting application...")
+    log_database_profile()
+    ensure_schema(engine, auto_migrate=settings.DB_AUTO_MIGRATE)
+
+    db = SessionLocal()
+    try:
+        exists = db.query(User).filter(User.role == "superadmin").first()
+        if not exists:
+            logger.info("Creating default superadmin user")
+            u = User(
+                username=settings.SUPERADMIN_USERNAME,
+                password_hash=get_password_hash(settings.SUPERADMIN_PASSWORD),
+                role="superadmin",
+                table_id=None,
+                is_active=True,
+            )
+            db.add(u)
+            db.commit()
+            logger.info(f"Superadmin user '{settings.SUPERADMIN_USERNAME}' created successfully")
+        else:
+            logger.info("Superadmin user already exists")
+    finally:
+        db.close()
+
+    logger.info("Application startup complete")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Startup, then on shutdown the disposal of the async engine's pool."""
+    startup()
+    yield
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="Chips Manager", version="1.0.0")
+    app = FastAPI(title="Chips Manager", version="1.0.0", lifespan=lifespan)
+    register_runtime_metrics()
 
     app.add_middleware(
         CORSMiddleware,
@@ -40,22 +114,59 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-        expose_headers=["Content-Disposition"],
+        expose_headers=["Content-Disposition", "ETag", NEXT_CURSOR_HEADER, IDEMPOTENT_REPLAY_HEADER],
     )
 
-    # Add request logging middleware
+    # Request logging and metrics middleware
     @app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        """Log incoming requests."""
-        logger.info(f"Request: {request.method} {request.url.path}")
-        response = await call_next(request)
-        logger.info(f"Response: {request.method} {request.url.path} - Status: {response.status_code}")
+    async def observe_requests(request: Request, call_next):
+        """Log and time requests, counting the SQL statements they execute."""
+        started = time.perf_counter()
+        stats = metrics.RequestDBStats(track_shapes=settings.SQL_DEBUG)
+        token = metrics.request_db_stats.set(stats)
+        metrics.HTTP_IN_FLIGHT.inc()
+        status_code = 500
+        route_path = "unmatched"
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.HTTP_IN_FLIGHT.dec()
+            metrics.request_db_stats.reset(token)
+            # Route template (e.g. /sessions/{session_id}/seats) keeps the label set bounded
+            route = request.scope.get("route")
+            route_path = getattr(route, "path", None) or route_path
+            metrics.observe_request(request.method, route_path, status_code, elapsed, stats)
+            logger.info(
+                f"{request.method} {request.url.path} - Status: {status_code} - "
+                f"{elapsed * 1000:.1f} ms, {stats.statements} SQL statements"
+            )
+
+        if settings.SQL_DEBUG:
+            problems = sql_debug.check_request(
+                request.method, route_path, stats, settings.SQL_DEBUG_REPEAT_THRESHOLD
+            )
+            for problem in problems:
+                logger.warning(f"SQL debug: {request.method} {route_path}: {problem}")
+            if problems and settings.SQL_DEBUG_STRICT:
+                return JSONResponse(
+                    status_code=500,
+                    content={"detail": "SQL debug check failed", "problems": problems},
+                )
         return response
 
-    app.include_router(auth_router)
-    app.include_router(sessions_router)
-    app.include_router(admin_router)
-    app.include_router(report_router)
+    # DB_ASYNC swaps in the async handlers of the auth, session and report routes
+    if settings.DB_ASYNC:
+        app.include_router(async_auth_router)
+        app.include_router(async_sessions_router)
+        app.include_router(admin_router)
+        app.include_router(async_report_router)
+    else:
+        app.include_router(auth_router)
+        app.include_router(sessions_router)
+        app.include_router(admin_router)
+        app.include_router(report_router)
 
     @app.get("/")
     def root():
@@ -65,110 +176,11 @@ def create_app() -> FastAPI:
     def health():
         return {"status": "ok"}
 
-    @app.on_event("startup")
-    def startup():
-        logger.info("Starting application...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created/verified")
-
-        # Migrate: add dealer_id and waiter_id columns to sessions if missing
-        with engine.connect() as conn:
-            try:
-                conn.execute(text("SELECT dealer_id FROM sessions LIMIT 1"))
-            except Exception:
-                conn.execute(text("ALTER TABLE sessions ADD COLUMN dealer_id INTEGER REFERENCES users(id)"))
-                conn.commit()
-            try:
-                conn.execute(text("SELECT waiter_id FROM sessions LIMIT 1"))
-            except Exception:
-                conn.execute(text("ALTER TABLE sessions ADD COLUMN waiter_id INTEGER REFERENCES users(id)"))
-                conn.commit()
-
-        # Migrate: add hourly_rate column to users if missing
-        with engine.connect() as conn:
-            try:
-                conn.execute(text("SELECT hourly_rate FROM users LIMIT 1"))
-            except Exception:
-                conn.execute(text("ALTER TABLE users ADD COLUMN hourly_rate INTEGER"))
-                conn.commit()
-
-        # Migrate: add closed_at column to sessions if missing
-        with engine.connect() as conn:
-            try:
-                conn.execute(text("SELECT closed_at FROM sessions LIMIT 1"))
-            except Exception:
-                conn.execute(text("ALTER TABLE sessions ADD COLUMN closed_at DATETIME"))
-                conn.commit()
-
-        # Migrate: add rake_in and rake_out columns to sessions if missing
-        with engine.connect() as conn:
-            try:
-                conn.execute(text("SELECT rake_in FROM sessions LIMIT 1"))
-            except Exception:
-                conn.execute(text("ALTER TABLE sessions ADD COLUMN rake_in INTEGER NOT NULL DEFAULT 0"))
-                conn.commit()
-            try:
-                conn.execute(text("SELECT rake_out FROM sessions LIMIT 1"))
-            except Exception:
-                conn.execute(text("ALTER TABLE sessions ADD COLUMN rake_out INTEGER NOT NULL DEFAULT 0"))
-                conn.commit()
-
-        # Migrate: add payment_type column to chip_purchases if missing
-        with engine.connect() as conn:
-            try:
-                conn.execute(text("SELECT payment_type FROM chip_purchases LIMIT 1"))
-            except Exception:
-                conn.execute(text("ALTER TABLE chip_purchases ADD COLUMN payment_type VARCHAR(16) NOT NULL DEFAULT 'cash'"))
-                conn.commit()
-
-        # Migrate: add chips_in_play column to sessions if missing
-        with engine.connect() as conn:
-            try:
-                conn.execute(text("SELECT chips_in_play FROM sessions LIMIT 1"))
-            except Exception as e:
-                logger.info(f"Adding chips_in_play column to sessions: {e}")
-                conn.execute(text("ALTER TABLE sessions ADD COLUMN chips_in_play INTEGER NOT NULL DEFAULT 0"))
-                conn.commit()
-                logger.info("Successfully added chips_in_play column to sessions")
-
-        # Migrate: create casino_balance_adjustments table if missing
-        with engine.connect() as conn:
-            try:
-                conn.execute(text("SELECT id FROM casino_balance_adjustments LIMIT 1"))
-            except Exception:
-                conn.execute(text("""
-                    CREATE TABLE casino_balance_adjustments (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        created_at DATETIME NOT NULL,
-                        amount INTEGER NOT NULL,
-                        comment TEXT NOT NULL,
-                        created_by_user_id INTEGER NOT NULL,
-                        FOREIGN KEY (created_by_user_id) REFERENCES users(id)
-                    )
-                """))
-                conn.commit()
-
-        db = SessionLocal()
-        try:
-          exists = db.query(User).filter(User.role == "superadmin").first()
-          if not exists:
-              logger.info("Creating default superadmin user")
-              u = User(
-                  username=settings.SUPERADMIN_USERNAME,
-                  password_hash=get_password_hash(settings.SUPERADMIN_PASSWORD),
-                  role="superadmin",
-                  table_id=None,
-                  is_active=True,
-              )
-              db.add(u)
-              db.commit()
-              logger.info(f"Superadmin user '{settings.SUPERADMIN_USERNAME}' created successfully")
-          else:
-              logger.info("Superadmin user already exists")
-        finally:
-            db.close()
-        
-        logger.info("Application startup complete")
+    @app.get("/metrics", include_in_schema=False)
+    def metrics_endpoint():
+        if not settings.METRICS_ENABLED:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
     return app
 
@@ -15,7 +15,10 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    TypeDecorator,
     UniqueConstraint,
+    insert_sentinel,
+    text,
 )
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -24,6 +27,25 @@ from ..core.datetime_utils import utc_now
 Base = declarative_base()
 
 
+class UTCDateTime(TypeDecorator):
+    """
+    Timestamp stored as naive UTC (TIMESTAMP WITHOUT TIME ZONE / DATETIME).
+
+    Aware values (utc_now) are converted to UTC and stripped of their zone on
+    the way in. Without it PostgreSQL would store them in the server's
+    TimeZone and asyncpg would reject them; working-day bucketing relies on
+    every stored timestamp being UTC.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(dt.timezone.utc).replace(tzinfo=None)
+        return value
+
+
 class Table(Base):
     __tablename__ = "tables"
 
@@ -63,9 +85,9 @@ class Session(Base):
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     table_id = Column(Integer, ForeignKey("tables.id"), nullable=False, index=True)
     date = Column(Date, nullable=False, index=True)
-    status = Column(String(16), nullable=False, default="open", index=True)  # open|closed
-    created_at = Column(DateTime, nullable=False, default=utc_now, index=True)
-    closed_at = Column(DateTime, nullable=True)  # When session was closed
+    status = Column(String(16), nullable=False, default="open")  # open|closed
+    created_at = Column(UTCDateTime, nullable=False, default=utc_now, index=True)
+    closed_at = Column(UTCDateTime, nullable=True)  # When session was closed
 
     # Staff assignments
     dealer_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
@@ -74,6 +96,14 @@ class Session(Base):
     # Chips in play tracking (informational only)
     chips_in_play = Column(Integer, nullable=False, default=0)  # Current chip count on table (auto-incremented)
 
+    # Running chip totals, updated in the same transaction as every chip operation
+    # (see SessionTotalsService; rebuilt from chip_ops/chip_purchases by `reconcile-totals`)
+    total_buyins = Column(Integer, nullable=False, default=0)  # Sum of positive chip ops
+    total_cashouts = Column(Integer, nullable=False, default=0)  # Sum of negative chip ops (absolute value)
+    buyin_cash = Column(Integer, nullable=False, default=0)  # Cash chip purchases
+    buyin_credit = Column(Integer, nullable=False, default=0)  # Outstanding credit chip purchases
+    closing_cashout = Column(Integer, nullable=False, default=0)  # Cashout purchases recorded on close (absolute value)
+
     table = relationship("Table", back_populates="sessions")
     seats = relationship("Seat", back_populates="session", cascade="all, delete-orphan")
     ops = relationship("ChipOp", back_populates="session", cascade="all, delete-orphan")
@@ -84,6 +114,15 @@ class Session(Base):
     # it would prevent multiple closed sessions for the same table/date.
     # Instead, we enforce "only one open session per table" in application logic.
 
+    __table_args__ = (
+        # Closed sessions listing of a table (keyset pagination, newest first)
+        Index("ix_sessions_table_status_created_id", "table_id", "status", "created_at", "id"),
+        # Open sessions of a working day (report date probe)
+        Index("ix_sessions_status_created", "status", "created_at"),
+        # Open session of a dealer (exclusive dealer assignment)
+        Index("ix_sessions_status_dealer", "status", "dealer_id"),
+    )
+
 
 class Seat(Base):
     __tablename__ = "seats"
@@ -107,12 +146,21 @@ class ChipOp(Base):
     __tablename__ = "chip_ops"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    session_id = Column(String(36), ForeignKey("sessions.id"), nullable=False, index=True)
+    session_id = Column(String(36), ForeignKey("sessions.id"), nullable=False)
     seat_no = Column(Integer, nullable=False)
     amount = Column(Integer, nullable=False)
-    created_at = Column(DateTime, nullable=False, default=utc_now)
+    created_at = Column(UTCDateTime, nullable=False, default=utc_now)
+
+    # Lets bulk inserts return IDs in parameter order with one statement on
+    # SQLite too (it has no implicit sentinel); NULL outside such inserts
+    _sentinel = insert_sentinel("_sentinel")
 
     session = relationship("Session", back_populates="ops")
+
+    __table_args__ = (
+        # Chip history of a seat, latest first (undo)
+        Index("ix_chip_ops_session_seat_id", "session_id", "seat_no", "id"),
+    )
     
     
 class ChipPurchase(Base):
@@ -120,17 +168,17 @@ class ChipPurchase(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
-    table_id = Column(Integer, ForeignKey("tables.id"), nullable=False, index=True)
+    table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
 
     # IMPORTANT: type must match sessions.id
-    session_id = Column(String, ForeignKey("sessions.id"), nullable=False, index=True)
+    session_id = Column(String, ForeignKey("sessions.id"), nullable=False)
 
-    seat_no = Column(Integer, nullable=False, index=True)
+    seat_no = Column(Integer, nullable=False)
     amount = Column(Integer, nullable=False)
 
     chip_op_id = Column(Integer, ForeignKey("chip_ops.id"), nullable=False, unique=True, index=True)
 
-    created_at = Column(DateTime, nullable=False, default=utc_now, index=True)
+    created_at = Column(UTCDateTime, nullable=False, default=utc_now)
 
     created_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
@@ -144,6 +192,11 @@ class ChipPurchase(Base):
 
     __table_args__ = (
         UniqueConstraint("chip_op_id", name="uq_chip_purchases_chip_op_id"),
+        # Keyset pagination of the purchase log (newest first, optionally per table)
+        Index("ix_chip_purchases_created_id", "created_at", "id"),
+        Index("ix_chip_purchases_table_created_id", "table_id", "created_at", "id"),
+        # Credit purchases of a seat
+        Index("ix_chip_purchases_session_seat_type", "session_id", "seat_no", "payment_type"),
     )
 
 
@@ -153,7 +206,7 @@ class CasinoBalanceAdjustment(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     
     # Timestamp of when the adjustment was made
-    created_at = Column(DateTime, nullable=False, default=utc_now, index=True)
+    created_at = Column(UTCDateTime, nullable=False, default=utc_now)
     
     # Amount (positive for profit, negative for expense)
     amount = Column(Integer, nullable=False)
@@ -165,3 +218,102 @@ class CasinoBalanceAdjustment(Base):
     created_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     
     created_by = relationship("User")
+
+    # Insert sentinel, as on chip_ops: close returns the IDs of its bulk-inserted adjustments in order
+    _sentinel = insert_sentinel("_sentinel")
+
+    __table_args__ = (
+        # Keyset pagination of the adjustment log (newest first)
+        Index("ix_casino_balance_adjustments_created_id", "created_at", "id"),
+        # Report totals of a time window, answered from the index alone
+        Index("ix_casino_balance_adjustments_created_amount", "created_at", "amount"),
+    )
+
+
+class DailySummary(Base):
+    # Per working day and table aggregate of session chip totals, maintained
+    # incrementally by DailySummaryService (rebuilt by POST /api/admin/day-summary/rebuild)
+    __tablename__ = "daily_summary"
+
+    working_day = Column(Date, primary_key=True)
+    table_id = Column(Integer, ForeignKey("tables.id"), primary_key=True)
+
+    sessions_count = Column(Integer, nullable=False, default=0)
+    open_sessions = Column(Integer, nullable=False, default=0)
+    buyin_cash = Column(Integer, nullable=False, default=0)
+    buyin_credit = Column(Integer, nullable=False, default=0)
+    cashout = Column(Integer, nullable=False, default=0)  # Absolute value
+    player_balance = Column(Integer, nullable=False, default=0)  # Sum of seat totals
+
+    updated_at = Column(UTCDateTime, nullable=False, default=utc_now, onupdate=utc_now)
+
+
+class CreditLedgerEntry(Base):
+    # Append-only history of player credit, written by CreditLedgerService:
+    # debits (credit buy-ins) are positive, repayments and reversals (undone
+    # credit buy-ins) negative
+    __tablename__ = "credit_ledger"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(String(36), ForeignKey("sessions.id"), nullable=False)
+    table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
+    seat_no = Column(Integer, nullable=False)
+    player_name = Column(String(255), nullable=True)  # Player name at the time of the entry
+
+    entry_type = Column(String(16), nullable=False)  # debit | repayment | reversal
+    amount = Column(Integer, nullable=False)
+
+    # Not foreign keys: chip ops are deleted on undo, the ledger keeps the reference
+    chip_op_id = Column(Integer, nullable=True)
+    adjustment_id = Column(Integer, ForeignKey("casino_balance_adjustments.id"), nullable=True)
+
+    created_at = Column(UTCDateTime, nullable=False, default=utc_now)
+    created_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    __table_args__ = (
+        Index("ix_credit_ledger_session_seat", "session_id", "seat_no", "id"),
+        Index("ix_credit_ledger_player", "player_name"),
+        Index("ix_credit_ledger_created_id", "created_at", "id"),
+    )
+
+
+class CreditBalance(Base):
+    # Outstanding credit per session and seat (sum of its credit_ledger entries)
+    __tablename__ = "credit_balances"
+
+    session_id = Column(String(36), ForeignKey("sessions.id"), primary_key=True)
+    seat_no = Column(Integer, primary_key=True)
+    table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
+    player_name = Column(String(255), nullable=True)  # Current player name of the seat
+    balance = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(UTCDateTime, nullable=False, default=utc_now, onupdate=utc_now)
+
+    __table_args__ = (
+        # Open debts only, so the index stays small as settled history grows
+        Index(
+            "ix_credit_balances_open",
+            "table_id",
+            "player_name",
+            sqlite_where=text("balance > 0"),
+            postgresql_where=text("balance > 0"),
+        ),
+        Index("ix_credit_balances_player", "player_name"),
+    )
+
+
+class IdempotencyKey(Base):
+    # Responses of write requests sent with an Idempotency-Key header, replayed on retry
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(128), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # Endpoint and payload the key was first used with
+    response_body = Column(Text, nullable=False)  # JSON
+
+    created_at = Column(UTCDateTime, nullable=False, default=utc_now)
+    expires_at = Column(UTCDateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
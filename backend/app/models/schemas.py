@@ -183,3 +183,44 @@ class CloseCreditOut(BaseModel):
     success: bool
     message: str
     adjustment_id: int | None = None
+
+
+class CreditLedgerEntryOut(BaseModel):
+    id: int
+    session_id: str
+    table_id: int
+    seat_no: int
+    player_name: str | None
+    entry_type: str  # debit | repayment | reversal
+    amount: int  # Positive for debits, negative for repayments and reversals
+    chip_op_id: int | None
+    adjustment_id: int | None
+    created_at: dt.datetime
+    created_by_user_id: int | None
+
+    class Config:
+        from_attributes = True
+
+
+class OpenDebtOut(BaseModel):
+    session_id: str
+    session_date: dt.date
+    table_id: int
+    table_name: str
+    seat_no: int
+    player_name: str | None
+    amount: int
+    updated_at: dt.datetime
+
+
+class PlayerDebtOut(BaseModel):
+    player_name: str | None
+    count: int
+    amount: int
+
+
+class OpenDebtsOut(BaseModel):
+    count: int
+    total: int
+    players: list[PlayerDebtOut]
+    debts: list[OpenDebtOut]
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+from typing import Any, cast
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Query, Session as DBSession
+
+from ..core.constants import CREDIT_ENTRY_DEBIT
+from ..core.datetime_utils import utc_now
+from ..core.sql_debug import unbudgeted
+from ..models.db import ChipPurchase, CreditBalance, CreditLedgerEntry, Seat, Session, Table
+
+
+def _filter_open(query: Query, table_id: int | None, player_name: str | None) -> Query:
+    query = query.filter(CreditBalance.balance > 0)
+    if table_id is not None:
+        query = query.filter(CreditBalance.table_id == table_id)
+    if player_name is not None:
+        query = query.filter(CreditBalance.player_name == player_name)
+    return query
+
+
+class CreditLedgerService:
+    """
+    Service maintaining the credit ledger and the per-seat credit balances.
+
+    Every change of a player's credit appends a `credit_ledger` entry and
+    moves the matching `credit_balances` row by the same amount, in the
+    caller's transaction.
+    """
+
+    @staticmethod
+    def record(db: DBSession, session: Session, entries: list[dict[str, Any]]) -> None:
+        """
+        Append ledger entries of a session and update the seat balances.
+
+        Args:
+            db: Database session
+            session: Session object
+            entries: Dicts with seat_no, player_name, entry_type, amount (signed)
+                and optionally chip_op_id, adjustment_id, created_by_user_id
+        """
+        if not entries:
+            return
+
+        # Pending changes of the caller are its own statements; the ledger
+        # writes are credit bookkeeping, outside the SQL debug budgets
+        db.flush()
+        with unbudgeted():
+            CreditLedgerService._write(db, session, entries)
+
+    @staticmethod
+    def _write(db: DBSession, session: Session, entries: list[dict[str, Any]]) -> None:
+        session_id = str(cast(str, session.id))
+        table_id = int(cast(int, session.table_id))
+        now = utc_now()
+
+        db.execute(
+            insert(CreditLedgerEntry),
+            [
+                {
+                    "session_id": session_id,
+                    "table_id": table_id,
+                    "chip_op_id": None,
+                    "adjustment_id": None,
+                    "created_by_user_id": None,
+                    "created_at": now,
+                    **entry,
+                }
+                for entry in entries
+            ],
+        )
+
+        deltas: dict[int, tuple[int, str | None]] = {}
+        for entry in entries:
+            seat_no = int(entry["seat_no"])
+            amount, _ = deltas.get(seat_no, (0, None))
+            deltas[seat_no] = (amount + int(entry["amount"]), entry["player_name"])
+
+        if len(deltas) == 1:
+            [(seat_no, (amount, player_name))] = deltas.items()
+            result = db.execute(
+                update(CreditBalance)
+                .where(CreditBalance.session_id == session_id, CreditBalance.seat_no == seat_no)
+                .values(balance=CreditBalance.balance + amount, player_name=player_name, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            existing = {seat_no} if result.rowcount else set()
+        else:
+            # Several seats (batch, session close): a constant number of statements
+            existing = set(
+                db.scalars(
+                    select(CreditBalance.seat_no).where(
+                        CreditBalance.session_id == session_id,
+                        CreditBalance.seat_no.in_(list(deltas)),
+                    )
+                ).all()
+            )
+            if existing:
+                table = CreditBalance.__table__
+                db.connection().execute(
+                    update(table)
+                    .where(table.c.session_id == session_id, table.c.seat_no == bindparam("b_seat_no"))
+                    .values(
+                        balance=table.c.balance + bindparam("b_amount"),
+                        player_name=bindparam("b_player_name"),
+                        updated_at=now,
+                    ),
+                    [
+                        {"b_seat_no": seat_no, "b_amount": amount, "b_player_name": player_name}
+                        for seat_no, (amount, player_name) in deltas.items()
+                        if seat_no in existing
+                    ],
+                )
+
+        missing = [
+            {
+                "session_id": session_id,
+                "seat_no": seat_no,
+                "table_id": table_id,
+                "player_name": player_name,
+                "balance": amount,
+                "updated_at": now,
+            }
+            for seat_no, (amount, player_name) in deltas.items()
+            if seat_no not in existing
+        ]
+        if missing:
+            db.execute(insert(CreditBalance), missing)
+
+    @staticmethod
+    def rename_player(db: DBSession, session_id: str, seat_no: int, player_name: str | None) -> None:
+        """
+        Keep the player name of a seat's balance in sync with the seat.
+
+        Args:
+            db: Database session
+            session_id: Session ID
+            seat_no: Seat number
+            player_name: New player name
+        """
+        db.execute(
+            update(CreditBalance)
+            .where(CreditBalance.session_id == session_id, CreditBalance.seat_no == seat_no)
+            .values(player_name=player_name)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def get_balance(db: DBSession, session_id: str, seat_no: int) -> int:
+        """
+        Get the outstanding credit of a seat.
+
+        Args:
+            db: Database session
+            session_id: Session ID
+            seat_no: Seat number
+
+        Returns:
+            Outstanding credit (0 if the seat never had credit)
+        """
+        balance = (
+            db.query(CreditBalance.balance)
+            .filter(CreditBalance.session_id == session_id, CreditBalance.seat_no == seat_no)
+            .scalar()
+        )
+        return int(balance or 0)
+
+    @staticmethod
+    def get_open_balances(db: DBSession, session_ids: list[str]) -> list[CreditBalance]:
+        """
+        Get the seats of the given sessions that still owe credit.
+
+        Args:
+            db: Database session
+            session_ids: Session IDs
+
+        Returns:
+            Balances ordered by session and seat number
+        """
+        if not session_ids:
+            return []
+        return (
+            db.query(CreditBalance)
+            .filter(CreditBalance.session_id.in_(session_ids), CreditBalance.balance > 0)
+            .order_by(CreditBalance.session_id.asc(), CreditBalance.seat_no.asc())
+            .all()
+        )
+
+    @staticmethod
+    def open_debt_totals(
+        db: DBSession,
+        table_id: int | None = None,
+        player_name: str | None = None,
+    ) -> tuple[int, int]:
+        """
+        Count and sum the open debts.
+
+        Args:
+            db: Database session
+            table_id: Optional table to restrict to
+            player_name: Optional player to restrict to
+
+        Returns:
+            (number of indebted seats, total outstanding credit)
+        """
+        count, total = _filter_open(
+            db.query(func.count(), func.coalesce(func.sum(CreditBalance.balance), 0)),
+            table_id,
+            player_name,
+        ).one()
+        return int(count), int(total)
+
+    @staticmethod
+    def open_debts_by_player(
+        db: DBSession,
+        table_id: int | None = None,
+        player_name: str | None = None,
+    ) -> list[tuple[str | None, int, int]]:
+        """
+        Sum the open debts per player across sessions.
+
+        Args:
+            db: Database session
+            table_id: Optional table to restrict to
+            player_name: Optional player to restrict to
+
+        Returns:
+            (player_name, number of indebted seats, outstanding credit), largest debt first
+        """
+        total = func.sum(CreditBalance.balance)
+        rows = (
+            _filter_open(
+                db.query(CreditBalance.player_name, func.count(), total),
+                table_id,
+                player_name,
+            )
+            .group_by(CreditBalance.player_name)
+            .order_by(total.desc(), CreditBalance.player_name.asc())
+            .all()
+        )
+        return [(name, int(count), int(amount)) for name, count, amount in rows]
+
+    @staticmethod
+    def list_open_debts(
+        db: DBSession,
+        table_id: int | None = None,
+        player_name: str | None = None,
+        limit: int | None = None,
+    ) -> list[Any]:
+        """
+        List the open debts, newest session first.
+
+        Args:
+            db: Database session
+            table_id: Optional table to restrict to
+            player_name: Optional player to restrict to
+            limit: Optional maximum number of rows
+
+        Returns:
+            Rows of (balance, session date, table name)
+        """
+        query = (
+            _filter_open(
+                db.query(CreditBalance, Session.date, Table.name)
+                .join(Session, Session.id == CreditBalance.session_id)
+                .join(Table, Table.id == CreditBalance.table_id),
+                table_id,
+                player_name,
+            )
+            .order_by(Session.created_at.desc(), CreditBalance.seat_no.asc())
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    @staticmethod
+    def backfill_empty(db: DBSession) -> int:
+        """
+        Fill an empty ledger from the outstanding credit purchases.
+
+        Used by the benchmark seed once its history is written; migration 6
+        does the same for existing databases with its own frozen SQL.
+        Settled credit is deleted from chip_purchases, so only one debit per
+        outstanding credit purchase can be recovered. The ledger is
+        append-only history that cannot be derived again once it has entries,
+        so it refuses to run on a non-empty one.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of seats with outstanding credit
+
+        Raises:
+            RuntimeError: If the ledger or the balances already have rows
+        """
+        if (
+            db.query(CreditLedgerEntry.id).first() is not None
+            or db.query(CreditBalance.session_id).first() is not None
+        ):
+            raise RuntimeError("Credit ledger is not empty: its history cannot be rebuilt")
+
+        purchases = (
+            db.query(
+                ChipPurchase.session_id,
+                ChipPurchase.table_id,
+                ChipPurchase.seat_no,
+                Seat.player_name,
+                ChipPurchase.amount,
+                ChipPurchase.chip_op_id,
+                ChipPurchase.created_at,
+                ChipPurchase.created_by_user_id,
+            )
+            .outerjoin(
+                Seat,
+                (Seat.session_id == ChipPurchase.session_id) & (Seat.seat_no == ChipPurchase.seat_no),
+            )
+            .filter(ChipPurchase.payment_type == "credit", ChipPurchase.amount > 0)
+            .order_by(ChipPurchase.id.asc())
+            .all()
+        )
+        if not purchases:
+            return 0
+
+        db.execute(
+            insert(CreditLedgerEntry),
+            [
+                {
+                    "session_id": row.session_id,
+                    "table_id": row.table_id,
+                    "seat_no": row.seat_no,
+                    "player_name": row.player_name,
+                    "entry_type": CREDIT_ENTRY_DEBIT,
+                    "amount": row.amount,
+                    "chip_op_id": row.chip_op_id,
+                    "adjustment_id": None,
+                    "created_at": row.created_at,
+                    "created_by_user_id": row.created_by_user_id,
+                }
+                for row in purchases
+            ],
+        )
+
+        balances = (
+            db.query(
+                CreditLedgerEntry.session_id,
+                CreditLedgerEntry.seat_no,
+                CreditLedgerEntry.table_id,
+                func.max(CreditLedgerEntry.player_name),
+                func.sum(CreditLedgerEntry.amount),
+            )
+            .group_by(CreditLedgerEntry.session_id, CreditLedgerEntry.seat_no, CreditLedgerEntry.table_id)
+            .all()
+        )
+        now = utc_now()
+        db.execute(
+            insert(CreditBalance),
+            [
+                {
+                    "session_id": session_id,
+                    "seat_no": seat_no,
+                    "table_id": table_id,
+                    "player_name": player_name,
+                    "balance": int(balance),
+                    "updated_at": now,
+                }
+                for session_id, seat_no, table_id, player_name, balance in balances
+            ],
+        )
+        return len(balances)
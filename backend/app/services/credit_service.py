@@ -2,9 +2,16 @@ from __future__ import annotations
 
 from typing import Any, cast
 
+from sqlalchemy import delete, insert
 from sqlalchemy.orm import Session as DBSession
 
-from ..models.db import CasinoBalanceAdjustment, ChipPurchase, Seat, Session, Table, User
+from ..core.constants import CREDIT_ENTRY_REPAYMENT
+from ..core.datetime_utils import utc_now
+from ..core.principal import Principal
+
+from ..models.db import CasinoBalanceAdjustment, ChipPurchase, Seat, Session
+from .credit_ledger_service import CreditLedgerService
+from .session_totals_service import SessionTotalsService
 
 
 class CreditService:
@@ -85,14 +92,15 @@ class CreditService:
         session: Session,
         seat: Seat,
         amount_to_close: int,
-        user: User,
-    ) -> None:
+        user: Principal,
+    ) -> CasinoBalanceAdjustment:
         """
         Close credit for a player by creating a balance adjustment and removing credit purchases.
         
         This method:
         1. Creates a balance adjustment for the credit amount
         2. Removes or reduces credit purchases to match the amount to close
+        3. Records the repayment in the credit ledger
         
         Args:
             db: Database session
@@ -100,6 +108,9 @@ class CreditService:
             seat: Seat object
             amount_to_close: Amount of credit to close
             user: User performing the operation
+            
+        Returns:
+            Created balance adjustment
         """
         # Get credit purchases for this seat
         credit_purchases = CreditService.get_credit_purchases_for_seat(
@@ -109,8 +120,8 @@ class CreditService:
         # Get player name and session info for comment
         player_name = seat.player_name if seat.player_name else f"Seat {seat.seat_no}"
         
-        table = db.query(Table).filter(Table.id == session.table_id).first()
-        table_name = table.name if table else "Unknown"
+        # Relationship load (identity map hit when the table is already loaded)
+        table_name = session.table.name if session.table else "Unknown"
         
         session_date = session.date.strftime("%d.%m.%Y") if session.date else ""
         
@@ -139,38 +150,102 @@ class CreditService:
                 cp.amount = cast(Any, cp_amount - remaining_to_close)
                 remaining_to_close = 0
 
+        closed = amount_to_close - remaining_to_close
+        CreditLedgerService.record(db, session, [{
+            "seat_no": int(cast(int, seat.seat_no)),
+            "player_name": seat.player_name,
+            "entry_type": CREDIT_ENTRY_REPAYMENT,
+            "amount": -closed,
+            "adjustment_id": int(cast(int, adjustment.id)),
+            "created_by_user_id": int(cast(int, user.id)),
+        }])
+        SessionTotalsService.reduce_credit(session, closed)
+        return adjustment
+
     @staticmethod
     def close_credit_for_session(
         db: DBSession,
         session: Session,
-        seat: Seat,
-        user: User,
-    ) -> int:
+        seats: list[tuple[int, str | None]],
+        user: Principal,
+    ) -> dict[int, int]:
         """
-        Close all credit for a seat when closing a session.
+        Close all credit for the given seats when closing a session.
         
-        This is used during session closing to automatically close all player credits.
+        Loads the credit purchases of the whole session in one query, then writes
+        one balance adjustment per indebted seat with a bulk insert, records the
+        repayments in the credit ledger and deletes the closed purchases with a
+        single DELETE.
         
         Args:
             db: Database session
             session: Session object
-            seat: Seat object
+            seats: (seat_no, player_name) of the seats whose credit is closed
             user: User performing the operation
             
         Returns:
-            Amount of credit that was closed
+            Amount of credit that was closed, keyed by seat number
         """
-        # Get credit purchases for this seat
-        credit_purchases = CreditService.get_credit_purchases_for_seat(
-            db, cast(str, session.id), int(cast(int, seat.seat_no))
+        if not seats:
+            return {}
+
+        seat_nos = [seat_no for seat_no, _ in seats]
+        credit_rows = (
+            db.query(ChipPurchase.id, ChipPurchase.seat_no, ChipPurchase.amount)
+            .filter(
+                ChipPurchase.session_id == session.id,
+                ChipPurchase.seat_no.in_(seat_nos),
+                ChipPurchase.payment_type == "credit",
+                ChipPurchase.amount > 0,
+            )
+            .all()
         )
-        
-        total_credit = CreditService.calculate_total_credit(credit_purchases)
-        
-        if total_credit == 0:
-            return 0
-        
-        # Close all credit
-        CreditService.close_credit(db, session, seat, total_credit, user)
-        
-        return total_credit
+        if not credit_rows:
+            return {}
+
+        credit_by_seat: dict[int, int] = {}
+        for _, seat_no, amount in credit_rows:
+            credit_by_seat[int(seat_no)] = credit_by_seat.get(int(seat_no), 0) + int(amount)
+
+        table_name = session.table.name if session.table else "Unknown"
+        session_date = session.date.strftime("%d.%m.%Y") if session.date else ""
+
+        adjustments = []
+        repaid_seats = []
+        for seat_no, player_name in sorted(seats):
+            amount = credit_by_seat.get(seat_no, 0)
+            if amount == 0:
+                continue
+            player = player_name if player_name else f"Seat {seat_no}"
+            # Positive amount = profit for casino
+            adjustments.append({
+                "amount": amount,
+                "comment": f"Долг ({player}) - {table_name} - {session_date}".strip(),
+                "created_by_user_id": int(cast(int, user.id)),
+                "created_at": utc_now(),
+            })
+            repaid_seats.append((seat_no, player_name, amount))
+
+        adjustment_ids = db.scalars(
+            insert(CasinoBalanceAdjustment).returning(CasinoBalanceAdjustment.id, sort_by_parameter_order=True),
+            adjustments,
+        ).all()
+        CreditLedgerService.record(db, session, [
+            {
+                "seat_no": seat_no,
+                "player_name": player_name,
+                "entry_type": CREDIT_ENTRY_REPAYMENT,
+                "amount": -amount,
+                "adjustment_id": int(adjustment_id),
+                "created_by_user_id": int(cast(int, user.id)),
+            }
+            for (seat_no, player_name, amount), adjustment_id in zip(repaid_seats, adjustment_ids)
+        ])
+        db.execute(
+            delete(ChipPurchase)
+            .where(ChipPurchase.id.in_([row[0] for row in credit_rows]))
+            .execution_options(synchronize_session=False)
+        )
+        SessionTotalsService.reduce_credit(session, sum(credit_by_seat.values()))
+
+        return credit_by_seat
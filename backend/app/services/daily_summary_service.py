@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any, cast
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as DBSession
+
+from ..core.datetime_utils import (
+    WORKING_DAY_END,
+    WORKING_DAY_START,
+    utc_now,
+    working_day_of,
+    working_day_sql,
+)
+from ..models.db import DailySummary, Seat, Session
+from .session_totals_service import SessionTotalsService
+
+_SNAPSHOT_FIELDS = ("buyin_cash", "buyin_credit", "closing_cashout")
+
+
+def _as_int(v: Any) -> int:
+    if v is None:
+        return 0
+    return int(cast(int, v))
+
+
+class DailySummaryService:
+    """
+    Service maintaining the `daily_summary` aggregate (per working day and table).
+
+    Write paths take a snapshot of the session's running totals before
+    changing it and call `record_session_change` afterwards, in the same
+    transaction, so the summary moves by exactly the same deltas.
+    """
+
+    @staticmethod
+    def snapshot(session: Session) -> tuple[int, int, int]:
+        """
+        Capture the session totals the daily summary is derived from.
+
+        Args:
+            session: Session object
+
+        Returns:
+            Tuple of (buyin_cash, buyin_credit, closing_cashout)
+        """
+        return cast(
+            tuple[int, int, int],
+            tuple(_as_int(getattr(session, field)) for field in _SNAPSHOT_FIELDS),
+        )
+
+    @staticmethod
+    def record_session_change(
+        db: DBSession,
+        session: Session,
+        before: tuple[int, int, int],
+        player_balance: int = 0,
+        open_sessions: int = 0,
+    ) -> None:
+        """
+        Apply the change of a session's totals since `before` to the daily summary.
+
+        Args:
+            db: Database session
+            session: Session object (already modified)
+            before: Snapshot taken with `snapshot` before the modification
+            player_balance: Change of the sum of seat totals
+            open_sessions: Change of the number of open sessions (-1 on close)
+        """
+        buyin_cash, buyin_credit, closing_cashout = DailySummaryService.snapshot(session)
+        DailySummaryService.apply(
+            db,
+            session,
+            buyin_cash=buyin_cash - before[0],
+            buyin_credit=buyin_credit - before[1],
+            cashout=closing_cashout - before[2],
+            player_balance=player_balance,
+            open_sessions=open_sessions,
+        )
+
+    @staticmethod
+    def apply(db: DBSession, session: Session, **deltas: int) -> None:
+        """
+        Add deltas to the summary row of the session's working day and table.
+
+        Args:
+            db: Database session
+            session: Session object (must have created_at set)
+            **deltas: DailySummary column name -> amount to add
+        """
+        deltas = {k: v for k, v in deltas.items() if v}
+        if not deltas:
+            return
+
+        working_day = working_day_of(cast(dt.datetime, session.created_at))
+        if working_day is None:
+            # Created between 18:00 and 20:00: not part of any working day report
+            return
+
+        table_id = _as_int(session.table_id)
+        values: dict[str, Any] = {
+            name: getattr(DailySummary, name) + amount for name, amount in deltas.items()
+        }
+        values["updated_at"] = utc_now()
+        # One upsert on both backends: on PostgreSQL sessions of one table and
+        # day are written concurrently (no global write lock as on SQLite), so
+        # the first write of a day must not race another one into a duplicate key
+        upsert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        db.execute(
+            upsert(DailySummary)
+            .values(working_day=working_day, table_id=table_id, updated_at=values["updated_at"], **deltas)
+            .on_conflict_do_update(index_elements=[DailySummary.working_day, DailySummary.table_id], set_=values)
+        )
+
+    @staticmethod
+    def get_day(db: DBSession, working_day: dt.date) -> list[DailySummary]:
+        """
+        Get the summary rows of a working day, ordered by table.
+
+        Args:
+            db: Database session
+            working_day: Calendar date the working day starts on
+
+        Returns:
+            One row per table that had sessions that day
+        """
+        return (
+            db.query(DailySummary)
+            .filter(DailySummary.working_day == working_day)
+            .order_by(DailySummary.table_id.asc())
+            .all()
+        )
+
+    @staticmethod
+    def rebuild_day(db: DBSession, working_day: dt.date) -> list[DailySummary]:
+        """
+        Recompute a working day from raw rows.
+
+        Rebuilds the running totals of the day's sessions from chip_ops and
+        chip_purchases first, then replaces the day's summary rows.
+
+        Args:
+            db: Database session
+            working_day: Calendar date the working day starts on
+
+        Returns:
+            The rebuilt summary rows
+        """
+        start = dt.datetime.combine(working_day, WORKING_DAY_START)
+        end = dt.datetime.combine(working_day + dt.timedelta(days=1), WORKING_DAY_END)
+        in_day = (Session.created_at >= start, Session.created_at < end)
+
+        session_ids = [row[0] for row in db.query(Session.id).filter(*in_day).all()]
+        SessionTotalsService.rebuild(db, session_ids)
+
+        db.query(DailySummary).filter(DailySummary.working_day == working_day).delete(
+            synchronize_session=False
+        )
+
+        balances = dict(
+            db.query(Session.table_id, func.coalesce(func.sum(Seat.total), 0))
+            .join(Seat, Seat.session_id == Session.id)
+            .filter(*in_day)
+            .group_by(Session.table_id)
+            .all()
+        )
+        rows = (
+            db.query(
+                Session.table_id,
+                func.count(Session.id),
+                func.coalesce(func.sum(case((Session.status == "open", 1), else_=0)), 0),
+                func.coalesce(func.sum(Session.buyin_cash), 0),
+                func.coalesce(func.sum(Session.buyin_credit), 0),
+                func.coalesce(func.sum(Session.closing_cashout), 0),
+            )
+            .filter(*in_day)
+            .group_by(Session.table_id)
+            .all()
+        )
+
+        summaries = []
+        for table_id, count, open_count, cash, credit, cashout in rows:
+            summary = DailySummary(
+                working_day=working_day,
+                table_id=int(table_id),
+                sessions_count=int(count),
+                open_sessions=int(open_count),
+                buyin_cash=int(cash),
+                buyin_credit=int(credit),
+                cashout=int(cashout),
+                player_balance=int(balances.get(table_id, 0)),
+            )
+            db.add(summary)
+            summaries.append(summary)
+
+        db.flush()
+        return summaries
+
+    @staticmethod
+    def rebuild_all(db: DBSession) -> int:
+        """
+        Recompute every working day that has sessions.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of working days rebuilt
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            working_day = working_day_sql(Session.created_at)
+            days = {day for (day,) in db.query(working_day).filter(working_day.isnot(None)).distinct()}
+        else:
+            days = {
+                working_day_of(cast(dt.datetime, created_at))
+                for (created_at,) in db.query(Session.created_at).all()
+            }
+            days.discard(None)
+        for day in sorted(cast(set[dt.date], days)):
+            DailySummaryService.rebuild_day(db, day)
+        return len(days)
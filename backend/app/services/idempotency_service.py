@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as DBSession
+
+from ..core.config import settings
+from ..core.constants import IDEMPOTENCY_PURGE_INTERVAL_SECONDS
+from ..core.datetime_utils import utc_now
+from ..core.exceptions import ErrorMessages
+from ..core.sql_debug import unbudgeted
+from ..models.db import IdempotencyKey
+
+
+class IdempotentRequest:
+    """
+    One write request and its Idempotency-Key, as seen by a handler.
+
+    `replay` holds the stored response when the request was already
+    executed. Otherwise the handler runs and calls `save` before committing,
+    so the stored response exists exactly when the change was committed,
+    and `remember` after committing.
+    """
+
+    def __init__(
+        self,
+        store: "IdempotencyStore",
+        user_id: int,
+        key: str | None,
+        request_hash: str,
+        replay: Any = None,
+    ):
+        self.store = store
+        self.user_id = user_id
+        self.key = key
+        self.request_hash = request_hash
+        self.replay = replay
+        self._body: Any = None
+
+    def save(self, db: DBSession, body: Any) -> None:
+        """
+        Store the response in the caller's transaction.
+
+        Raises:
+            HTTPException: 409 if a concurrent request with the same key got there first
+        """
+        if self.key is None:
+            return
+        self._body = body
+        # Surface errors of the handler's own changes before adding the key
+        db.flush()
+        now = utc_now()
+        db.add(IdempotencyKey(
+            user_id=self.user_id,
+            key=self.key,
+            request_hash=self.request_hash,
+            response_body=json.dumps(body, separators=(",", ":"), ensure_ascii=False),
+            created_at=now,
+            expires_at=now + dt.timedelta(seconds=self.store.ttl_seconds),
+        ))
+        with unbudgeted():
+            try:
+                db.flush()
+            except IntegrityError:
+                db.rollback()
+                raise HTTPException(status_code=409, detail=ErrorMessages.IDEMPOTENCY_KEY_IN_PROGRESS)
+            self.store.purge_expired(db)
+
+    def remember(self) -> None:
+        """Put the committed response in the in-memory front cache."""
+        if self.key is None:
+            return
+        self.store.cache_put(self.user_id, self.key, self.request_hash, self._body)
+
+
+class IdempotencyStore:
+    """
+    Stored responses of write requests, keyed by user and Idempotency-Key.
+
+    Responses live in the `idempotency_keys` table for `ttl_seconds` (expired
+    rows are purged at most every few minutes, through the expires_at index),
+    fronted by an in-process LRU so a retry usually costs no query at all.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple[int, str], tuple[float, str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def request_hash(*parts: Any) -> str:
+        """Fingerprint of the endpoint and payload a key is used with."""
+        raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def begin(self, db: DBSession, user_id: int, key: str | None, *request_parts: Any) -> IdempotentRequest:
+        """
+        Look up the stored response of a request.
+
+        Args:
+            db: Database session
+            user_id: ID of the user sending the request
+            key: Idempotency-Key header (None when not sent)
+            request_parts: Endpoint name and payload identifying the request
+
+        Returns:
+            Request whose `replay` is the stored response, or None if it has to run
+
+        Raises:
+            HTTPException: 422 if the key was used for a different request
+        """
+        if key is None or not self.enabled:
+            return IdempotentRequest(self, user_id, None, "")
+
+        request_hash = self.request_hash(*request_parts)
+        stored = self.cache_get(user_id, key)
+        if stored is None:
+            with unbudgeted():
+                row = (
+                    db.query(IdempotencyKey.request_hash, IdempotencyKey.response_body)
+                    .filter(
+                        IdempotencyKey.user_id == user_id,
+                        IdempotencyKey.key == key,
+                        IdempotencyKey.expires_at > utc_now(),
+                    )
+                    .first()
+                )
+            if row is not None:
+                stored = (row.request_hash, json.loads(row.response_body))
+                self.cache_put(user_id, key, *stored)
+
+        if stored is None:
+            return IdempotentRequest(self, user_id, key, request_hash)
+        stored_hash, body = stored
+        if stored_hash != request_hash:
+            raise HTTPException(status_code=422, detail=ErrorMessages.IDEMPOTENCY_KEY_REUSED)
+        return IdempotentRequest(self, user_id, key, request_hash, replay=body)
+
+    def cache_get(self, user_id: int, key: str) -> tuple[str, Any] | None:
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                return None
+            expires_at, request_hash, body = entry
+            if expires_at < time.monotonic():
+                del self._entries[(user_id, key)]
+                return None
+            self._entries.move_to_end((user_id, key))
+            return request_hash, body
+
+    def cache_put(self, user_id: int, key: str, request_hash: str, body: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[(user_id, key)] = (time.monotonic() + self.ttl_seconds, request_hash, body)
+            self._entries.move_to_end((user_id, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def purge_expired(self, db: DBSession) -> None:
+        """Delete expired keys in the caller's transaction, at most once per purge interval."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_purge:
+                return
+            self._next_purge = now + IDEMPOTENCY_PURGE_INTERVAL_SECONDS
+        db.query(IdempotencyKey).filter(IdempotencyKey.expires_at <= utc_now()).delete(synchronize_session=False)
+
+
+idempotency_store = IdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_CACHE_MAX_SIZE)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ReportCache:
+    """
+    Content-addressed on-disk cache of rendered reports.
+
+    Entries are keyed by a hash of the report identity plus a change
+    fingerprint, so a key never points at stale content and entries are
+    never invalidated, only evicted. Eviction is LRU by file mtime (touched
+    on every hit) once the directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ".xlsx"):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(*parts: object) -> str:
+        """Build a cache key (also used as the HTTP ETag) from report identity parts."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(repr(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Path | None:
+        """Return the cached file for `key` (marking it recently used), or None."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, content: bytes | BinaryIO) -> Path | None:
+        """
+        Store `content` under `key` atomically, then evict down to the size limit.
+
+        Args:
+            key: Cache key
+            content: Report bytes, or a binary file positioned at its start
+
+        Returns:
+            Path of the cached file, or None if it was not cached
+        """
+        if not self.enabled:
+            return None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(content, bytes):
+                    f.write(content)
+                else:
+                    shutil.copyfileobj(content, f)
+                size = f.tell()
+            if size > self.max_bytes:
+                os.unlink(tmp)
+                return None
+            os.replace(tmp, path)
+        except OSError:
+            logger.exception("Failed to write report cache entry")
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return None
+
+        self._evict()
+        return path
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for entry in self.directory.glob(f"*{self.suffix}"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    entry.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+report_cache = ReportCache(settings.REPORT_CACHE_DIR, settings.REPORT_CACHE_MAX_BYTES)
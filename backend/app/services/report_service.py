@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session as DBSession
+
+from ..core.datetime_utils import WORKING_DAY_END, WORKING_DAY_START, working_day_of, working_day_sql
+from ..models.db import CasinoBalanceAdjustment, DailySummary
+
+
+@dataclass(frozen=True)
+class ChipTotals:
+    """Chip totals of a working day (or range), summed over tables."""
+
+    sessions_count: int = 0
+    open_sessions: int = 0
+    buyin_cash: int = 0  # Cash buyins (positive only)
+    buyin_credit: int = 0  # Credit buyins (expenses)
+    cashout: int = 0  # Cash cashouts (absolute value)
+    player_balance: int = 0  # Net per-seat totals (what players ended with)
+
+
+@dataclass(frozen=True)
+class AdjustmentTotals:
+    """Balance adjustment totals of a working day (or range)."""
+
+    profit: int = 0  # Positive adjustments
+    expense: int = 0  # Negative adjustments (absolute value)
+
+
+_CHIP_COLUMNS = (
+    func.coalesce(func.sum(DailySummary.sessions_count), 0),
+    func.coalesce(func.sum(DailySummary.open_sessions), 0),
+    func.coalesce(func.sum(DailySummary.buyin_cash), 0),
+    func.coalesce(func.sum(DailySummary.buyin_credit), 0),
+    func.coalesce(func.sum(DailySummary.cashout), 0),
+    func.coalesce(func.sum(DailySummary.player_balance), 0),
+)
+
+
+def _chip_totals(row: tuple) -> ChipTotals:
+    return ChipTotals(*(int(v) for v in row))
+
+
+def _window(start_day: dt.date, end_day: dt.date) -> tuple[dt.datetime, dt.datetime]:
+    return (
+        dt.datetime.combine(start_day, WORKING_DAY_START),
+        dt.datetime.combine(end_day + dt.timedelta(days=1), WORKING_DAY_END),
+    )
+
+
+class ReportService:
+    """
+    Aggregate queries shared by the JSON and XLSX reports.
+
+    Reductions run in SQL (`func.sum`, `case`, `group_by`) and come back as
+    small dataclasses instead of ORM rows.
+    """
+
+    @staticmethod
+    def chip_totals(db: DBSession, working_day: dt.date) -> ChipTotals:
+        """
+        Get the chip totals of a working day from the daily summary.
+
+        Args:
+            db: Database session
+            working_day: Calendar date the working day starts on
+
+        Returns:
+            Totals over all tables (zeros for days without sessions)
+        """
+        row = (
+            db.query(*_CHIP_COLUMNS)
+            .filter(DailySummary.working_day == working_day)
+            .one()
+        )
+        return _chip_totals(row)
+
+    @staticmethod
+    def chip_totals_by_table(db: DBSession, working_day: dt.date) -> dict[int, ChipTotals]:
+        """
+        Get the chip totals of a working day per table.
+
+        Args:
+            db: Database session
+            working_day: Calendar date the working day starts on
+
+        Returns:
+            Dict of table_id -> totals, for tables that had sessions that day
+        """
+        rows = (
+            db.query(DailySummary.table_id, *_CHIP_COLUMNS)
+            .filter(DailySummary.working_day == working_day)
+            .group_by(DailySummary.table_id)
+            .order_by(DailySummary.table_id.asc())
+            .all()
+        )
+        return {int(row[0]): _chip_totals(row[1:]) for row in rows}
+
+    @staticmethod
+    def chip_totals_by_day(
+        db: DBSession,
+        start_day: dt.date,
+        end_day: dt.date,
+    ) -> dict[dt.date, ChipTotals]:
+        """
+        Get the chip totals of every working day in a range in one query.
+
+        Args:
+            db: Database session
+            start_day: First working day (inclusive)
+            end_day: Last working day (inclusive)
+
+        Returns:
+            Dict of working day -> totals, for days that had sessions
+        """
+        rows = (
+            db.query(DailySummary.working_day, *_CHIP_COLUMNS)
+            .filter(DailySummary.working_day >= start_day, DailySummary.working_day <= end_day)
+            .group_by(DailySummary.working_day)
+            .all()
+        )
+        return {row[0]: _chip_totals(row[1:]) for row in rows}
+
+    @staticmethod
+    def adjustment_totals(db: DBSession, working_day: dt.date) -> AdjustmentTotals:
+        """
+        Get the balance adjustment totals of a working day.
+
+        Args:
+            db: Database session
+            working_day: Calendar date the working day starts on
+
+        Returns:
+            Profit and expense totals
+        """
+        start_time, end_time = _window(working_day, working_day)
+        amount = CasinoBalanceAdjustment.amount
+        profit, expense = (
+            db.query(
+                func.coalesce(func.sum(case((amount > 0, amount), else_=0)), 0),
+                func.coalesce(func.sum(case((amount <= 0, -amount), else_=0)), 0),
+            )
+            .filter(CasinoBalanceAdjustment.created_at >= start_time, CasinoBalanceAdjustment.created_at < end_time)
+            .one()
+        )
+        return AdjustmentTotals(profit=int(profit), expense=int(expense))
+
+    @staticmethod
+    def adjustment_totals_by_day(
+        db: DBSession,
+        start_day: dt.date,
+        end_day: dt.date,
+    ) -> dict[dt.date, AdjustmentTotals]:
+        """
+        Get the balance adjustment totals of every working day in a range.
+
+        PostgreSQL buckets the window by working day in SQL (`date_trunc`);
+        elsewhere working days do not map to calendar dates portably, so the
+        (timestamp, amount) tuples of the window are bucketed here.
+
+        Args:
+            db: Database session
+            start_day: First working day (inclusive)
+            end_day: Last working day (inclusive)
+
+        Returns:
+            Dict of working day -> totals, for days that had adjustments
+        """
+        start_time, end_time = _window(start_day, end_day)
+        in_window = (CasinoBalanceAdjustment.created_at >= start_time, CasinoBalanceAdjustment.created_at < end_time)
+        if db.get_bind().dialect.name == "postgresql":
+            amount = CasinoBalanceAdjustment.amount
+            working_day = working_day_sql(CasinoBalanceAdjustment.created_at)
+            day_rows = (
+                db.query(
+                    working_day,
+                    func.coalesce(func.sum(case((amount > 0, amount), else_=0)), 0),
+                    func.coalesce(func.sum(case((amount < 0, -amount), else_=0)), 0),
+                )
+                .filter(*in_window)
+                .group_by(working_day)
+                .all()
+            )
+            return {
+                day: AdjustmentTotals(profit=int(profit), expense=int(expense))
+                for day, profit, expense in day_rows
+                if day is not None
+            }
+
+        rows = db.query(CasinoBalanceAdjustment.created_at, CasinoBalanceAdjustment.amount).filter(*in_window).all()
+
+        sums: dict[dt.date, tuple[int, int]] = {}
+        for created_at, amount in rows:
+            day = working_day_of(created_at)
+            if day is None:
+                continue
+            profit, expense = sums.get(day, (0, 0))
+            if amount > 0:
+                profit += int(amount)
+            else:
+                expense += abs(int(amount))
+            sums[day] = (profit, expense)
+        return {day: AdjustmentTotals(profit=p, expense=e) for day, (p, e) in sums.items()}
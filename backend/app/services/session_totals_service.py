@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from typing import Any, cast
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session as DBSession
+
+from ..models.db import ChipOp, ChipPurchase, Session
+
+
+def _as_int(v: Any) -> int:
+    if v is None:
+        return 0
+    return int(cast(int, v))
+
+
+class SessionTotalsService:
+    """
+    Service maintaining the running chip totals stored on each session.
+
+    Every write path that creates, removes or changes chip ops / chip purchases
+    must go through this service inside the same transaction, so that the
+    totals on `sessions` always match the raw rows.
+    """
+
+    @staticmethod
+    def purchases_total(session: Session) -> int:
+        """
+        Get the net sum of all chip purchases of a session.
+
+        Args:
+            session: Session object
+
+        Returns:
+            Cash and credit buyins minus cashouts recorded on close
+        """
+        return (
+            _as_int(session.buyin_cash)
+            + _as_int(session.buyin_credit)
+            - _as_int(session.closing_cashout)
+        )
+
+    @staticmethod
+    def record_op(
+        session: Session,
+        amount: int,
+        purchase_type: str | None,
+    ) -> None:
+        """
+        Account for a new chip operation.
+
+        Args:
+            session: Session object
+            amount: Chip op amount (positive for buyin, negative for cashout)
+            purchase_type: Payment type of the ChipPurchase created for the op,
+                or None if the op has no purchase row
+        """
+        if amount > 0:
+            session.total_buyins = cast(Any, _as_int(session.total_buyins) + amount)
+        elif amount < 0:
+            session.total_cashouts = cast(Any, _as_int(session.total_cashouts) - amount)
+
+        if purchase_type is not None:
+            SessionTotalsService._apply_purchase(session, amount, purchase_type, 1)
+
+    @staticmethod
+    def op_values(amount: int, purchase_type: str | None) -> dict[str, Any]:
+        """
+        `record_op` as the SET clause of an UPDATE of the session row.
+
+        Each changed total is an increment of its stored value, so the UPDATE
+        applies the op atomically without loading the row first. A buyin with
+        a purchase also raises chips_in_play to the purchases total when it
+        goes above it.
+
+        Args:
+            amount: Chip op amount (positive for buyin, negative for cashout)
+            purchase_type: Payment type of the ChipPurchase created for the op,
+                or None if the op has no purchase row
+
+        Returns:
+            Session column name -> SQL expression (empty for a zero amount)
+        """
+        values: dict[str, Any] = {}
+        if amount > 0:
+            values["total_buyins"] = Session.total_buyins + amount
+        elif amount < 0:
+            values["total_cashouts"] = Session.total_cashouts - amount
+
+        if purchase_type is not None and amount > 0:
+            column = Session.buyin_credit if purchase_type == "credit" else Session.buyin_cash
+            values[column.key] = column + amount
+            purchases_total = Session.buyin_cash + Session.buyin_credit - Session.closing_cashout + amount
+            values["chips_in_play"] = case(
+                (purchases_total > Session.chips_in_play, purchases_total),
+                else_=Session.chips_in_play,
+            )
+        elif purchase_type is not None and amount < 0:
+            values["closing_cashout"] = Session.closing_cashout - amount
+        return values
+
+    @staticmethod
+    def revert_op(
+        session: Session,
+        op: ChipOp,
+        purchase: ChipPurchase | None,
+    ) -> None:
+        """
+        Account for a chip operation (and its purchase, if any) being removed.
+
+        Args:
+            session: Session object
+            op: Chip op being deleted
+            purchase: ChipPurchase linked to the op, if it still exists
+        """
+        amount = _as_int(op.amount)
+        if amount > 0:
+            session.total_buyins = cast(Any, _as_int(session.total_buyins) - amount)
+        elif amount < 0:
+            session.total_cashouts = cast(Any, _as_int(session.total_cashouts) + amount)
+
+        if purchase is not None:
+            SessionTotalsService._apply_purchase(
+                session,
+                _as_int(purchase.amount),
+                cast(str, purchase.payment_type),
+                -1,
+            )
+
+    @staticmethod
+    def reduce_credit(session: Session, amount: int) -> None:
+        """
+        Account for credit purchases being closed (deleted or reduced).
+
+        Args:
+            session: Session object
+            amount: Amount of credit that was closed
+        """
+        session.buyin_credit = cast(Any, _as_int(session.buyin_credit) - amount)
+
+    @staticmethod
+    def _apply_purchase(session: Session, amount: int, payment_type: str, sign: int) -> None:
+        if amount > 0:
+            if payment_type == "credit":
+                session.buyin_credit = cast(Any, _as_int(session.buyin_credit) + sign * amount)
+            else:
+                session.buyin_cash = cast(Any, _as_int(session.buyin_cash) + sign * amount)
+        elif amount < 0:
+            session.closing_cashout = cast(Any, _as_int(session.closing_cashout) - sign * amount)
+
+    @staticmethod
+    def rebuild(db: DBSession, session_ids: list[str] | None = None) -> int:
+        """
+        Recompute running totals from chip_ops and chip_purchases.
+
+        Args:
+            db: Database session
+            session_ids: Sessions to rebuild (all sessions if None)
+
+        Returns:
+            Number of sessions rebuilt
+        """
+        ops_q = db.query(
+            ChipOp.session_id,
+            func.coalesce(func.sum(case((ChipOp.amount > 0, ChipOp.amount), else_=0)), 0),
+            func.coalesce(func.sum(case((ChipOp.amount < 0, -ChipOp.amount), else_=0)), 0),
+        ).group_by(ChipOp.session_id)
+
+        purchases_q = db.query(
+            ChipPurchase.session_id,
+            func.coalesce(func.sum(case(
+                ((ChipPurchase.amount > 0) & (ChipPurchase.payment_type != "credit"), ChipPurchase.amount),
+                else_=0,
+            )), 0),
+            func.coalesce(func.sum(case(
+                ((ChipPurchase.amount > 0) & (ChipPurchase.payment_type == "credit"), ChipPurchase.amount),
+                else_=0,
+            )), 0),
+            func.coalesce(func.sum(case((ChipPurchase.amount < 0, -ChipPurchase.amount), else_=0)), 0),
+        ).group_by(ChipPurchase.session_id)
+
+        sessions_q = db.query(Session)
+        if session_ids is not None:
+            if not session_ids:
+                return 0
+            ops_q = ops_q.filter(ChipOp.session_id.in_(session_ids))
+            purchases_q = purchases_q.filter(ChipPurchase.session_id.in_(session_ids))
+            sessions_q = sessions_q.filter(Session.id.in_(session_ids))
+
+        ops_by_session = {row[0]: row[1:] for row in ops_q.all()}
+        purchases_by_session = {row[0]: row[1:] for row in purchases_q.all()}
+
+        count = 0
+        for s in sessions_q.all():
+            sid = cast(str, s.id)
+            buyins, cashouts = ops_by_session.get(sid, (0, 0))
+            cash, credit, closing = purchases_by_session.get(sid, (0, 0, 0))
+            s.total_buyins = cast(Any, int(buyins))
+            s.total_cashouts = cast(Any, int(cashouts))
+            s.buyin_cash = cast(Any, int(cash))
+            s.buyin_credit = cast(Any, int(credit))
+            s.closing_cashout = cast(Any, int(closing))
+            count += 1
+
+        db.flush()
+        return count
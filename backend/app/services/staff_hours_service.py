@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass, field
+from typing import Any, Iterable, cast
+
+
+@dataclass
+class StaffHours:
+    """Worked hours per staff member, keyed by user id."""
+
+    dealers: dict[int, float] = field(default_factory=dict)
+    waiters: dict[int, float] = field(default_factory=dict)
+
+    def hours(self, user_id: int, role: str) -> float:
+        """Get the hours of a user in their role (0.0 if they did not work)."""
+        by_role = self.dealers if role == "dealer" else self.waiters
+        return by_role.get(user_id, 0.0)
+
+
+class StaffHoursService:
+    """
+    Service for dealer and waiter working hours.
+
+    All staff are accounted for in one pass over the sessions instead of
+    rescanning the session list once per staff member.
+    """
+
+    @staticmethod
+    def calculate(
+        sessions: Iterable[Any],
+        window: tuple[dt.datetime, dt.datetime] | None = None,
+        now: dt.datetime | None = None,
+    ) -> StaffHours:
+        """
+        Calculate the hours of every dealer and waiter assigned to the sessions.
+
+        Dealers can only work one session at a time, so their session
+        durations are summed. Waiters can work several sessions at a time, so
+        their intervals are merged (sort and sweep) before summing.
+
+        Args:
+            sessions: Sessions (anything with created_at, closed_at, dealer_id, waiter_id)
+            window: Optional (start, end) to clip the intervals to, e.g. working day boundaries
+            now: End of still open sessions (defaults to the current UTC time)
+
+        Returns:
+            StaffHours with hours per dealer and per waiter
+        """
+        if now is None:
+            now = dt.datetime.utcnow()
+
+        dealer_seconds: dict[int, float] = {}
+        waiter_intervals: dict[int, list[tuple[dt.datetime, dt.datetime]]] = {}
+
+        for s in sessions:
+            if s.dealer_id is None and s.waiter_id is None:
+                continue
+
+            start = cast(dt.datetime, s.created_at)
+            end = cast(dt.datetime, s.closed_at) if s.closed_at else now
+            if window is not None:
+                start = max(start, window[0])
+                end = min(end, window[1])
+            if end <= start:
+                # Outside the window, or still open and started after `now`
+                continue
+
+            if s.dealer_id is not None:
+                dealer_id = int(s.dealer_id)
+                dealer_seconds[dealer_id] = dealer_seconds.get(dealer_id, 0.0) + (end - start).total_seconds()
+            if s.waiter_id is not None:
+                waiter_intervals.setdefault(int(s.waiter_id), []).append((start, end))
+
+        result = StaffHours(dealers={k: v / 3600.0 for k, v in dealer_seconds.items()})
+        for waiter_id, intervals in waiter_intervals.items():
+            result.waiters[waiter_id] = StaffHoursService._merged_seconds(intervals) / 3600.0
+        return result
+
+    @staticmethod
+    def _merged_seconds(intervals: list[tuple[dt.datetime, dt.datetime]]) -> float:
+        """Total length of the union of intervals, in seconds."""
+        intervals.sort(key=lambda x: x[0])
+
+        total_seconds = 0.0
+        current_start, current_end = intervals[0]
+        for start, end in intervals[1:]:
+            if start <= current_end:
+                # Overlapping, extend the end if needed
+                current_end = max(current_end, end)
+            else:
+                total_seconds += (current_end - current_start).total_seconds()
+                current_start, current_end = start, end
+        total_seconds += (current_end - current_start).total_seconds()
+        return total_seconds
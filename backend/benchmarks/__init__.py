@@ -0,0 +1,28 @@
+"""
+Load tests and benchmarks of the API on synthetic data.
+
+`python -m benchmarks seed` creates a SQLite database with casino nights
+(tables, staff, thousands of chip ops over many working days),
+`python -m benchmarks run` drives the real app in-process against a copy of
+it and reports p50/p99 latency and throughput per scenario as JSON,
+`python -m benchmarks staff-hours` does the same for the staff hours
+calculation on in-memory synthetic sessions (no database), and
+`python -m benchmarks compare` diffs two result files. Requires httpx
+(benchmarks/requirements.txt). Nothing in `app` imports this package.
+
+With `--db-url` the same commands target PostgreSQL instead;
+`docker compose -f benchmarks/docker-compose.postgres.yml up -d` starts a
+local server for it (see benchmarks/postgres.py).
+"""
+
+# Scenarios in the order they run: reads of finished days first, then the
+# writes on the open sessions of the current working day
+SCENARIOS = (
+    "day-summary",
+    "export-report",
+    "export",
+    "closed-sessions",
+    "add_chips",
+    "undo_last",
+    "close_session",
+)
@@ -0,0 +1,88 @@
+"""
+Comparison of two benchmark result files.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+# (label, path in a scenario result, True if higher is better)
+_METRICS = (
+    ("p50 ms", ("latency_ms", "p50"), False),
+    ("p99 ms", ("latency_ms", "p99"), False),
+    ("req/s", ("throughput_rps",), True),
+)
+
+
+def _value(result: dict[str, Any], path: tuple[str, ...]) -> float | None:
+    value: Any = result
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _change(before: float | None, after: float | None) -> float | None:
+    if before is None or after is None or before == 0:
+        return None
+    return (after - before) / before * 100
+
+
+def compare_results(
+    before: dict[str, Any],
+    after: dict[str, Any],
+    threshold: float,
+) -> tuple[list[str], list[str]]:
+    """
+    Compare the scenarios present in both result files.
+
+    Args:
+        before: Results of the baseline run
+        after: Results of the run being checked
+        threshold: Change in percent reported as a regression (slower latency
+            or lower throughput)
+
+    Returns:
+        Report lines and the regressions found
+    """
+    lines = [
+        f"before: {before['meta'].get('git_revision') or '?'} ({before['meta'].get('created_at')})",
+        f"after:  {after['meta'].get('git_revision') or '?'} ({after['meta'].get('created_at')})",
+    ]
+    if before["meta"].get("dataset") != after["meta"].get("dataset"):
+        lines.append("warning: the runs used different datasets")
+    lines.append("")
+    lines.append(f"{'scenario':<18} {'metric':<7} {'before':>10} {'after':>10} {'change':>8}")
+
+    regressions = []
+    for name, result in after["scenarios"].items():
+        baseline = before["scenarios"].get(name)
+        if baseline is None:
+            lines.append(f"{name:<18} (not in the baseline)")
+            continue
+        for label, path, higher_is_better in _METRICS:
+            old, new = _value(baseline, path), _value(result, path)
+            change = _change(old, new)
+            flag = ""
+            if change is not None:
+                worse = -change if higher_is_better else change
+                if worse > threshold:
+                    flag = "  REGRESSION"
+                    regressions.append(f"{name} {label} {change:+.1f}%")
+                elif worse < -threshold:
+                    flag = "  improved"
+            lines.append(
+                f"{name:<18} {label:<7} {old if old is not None else '-':>10} "
+                f"{new if new is not None else '-':>10} "
+                f"{f'{change:+.1f}%' if change is not None else '-':>8}{flag}"
+            )
+        if result.get("errors"):
+            regressions.append(f"{name}: {result['errors']} failed requests")
+            lines.append(f"{name:<18} {result['errors']} failed requests: {result.get('first_error')}")
+
+    lines.append("")
+    lines.append(
+        f"{len(regressions)} regression(s) over {threshold:g}%" if regressions
+        else f"No regressions over {threshold:g}%"
+    )
+    return lines, regressions
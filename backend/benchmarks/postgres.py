@@ -0,0 +1,70 @@
+"""
+PostgreSQL databases of the benchmarks.
+
+A seeded database is never benchmarked directly: `run` clones it with
+CREATE DATABASE ... TEMPLATE (the counterpart of the SQLite file copy) and
+drops the clone afterwards. Databases are created and dropped through the
+server's `postgres` maintenance database, so the role in the URL needs the
+CREATEDB privilege.
+"""
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from typing import Generator
+
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.engine import Connection
+
+
+def is_postgresql(url: str) -> bool:
+    return make_url(url).get_backend_name() == "postgresql"
+
+
+@contextmanager
+def _maintenance(url: str) -> Generator[Connection, None, None]:
+    engine = create_engine(make_url(url).set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        with engine.connect() as conn:
+            yield conn
+    finally:
+        engine.dispose()
+
+
+def _quoted(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def database_exists(url: str) -> bool:
+    name = make_url(url).database
+    with _maintenance(url) as conn:
+        return conn.execute(text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": name}).first() is not None
+
+
+def create_database(url: str, drop_existing: bool = False) -> None:
+    """Create the (empty) database of `url`, dropping it first if asked."""
+    name = make_url(url).database
+    with _maintenance(url) as conn:
+        if drop_existing:
+            conn.exec_driver_sql(f"DROP DATABASE IF EXISTS {_quoted(name)} WITH (FORCE)")
+        conn.exec_driver_sql(f"CREATE DATABASE {_quoted(name)}")
+
+
+@contextmanager
+def cloned_database(url: str) -> Generator[str, None, None]:
+    """
+    Clone the database of `url` for one benchmark run.
+
+    Yields:
+        URL of the clone, dropped when the block exits
+    """
+    source = make_url(url)
+    clone = f"{source.database}_run_{os.getpid()}"
+    with _maintenance(url) as conn:
+        conn.exec_driver_sql(f"DROP DATABASE IF EXISTS {_quoted(clone)}")
+        conn.exec_driver_sql(f"CREATE DATABASE {_quoted(clone)} TEMPLATE {_quoted(source.database)}")
+    try:
+        yield source.set(database=clone).render_as_string(hide_password=False)
+    finally:
+        with _maintenance(url) as conn:
+            conn.exec_driver_sql(f"DROP DATABASE IF EXISTS {_quoted(clone)} WITH (FORCE)")
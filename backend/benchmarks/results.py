@@ -0,0 +1,66 @@
+"""
+Pieces of the result files shared by the benchmark commands.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import math
+import platform
+import subprocess
+from typing import Any
+
+import sqlalchemy
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def latency_summary(latencies: list[float], wall_seconds: float) -> dict[str, Any]:
+    """
+    Summarize measured calls.
+
+    Args:
+        latencies: Duration of every measured call, in seconds
+        wall_seconds: Wall time of the whole measurement
+
+    Returns:
+        Call count, throughput and latency percentiles in milliseconds
+    """
+    ms = sorted(value * 1000 for value in latencies)
+    return {
+        "requests": len(ms),
+        "wall_seconds": round(wall_seconds, 4),
+        "throughput_rps": round(len(ms) / wall_seconds, 2) if wall_seconds > 0 else None,
+        "latency_ms": {
+            "min": round(ms[0], 3),
+            "mean": round(sum(ms) / len(ms), 3),
+            "p50": round(_percentile(ms, 50), 3),
+            "p90": round(_percentile(ms, 90), 3),
+            "p99": round(_percentile(ms, 99), 3),
+            "max": round(ms[-1], 3),
+        } if ms else None,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_meta(config: dict[str, Any], dataset: dict[str, Any]) -> dict[str, Any]:
+    """Environment, config and dataset size recorded with every result file."""
+    return {
+        "created_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "platform": platform.platform(),
+        "config": config,
+        "dataset": dataset,
+    }
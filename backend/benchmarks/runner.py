@@ -0,0 +1,230 @@
+"""
+Latency and throughput benchmarks of the hot endpoints.
+
+The real FastAPI app (startup included) is driven in-process through httpx's
+ASGI transport, so handlers, dependencies, middleware and the database are
+exercised exactly as in production minus the network and the HTTP server.
+Each scenario runs `requests` measured requests (after `warmup` unmeasured
+ones) from `concurrency` concurrent clients; setup requests a scenario needs
+(the chip op an undo removes, the session a close closes) are not measured.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable
+
+import httpx
+from sqlalchemy import func
+
+from app.core.db import SessionLocal
+from app.main import app
+from app.models.db import ChipOp, ChipPurchase, DailySummary, Seat, Session, Table, User
+
+from . import SCENARIOS
+from .results import latency_summary, run_meta
+from .seed import BENCH_ADMIN, BENCH_PASSWORD, BUYIN_AMOUNTS
+
+# Chip ops added to a session before it is closed by the close_session scenario
+_OPS_BEFORE_CLOSE = 12
+
+
+@dataclass
+class RunConfig:
+    requests: int = 200
+    concurrency: int = 4
+    warmup: int = 5
+    seed: int = 1
+    scenarios: list[str] = field(default_factory=lambda: list(SCENARIOS))
+
+
+@dataclass
+class _Dataset:
+    """What the scenarios pick their targets from."""
+
+    tables: list[int]
+    days: list[dt.date]
+    open_sessions: dict[int, str]  # table_id -> session_id
+    dealers: dict[int, int]  # table_id -> dealer of its open session
+    seats: dict[str, list[int]]  # session_id -> seat numbers
+    rows: dict[str, int]
+
+
+class _Recorder:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.first_error: str | None = None
+
+    def record(self, seconds: float, response: httpx.Response) -> None:
+        self.latencies.append(seconds)
+        if response.status_code >= 400:
+            self.errors += 1
+            if self.first_error is None:
+                self.first_error = f"{response.status_code} {response.text[:200]}"
+
+
+def _summary(recorder: _Recorder, wall_seconds: float, concurrency: int) -> dict[str, Any]:
+    return {
+        **latency_summary(recorder.latencies, wall_seconds),
+        "errors": recorder.errors,
+        "first_error": recorder.first_error,
+        "concurrency": concurrency,
+    }
+
+
+def _load_dataset() -> _Dataset:
+    db = SessionLocal()
+    try:
+        tables = [int(tid) for (tid,) in db.query(Table.id).order_by(Table.id.asc()).all()]
+        days = [day for (day,) in db.query(DailySummary.working_day).distinct().order_by(DailySummary.working_day.asc())]
+        open_rows = db.query(Session.table_id, Session.id, Session.dealer_id).filter(Session.status == "open").all()
+        seats: dict[str, list[int]] = {}
+        for session_id, seat_no in db.query(Seat.session_id, Seat.seat_no).filter(
+            Seat.session_id.in_([row.id for row in open_rows])
+        ):
+            seats.setdefault(session_id, []).append(int(seat_no))
+        rows = {
+            "tables": len(tables),
+            "users": db.query(func.count(User.id)).scalar(),
+            "sessions": db.query(func.count(Session.id)).scalar(),
+            "chip_ops": db.query(func.count(ChipOp.id)).scalar(),
+            "chip_purchases": db.query(func.count(ChipPurchase.id)).scalar(),
+            "working_days": len(days),
+        }
+    finally:
+        db.close()
+    if not open_rows:
+        raise RuntimeError("No open sessions: seed the database with `python -m benchmarks seed` first")
+    return _Dataset(
+        tables=tables,
+        # The current working day still has open sessions; reports cover finished days
+        days=days[:-1] or days,
+        open_sessions={int(row.table_id): row.id for row in open_rows},
+        dealers={int(row.table_id): int(row.dealer_id) for row in open_rows},
+        seats=seats,
+        rows=rows,
+    )
+
+
+class _Bench:
+    def __init__(self, client: httpx.AsyncClient, data: _Dataset, config: RunConfig):
+        self.client = client
+        self.data = data
+        self.config = config
+        self.rng = random.Random(config.seed)
+
+    async def timed(self, recorder: _Recorder | None, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        if recorder is not None:
+            recorder.record(time.perf_counter() - started, response)
+        return response
+
+    def chip_payload(self, session_id: str) -> dict[str, Any]:
+        return {
+            "seat_no": self.rng.choice(self.data.seats[session_id]),
+            "amount": self.rng.choice(BUYIN_AMOUNTS),
+            "payment_type": "credit" if self.rng.random() < 0.15 else "cash",
+        }
+
+    # Scenarios: one call runs one measured request (recorder None during warmup)
+
+    async def day_summary(self, recorder: _Recorder | None, worker: int) -> None:
+        day = self.rng.choice(self.data.days)
+        await self.timed(recorder, "GET", "/api/admin/day-summary", params={"date": day.isoformat()})
+
+    async def export_report(self, recorder: _Recorder | None, worker: int) -> None:
+        day = self.rng.choice(self.data.days)
+        await self.timed(recorder, "GET", "/api/admin/export-report", params={"date": day.isoformat()})
+
+    async def export(self, recorder: _Recorder | None, worker: int) -> None:
+        params = {"date": self.rng.choice(self.data.days).isoformat(), "table_id": self.rng.choice(self.data.tables)}
+        await self.timed(recorder, "GET", "/api/admin/export", params=params)
+
+    async def closed_sessions(self, recorder: _Recorder | None, worker: int) -> None:
+        params = {"table_id": self.rng.choice(self.data.tables)}
+        await self.timed(recorder, "GET", "/api/admin/closed-sessions", params=params)
+
+    async def add_chips(self, recorder: _Recorder | None, worker: int) -> None:
+        session_id = self.data.open_sessions[self.rng.choice(self.data.tables)]
+        await self.timed(recorder, "POST", f"/api/sessions/{session_id}/chips", json=self.chip_payload(session_id))
+
+    async def undo_last(self, recorder: _Recorder | None, worker: int) -> None:
+        # Each worker owns a table, so the undone op is the one it just added
+        session_id = self.data.open_sessions[self.data.tables[worker % len(self.data.tables)]]
+        payload = self.chip_payload(session_id)
+        await self.timed(None, "POST", f"/api/sessions/{session_id}/chips", json=payload)
+        await self.timed(recorder, "POST", f"/api/sessions/{session_id}/chips/undo", json={"seat_no": payload["seat_no"]})
+
+    async def close_session(self, recorder: _Recorder | None, worker: int) -> None:
+        # Each worker owns a table: close its open session, then open the next one
+        table_id = self.data.tables[worker % len(self.data.tables)]
+        session_id = self.data.open_sessions[table_id]
+        await self.timed(recorder, "POST", f"/api/sessions/{session_id}/close")
+
+        response = await self.timed(None, "POST", "/api/sessions", json={
+            "table_id": table_id,
+            "dealer_id": self.data.dealers[table_id],
+        })
+        response.raise_for_status()
+        session = response.json()
+        seats = (await self.timed(None, "GET", f"/api/sessions/{session['id']}/seats")).json()
+        self.data.open_sessions[table_id] = session["id"]
+        self.data.seats[session["id"]] = [seat["seat_no"] for seat in seats]
+        await self.timed(None, "POST", f"/api/sessions/{session['id']}/chips/batch", json=[
+            self.chip_payload(session["id"]) for _ in range(_OPS_BEFORE_CLOSE)
+        ])
+
+    async def run(self, name: str) -> dict[str, Any]:
+        scenario: Callable[[_Recorder | None, int], Awaitable[None]] = getattr(self, name.replace("-", "_"))
+        concurrency = self.config.concurrency
+        if name in ("undo_last", "close_session"):
+            concurrency = min(concurrency, len(self.data.tables))
+
+        for i in range(self.config.warmup):
+            await scenario(None, i % concurrency)
+
+        recorder = _Recorder()
+        counts = [self.config.requests // concurrency + (1 if i < self.config.requests % concurrency else 0)
+                  for i in range(concurrency)]
+
+        async def worker(index: int) -> None:
+            for _ in range(counts[index]):
+                await scenario(recorder, index)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        return _summary(recorder, time.perf_counter() - started, concurrency)
+
+
+async def run_benchmarks(config: RunConfig) -> dict[str, Any]:
+    """
+    Run the benchmark scenarios against the configured database.
+
+    Args:
+        config: Scenarios, request counts and concurrency
+
+    Returns:
+        JSON-serializable results: environment, dataset size and one latency
+        and throughput summary per scenario
+    """
+    results: dict[str, Any] = {}
+    async with app.router.lifespan_context(app):
+        data = _load_dataset()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            response = await client.post(
+                "/api/auth/login", json={"username": BENCH_ADMIN, "password": BENCH_PASSWORD}
+            )
+            response.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+            bench = _Bench(client, data, config)
+            for name in config.scenarios:
+                results[name] = await bench.run(name)
+
+    return {"meta": run_meta(asdict(config), data.rows), "scenarios": results}
@@ -0,0 +1,303 @@
+"""
+Synthetic casino-night data.
+
+Fills an empty database with tables, staff and a history of closed sessions
+over many working days, plus one open session per table on the current
+working day for the write benchmarks. Rows are generated from a seeded RNG
+(same config, same data) and written with bulk inserts; the derived tables
+(session running totals, daily summary, credit ledger and balances) are then
+rebuilt by the same services the maintenance commands use.
+
+History sessions follow the handlers' rules: buy-ins are chip ops with a cash
+or credit purchase, mid-session cashouts are chip ops only, and on close the
+credit of every seat still holding chips is settled with a balance
+adjustment, the rest of its chips cashed out. Credit of seats that lost
+their chips stays open, as it does in production.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import random
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session as DBSession
+
+from app.core.constants import PAYMENT_TYPE_CASH, PAYMENT_TYPE_CREDIT
+from app.core.datetime_utils import utc_now, working_day_of
+from app.core.migrations import migrate
+from app.core.security import get_password_hash
+from app.models.db import (
+    CasinoBalanceAdjustment,
+    ChipOp,
+    ChipPurchase,
+    Seat,
+    Session,
+    Table,
+    User,
+)
+from app.services.credit_ledger_service import CreditLedgerService
+from app.services.daily_summary_service import DailySummaryService
+from app.services.session_totals_service import SessionTotalsService
+
+BENCH_PASSWORD = "bench"
+BENCH_ADMIN = "bench-admin"
+
+BUYIN_AMOUNTS = (100, 200, 300, 500, 500, 1000, 1000, 2000, 5000)
+PLAYER_NAMES = (
+    "Alex", "Ben", "Chen", "Dana", "Eli", "Farid", "Gal", "Hana", "Igor", "Jonas",
+    "Kira", "Leo", "Maya", "Noam", "Olga", "Pavel", "Rina", "Sami", "Tal", "Yana",
+)
+
+# Rows per INSERT statement batch
+_CHUNK = 5000
+
+
+@dataclass
+class SeedConfig:
+    tables: int = 8
+    seats: int = 24
+    days: int = 30
+    sessions_per_day: int = 2
+    ops_per_session: int = 60
+    credit_ratio: float = 0.15  # Share of buy-ins paid on credit
+    cashout_ratio: float = 0.2  # Share of chip ops that are mid-session cashouts
+    seed: int = 1
+    dealers: int = field(default=0)  # 0: tables + 2
+    waiters: int = field(default=0)  # 0: half the tables, at least 2
+
+    def __post_init__(self):
+        self.dealers = self.dealers or self.tables + 2
+        self.waiters = self.waiters or max(2, self.tables // 2)
+        if self.dealers < self.tables:
+            raise ValueError("Every table needs its own dealer: dealers must be at least tables")
+
+
+class _Rows:
+    """Rows of every table, with IDs assigned up front so they can reference each other."""
+
+    def __init__(self):
+        self.sessions: list[dict[str, Any]] = []
+        self.seats: list[dict[str, Any]] = []
+        self.ops: list[dict[str, Any]] = []
+        self.purchases: list[dict[str, Any]] = []
+        self.adjustments: list[dict[str, Any]] = []
+
+    def op(self, session_id: str, seat_no: int, amount: int, at: dt.datetime) -> int:
+        op_id = len(self.ops) + 1
+        self.ops.append({"id": op_id, "session_id": session_id, "seat_no": seat_no, "amount": amount, "created_at": at})
+        return op_id
+
+
+def _simulate_session(
+    rows: _Rows,
+    rng: random.Random,
+    config: SeedConfig,
+    table: dict[str, Any],
+    dealer_id: int,
+    waiter_id: int,
+    admin_id: int,
+    started: dt.datetime,
+    ends: dt.datetime,
+    ops: int,
+    close: bool,
+) -> None:
+    session_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    active = rng.sample(range(1, config.seats + 1), k=rng.randint(min(4, config.seats), min(12, config.seats)))
+    names = {seat_no: rng.choice(PLAYER_NAMES) if rng.random() < 0.7 else None for seat_no in active}
+    totals = {seat_no: 0 for seat_no in range(1, config.seats + 1)}
+    credit_purchases: dict[int, list[dict[str, Any]]] = {}
+    bought = 0
+
+    step = (ends - started) / (ops + 1)
+    for i in range(ops):
+        at = started + step * (i + 1)
+        seat_no = rng.choice(active)
+        if totals[seat_no] > 0 and rng.random() < config.cashout_ratio:
+            amount = -rng.randint(1, max(1, totals[seat_no] // 100)) * 100
+            amount = max(amount, -totals[seat_no])
+            rows.op(session_id, seat_no, amount, at)
+        else:
+            amount = rng.choice(BUYIN_AMOUNTS)
+            payment_type = PAYMENT_TYPE_CREDIT if rng.random() < config.credit_ratio else PAYMENT_TYPE_CASH
+            op_id = rows.op(session_id, seat_no, amount, at)
+            purchase = {
+                "table_id": table["id"],
+                "session_id": session_id,
+                "seat_no": seat_no,
+                "amount": amount,
+                "chip_op_id": op_id,
+                "created_at": at,
+                "created_by_user_id": admin_id,
+                "payment_type": payment_type,
+            }
+            if payment_type == PAYMENT_TYPE_CREDIT:
+                credit_purchases.setdefault(seat_no, []).append(purchase)
+            else:
+                rows.purchases.append(purchase)
+            bought += amount
+        totals[seat_no] += amount
+
+    closed_at = ends if close else None
+    if close:
+        session_date = started.date().strftime("%d.%m.%Y")
+        for seat_no in sorted(totals):
+            if totals[seat_no] <= 0:
+                continue
+            # Same as CreditService.close_credit_for_session: credit of seats
+            # holding chips is settled, then the remaining chips are cashed out
+            credit = sum(p["amount"] for p in credit_purchases.pop(seat_no, []))
+            if credit:
+                player = names.get(seat_no) or f"Seat {seat_no}"
+                rows.adjustments.append({
+                    "id": len(rows.adjustments) + 1,
+                    "created_at": ends,
+                    "amount": credit,
+                    "comment": f"Долг ({player}) - {table['name']} - {session_date}",
+                    "created_by_user_id": admin_id,
+                })
+            remaining = totals[seat_no] - credit
+            if remaining > 0:
+                op_id = rows.op(session_id, seat_no, -remaining, ends)
+                rows.purchases.append({
+                    "table_id": table["id"],
+                    "session_id": session_id,
+                    "seat_no": seat_no,
+                    "amount": -remaining,
+                    "chip_op_id": op_id,
+                    "created_at": ends,
+                    "created_by_user_id": admin_id,
+                    "payment_type": PAYMENT_TYPE_CASH,
+                })
+            totals[seat_no] = 0
+    for purchases in credit_purchases.values():
+        rows.purchases.extend(purchases)
+
+    rows.sessions.append({
+        "id": session_id,
+        "table_id": table["id"],
+        "date": started.date(),
+        "status": "closed" if close else "open",
+        "created_at": started,
+        "closed_at": closed_at,
+        "dealer_id": dealer_id,
+        "waiter_id": waiter_id,
+        "chips_in_play": bought,
+    })
+    rows.seats.extend(
+        {"session_id": session_id, "seat_no": seat_no, "player_name": names.get(seat_no), "total": total}
+        for seat_no, total in totals.items()
+    )
+
+
+def _bulk_insert(db: DBSession, model: Any, rows: list[dict[str, Any]]) -> None:
+    for start in range(0, len(rows), _CHUNK):
+        db.execute(insert(model), rows[start:start + _CHUNK])
+
+
+def _reset_sequences(db: DBSession, models: list[Any]) -> None:
+    """Move PostgreSQL ID sequences past the explicit IDs written by the bulk inserts."""
+    for model in models:
+        table = model.__tablename__
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def seed_database(engine: Engine, db: DBSession, config: SeedConfig) -> dict[str, Any]:
+    """
+    Fill an empty database with synthetic data.
+
+    Args:
+        engine: Engine of the database (migrated to the latest schema first)
+        db: Database session on the same engine
+        config: Size and mix of the generated data
+
+    Returns:
+        Config used and number of rows written per table
+    """
+    migrate(engine)
+    if db.query(Session.id).first() is not None or db.query(User.id).first() is not None:
+        raise RuntimeError("Database is not empty")
+
+    rng = random.Random(config.seed)
+    password_hash = get_password_hash(BENCH_PASSWORD)
+
+    tables = [
+        {"id": i, "name": f"Table {i}", "seats_count": config.seats}
+        for i in range(1, config.tables + 1)
+    ]
+    users = [{"id": 1, "username": BENCH_ADMIN, "role": "superadmin", "hourly_rate": None}]
+    users += [
+        {"id": len(users) + i, "username": f"dealer-{i:02d}", "role": "dealer", "hourly_rate": 100}
+        for i in range(1, config.dealers + 1)
+    ]
+    users += [
+        {"id": len(users) + i, "username": f"waiter-{i:02d}", "role": "waiter", "hourly_rate": 50}
+        for i in range(1, config.waiters + 1)
+    ]
+    for user in users:
+        user.update(password_hash=password_hash, table_id=None, is_active=True)
+    dealer_ids = [u["id"] for u in users if u["role"] == "dealer"]
+    waiter_ids = [u["id"] for u in users if u["role"] == "waiter"]
+    admin_id = users[0]["id"]
+
+    now = utc_now().replace(microsecond=0)
+    today = working_day_of(now) or now.date()
+
+    rows = _Rows()
+    # A working day runs from 20:00 to 18:00 the next day, split into shifts
+    shift = dt.timedelta(hours=22) / config.sessions_per_day
+    for days_ago in range(config.days, 0, -1):
+        day_start = dt.datetime.combine(today - dt.timedelta(days=days_ago), dt.time(20, 0))
+        for k in range(config.sessions_per_day):
+            on_shift = rng.sample(dealer_ids, k=len(tables))
+            for table, dealer_id in zip(tables, on_shift):
+                started = day_start + shift * k + dt.timedelta(minutes=rng.randint(0, 20))
+                ends = day_start + shift * (k + 1) - dt.timedelta(minutes=rng.randint(1, 20))
+                _simulate_session(
+                    rows, rng, config, table, dealer_id, rng.choice(waiter_ids), admin_id,
+                    started, ends, rng.randint(config.ops_per_session // 2, config.ops_per_session * 3 // 2),
+                    close=True,
+                )
+
+    # Open sessions of the current working day (dealers are exclusive to one open session)
+    for table, dealer_id in zip(tables, dealer_ids):
+        started = now - dt.timedelta(minutes=rng.randint(60, 120))
+        _simulate_session(
+            rows, rng, config, table, dealer_id, rng.choice(waiter_ids), admin_id,
+            started, now - dt.timedelta(minutes=1), config.ops_per_session // 2,
+            close=False,
+        )
+
+    _bulk_insert(db, Table, tables)
+    _bulk_insert(db, User, users)
+    _bulk_insert(db, Session, rows.sessions)
+    _bulk_insert(db, Seat, rows.seats)
+    _bulk_insert(db, ChipOp, rows.ops)
+    _bulk_insert(db, CasinoBalanceAdjustment, rows.adjustments)
+    _bulk_insert(db, ChipPurchase, rows.purchases)
+    if db.get_bind().dialect.name == "postgresql":
+        _reset_sequences(db, [Table, User, ChipOp, CasinoBalanceAdjustment])
+
+    SessionTotalsService.rebuild(db)
+    DailySummaryService.rebuild_all(db)
+    open_debts = CreditLedgerService.backfill_empty(db)
+    db.commit()
+
+    return {
+        "config": asdict(config),
+        "rows": {
+            "tables": len(tables),
+            "users": len(users),
+            "sessions": len(rows.sessions),
+            "seats": len(rows.seats),
+            "chip_ops": len(rows.ops),
+            "chip_purchases": len(rows.purchases),
+            "balance_adjustments": len(rows.adjustments),
+            "open_debts": open_debts,
+        },
+    }
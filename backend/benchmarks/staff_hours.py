@@ -0,0 +1,178 @@
+"""
+Benchmark of StaffHoursService on synthetic sessions.
+
+Runs the staff hours calculation of the reports without a database or the
+app: sessions are generated in memory from a seeded RNG (overlapping
+waiter assignments across tables, open sessions on the last day) and every
+call is timed. Each scenario's result is also checked once against a
+straightforward reference (per-staff rescans, waiter time from an event
+sweep); a mismatch is counted as an error, so `compare` flags it.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+from app.core.datetime_utils import WORKING_DAY_END, WORKING_DAY_START
+from app.services.staff_hours_service import StaffHours, StaffHoursService
+
+from .results import latency_summary, run_meta
+
+STAFF_HOURS_SCENARIOS = ("staff_hours", "staff_hours_window")
+
+_FIRST_DAY = dt.date(2026, 1, 1)
+
+
+@dataclass
+class StaffHoursConfig:
+    sessions: int = 3000
+    days: int = 30
+    dealers: int = 40
+    waiters: int = 10
+    repeats: int = 50
+    warmup: int = 3
+    seed: int = 1
+
+
+@dataclass(frozen=True)
+class _SyntheticSession:
+    created_at: dt.datetime
+    closed_at: dt.datetime | None
+    dealer_id: int | None
+    waiter_id: int | None
+
+
+def synthetic_sessions(config: StaffHoursConfig) -> tuple[list[_SyntheticSession], dt.datetime]:
+    """
+    Generate sessions spread over `config.days` working days.
+
+    Returns:
+        Sessions and the `now` their open sessions run up to
+    """
+    rng = random.Random(config.seed)
+    day_length = (
+        dt.datetime.combine(_FIRST_DAY + dt.timedelta(days=1), WORKING_DAY_END)
+        - dt.datetime.combine(_FIRST_DAY, WORKING_DAY_START)
+    )
+    now = dt.datetime.combine(_FIRST_DAY + dt.timedelta(days=config.days - 1), WORKING_DAY_START) + day_length / 2
+
+    sessions = []
+    for _ in range(config.sessions):
+        day = _FIRST_DAY + dt.timedelta(days=rng.randrange(config.days))
+        start = dt.datetime.combine(day, WORKING_DAY_START) + day_length * rng.random() * 0.9
+        end: dt.datetime | None = start + dt.timedelta(minutes=rng.randint(20, 8 * 60))
+        if end > now and start < now:
+            end = None  # Still open on the last working day
+        sessions.append(_SyntheticSession(
+            created_at=start,
+            closed_at=end,
+            dealer_id=rng.randint(1, config.dealers) if rng.random() < 0.95 else None,
+            waiter_id=rng.randint(1, config.waiters) if rng.random() < 0.8 else None,
+        ))
+    return sessions, now
+
+
+def _reference_hours(
+    sessions: list[_SyntheticSession],
+    window: tuple[dt.datetime, dt.datetime] | None,
+    now: dt.datetime,
+) -> StaffHours:
+    intervals = []
+    for s in sessions:
+        start, end = s.created_at, s.closed_at or now
+        if window is not None:
+            start, end = max(start, window[0]), min(end, window[1])
+        if end > start:
+            intervals.append((s, start, end))
+
+    result = StaffHours()
+    for dealer_id in {s.dealer_id for s, _, _ in intervals if s.dealer_id is not None}:
+        result.dealers[dealer_id] = sum(
+            (end - start).total_seconds() for s, start, end in intervals if s.dealer_id == dealer_id
+        ) / 3600.0
+    for waiter_id in {s.waiter_id for s, _, _ in intervals if s.waiter_id is not None}:
+        # Time during which at least one of the waiter's sessions runs
+        events = sorted(
+            event
+            for s, start, end in intervals if s.waiter_id == waiter_id
+            for event in ((start, 1), (end, -1))
+        )
+        seconds, running, since = 0.0, 0, None
+        for at, step in events:
+            if running and since is not None:
+                seconds += (at - since).total_seconds()
+            running += step
+            since = at
+        result.waiters[waiter_id] = seconds / 3600.0
+    return result
+
+
+def _mismatches(actual: StaffHours, expected: StaffHours) -> list[str]:
+    problems = []
+    for role, got, want in (("dealer", actual.dealers, expected.dealers), ("waiter", actual.waiters, expected.waiters)):
+        for user_id in set(got) | set(want):
+            if abs(got.get(user_id, 0.0) - want.get(user_id, 0.0)) > 1e-6:
+                problems.append(f"{role} {user_id}: {got.get(user_id, 0.0):.4f} != {want.get(user_id, 0.0):.4f}")
+    return problems
+
+
+def run_staff_hours_benchmark(config: StaffHoursConfig) -> dict[str, Any]:
+    """
+    Time StaffHoursService.calculate over synthetic sessions.
+
+    Scenarios:
+        staff_hours: all sessions in one call, as the range reports do
+        staff_hours_window: all sessions clipped to one working day in the middle
+
+    Args:
+        config: Dataset size and number of timed calls per scenario
+
+    Returns:
+        JSON-serializable results in the format of `python -m benchmarks run`
+    """
+    sessions, now = synthetic_sessions(config)
+    middle = _FIRST_DAY + dt.timedelta(days=config.days // 2)
+    window = (
+        dt.datetime.combine(middle, WORKING_DAY_START),
+        dt.datetime.combine(middle + dt.timedelta(days=1), WORKING_DAY_END),
+    )
+    calls: dict[str, tuple[Callable[[], StaffHours], Callable[[], StaffHours]]] = {
+        "staff_hours": (
+            lambda: StaffHoursService.calculate(sessions, now=now),
+            lambda: _reference_hours(sessions, None, now),
+        ),
+        "staff_hours_window": (
+            lambda: StaffHoursService.calculate(sessions, window=window, now=now),
+            lambda: _reference_hours(sessions, window, now),
+        ),
+    }
+
+    results: dict[str, Any] = {}
+    for name in STAFF_HOURS_SCENARIOS:
+        calculate, reference = calls[name]
+        problems = _mismatches(calculate(), reference())
+        for _ in range(config.warmup):
+            calculate()
+
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(config.repeats):
+            call_started = time.perf_counter()
+            calculate()
+            latencies.append(time.perf_counter() - call_started)
+        results[name] = {
+            **latency_summary(latencies, time.perf_counter() - started),
+            "errors": len(problems),
+            "first_error": problems[0] if problems else None,
+            "concurrency": 1,
+        }
+
+    dataset = {
+        "sessions": len(sessions),
+        "open_sessions": sum(1 for s in sessions if s.closed_at is None),
+        "working_days": config.days,
+    }
+    return {"meta": run_meta(asdict(config), dataset), "scenarios": results}
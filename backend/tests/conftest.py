@@ -0,0 +1,27 @@
+"""
+Test settings.
+
+The app reads its settings (and creates its engine) when `app` is first
+imported, so the environment is pointed at a throwaway directory here,
+before any test module imports it. API tests run with SQL debug mode in
+strict mode: a request over its statement budget or issuing the same
+statement in a loop fails with a 500.
+"""
+import os
+import shutil
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="chips-tests-")
+
+os.environ["DB_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'app.db')}"
+os.environ["REPORT_CACHE_DIR"] = os.path.join(_TMP_DIR, "report_cache")
+os.environ["JWT_SECRET"] = "test-secret"
+os.environ["SUPERADMIN_USERNAME"] = "admin"
+os.environ["SUPERADMIN_PASSWORD"] = "admin"
+os.environ["PASSWORD_HASH_ROUNDS"] = "1000"  # Fast logins
+os.environ["SQL_DEBUG"] = "true"
+os.environ["SQL_DEBUG_STRICT"] = "true"
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
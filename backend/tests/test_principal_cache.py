@@ -0,0 +1,39 @@
+from app.core.principal import Principal, PrincipalCache
+
+
+def principal(user_id: int = 1, role: str = "dealer") -> Principal:
+    return Principal(id=user_id, username=f"user{user_id}", role=role, table_id=None, is_active=True, hourly_rate=None)
+
+
+def test_put_and_get():
+    cache = PrincipalCache(ttl_seconds=60, max_size=10)
+    cache.put(principal(), cache.generation(1))
+
+    assert cache.get(1) == principal()
+    assert cache.get(2) is None
+
+
+def test_put_loaded_before_invalidate_is_dropped():
+    cache = PrincipalCache(ttl_seconds=60, max_size=10)
+    generation = cache.generation(1)  # A request starts loading user 1
+    cache.invalidate(1)  # The admin API changes user 1 meanwhile
+    cache.put(principal(), generation)
+
+    assert cache.get(1) is None
+
+
+def test_put_after_invalidate_is_kept():
+    cache = PrincipalCache(ttl_seconds=60, max_size=10)
+    cache.invalidate(1)
+    cache.put(principal(role="table_admin"), cache.generation(1))
+
+    assert cache.get(1) == principal(role="table_admin")
+
+
+def test_invalidate_is_per_user():
+    cache = PrincipalCache(ttl_seconds=60, max_size=10)
+    generation = cache.generation(2)
+    cache.invalidate(1)
+    cache.put(principal(2), generation)
+
+    assert cache.get(2) == principal(2)
@@ -0,0 +1,23 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session as DBSession
+
+from app.core.query_plans import check_query_plans, hot_queries
+from benchmarks.seed import SeedConfig, seed_database
+
+
+def test_hot_queries_use_their_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    db = DBSession(bind=engine)
+    try:
+        # Migrates to the latest schema, then fills a few working days
+        seed_database(engine, db, SeedConfig(tables=2, seats=8, days=2, ops_per_session=10))
+    finally:
+        db.close()
+
+    with engine.connect() as conn:
+        results = check_query_plans(conn)
+    engine.dispose()
+
+    assert len(results) == len(hot_queries())
+    problems = {result["name"]: (result["problems"], result["plan"]) for result in results if result["problems"]}
+    assert not problems
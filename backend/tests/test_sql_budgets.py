@@ -0,0 +1,313 @@
+"""
+Statement budgets of the hot endpoints.
+
+One test per route of SQL_STATEMENT_BUDGETS drives its hot path, and the
+costlier variants around it (credit, Idempotency-Key, principal cache miss),
+and checks that every request stayed within the route's budget. Going over a
+budget already fails the request in strict SQL debug mode (see conftest);
+the assertions name the route and its count.
+"""
+import datetime as dt
+import itertools
+from collections import defaultdict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import sql_debug
+from app.core.db import SessionLocal
+from app.core.principal import principal_cache
+from app.main import app
+from app.models.db import Session
+from app.services.idempotency_service import idempotency_store
+
+# Working day the test sessions are moved to
+WORKING_DAY = dt.date(2026, 1, 5)
+# Working day of the report tests, whose sessions are all closed: the day is
+# finished, so the day report goes through the report cache
+REPORT_DAY = dt.date(2026, 1, 6)
+
+_names = itertools.count(1)
+
+
+@pytest.fixture
+def statements(monkeypatch) -> dict[str, int]:
+    """Most budgeted statements executed by one request, per route key."""
+    counts: dict[str, int] = defaultdict(int)
+    check_request = sql_debug.check_request
+
+    def recording_check_request(method, route, stats, repeat_threshold):
+        key = sql_debug.route_key(method, route)
+        counts[key] = max(counts[key], stats.statements - stats.unbudgeted)
+        return check_request(method, route, stats, repeat_threshold)
+
+    monkeypatch.setattr(sql_debug, "check_request", recording_check_request)
+    return counts
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def headers(client) -> dict[str, str]:
+    token = _send(
+        client, "POST", "/api/auth/login", json={"username": "admin", "password": "admin"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _send(client: TestClient, method: str, url: str, cold: bool = False, **kwargs):
+    if cold:
+        # Principal cache miss and the purge of expired Idempotency-Keys due
+        principal_cache.clear()
+        idempotency_store._next_purge = 0.0
+    response = client.request(method, url, **kwargs)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def _idempotent(headers: dict[str, str], key: str) -> dict[str, str]:
+    return {**headers, "Idempotency-Key": f"{key}-{next(_names)}"}
+
+
+def _open_session(
+    client: TestClient, headers: dict[str, str], seats_count: int = 6, day: dt.date = WORKING_DAY
+) -> tuple[int, str]:
+    """Table and open session on `day`, returned as (table_id, session_id)."""
+    n = next(_names)
+    table = _send(
+        client, "POST", "/api/admin/tables", json={"name": f"Budgets {n}", "seats_count": seats_count}, headers=headers
+    ).json()
+    dealer = _send(
+        client, "POST", "/api/admin/users",
+        json={"username": f"budget-dealer-{n}", "password": "pass", "role": "dealer", "hourly_rate": 100},
+        headers=headers,
+    ).json()
+    waiter = _send(
+        client, "POST", "/api/admin/users",
+        json={"username": f"budget-waiter-{n}", "password": "pass", "role": "waiter", "hourly_rate": 50},
+        headers=headers,
+    ).json()
+    session_id = _send(
+        client, "POST", "/api/sessions",
+        json={"table_id": table["id"], "seats_count": seats_count, "dealer_id": dealer["id"], "waiter_id": waiter["id"]},
+        headers=headers,
+    ).json()["id"]
+
+    with SessionLocal() as db:
+        session = db.get(Session, session_id)
+        session.created_at = dt.datetime.combine(day, dt.time(21, 0))
+        session.date = day
+        db.commit()
+    return table["id"], session_id
+
+
+def _buy(client: TestClient, headers: dict[str, str], session_id: str, seat_no: int, amount: int, payment_type: str = "cash"):
+    return _send(
+        client, "POST", f"/api/sessions/{session_id}/chips",
+        json={"seat_no": seat_no, "amount": amount, "payment_type": payment_type}, headers=headers,
+    ).json()
+
+
+def _closed_session_with_credit(
+    client: TestClient, headers: dict[str, str], day: dt.date = WORKING_DAY
+) -> tuple[int, str]:
+    """Closed session whose seat 3 still owes 300 of credit."""
+    table_id, session_id = _open_session(client, headers, day=day)
+    _buy(client, headers, session_id, 1, 500)
+    _buy(client, headers, session_id, 3, 300, "credit")
+    _buy(client, headers, session_id, 3, -300)
+    _send(client, "POST", f"/api/sessions/{session_id}/close", headers=headers)
+    return table_id, session_id
+
+
+def _assert_within_budget(statements: dict[str, int], key: str) -> None:
+    assert key in statements, f"{key} was not requested"
+    budget = sql_debug.SQL_STATEMENT_BUDGETS[key]
+    assert statements[key] <= budget, f"{key}: {statements[key]} statements, budget is {budget}"
+
+
+def test_add_chips(client, headers, statements):
+    _, session_id = _open_session(client, headers)
+    url = f"/api/sessions/{session_id}/chips"
+    _send(client, "POST", url, json={"seat_no": 1, "amount": 400}, headers=headers)
+    _send(client, "POST", url, json={"seat_no": 1, "amount": -100}, headers=headers)
+    _send(client, "POST", url, json={"seat_no": 1, "amount": 0}, headers=headers)
+    # Credit with an Idempotency-Key: purchase, ledger entry, balance and stored response
+    _send(
+        client, "POST", url, cold=True,
+        json={"seat_no": 2, "amount": 500, "payment_type": "credit"}, headers=_idempotent(headers, "chips"),
+    )
+
+    _assert_within_budget(statements, "POST /api/sessions/{session_id}/chips")
+
+
+def test_add_chips_batch(client, headers, statements):
+    _, session_id = _open_session(client, headers)
+    _buy(client, headers, session_id, 2, 400)
+
+    # Repeated (seat, amount) pairs and mixed payment types in one batch
+    batch = [
+        {"seat_no": 1, "amount": 100},
+        {"seat_no": 2, "amount": 100, "payment_type": "credit"},
+        {"seat_no": 1, "amount": 100, "payment_type": "credit"},
+        {"seat_no": 4, "amount": 250},
+        {"seat_no": 2, "amount": -50},
+        {"seat_no": 5, "amount": 100},
+        {"seat_no": 4, "amount": -250},
+        {"seat_no": 1, "amount": 100, "payment_type": "credit"},
+    ]
+    seats = _send(
+        client, "POST", f"/api/sessions/{session_id}/chips/batch", cold=True,
+        json=batch, headers=_idempotent(headers, "batch"),
+    ).json()
+    assert {seat["seat_no"]: seat["total"] for seat in seats} == {1: 300, 2: 450, 4: 0, 5: 100}
+
+    _assert_within_budget(statements, "POST /api/sessions/{session_id}/chips/batch")
+
+
+def test_undo(client, headers, statements):
+    _, session_id = _open_session(client, headers)
+    _buy(client, headers, session_id, 1, 500, "credit")
+    _buy(client, headers, session_id, 1, 100)
+    _buy(client, headers, session_id, 1, 100, "credit")
+
+    # Undoing a credit buyin reverses its ledger entry
+    _send(client, "POST", f"/api/sessions/{session_id}/chips/undo", cold=True, json={"seat_no": 1}, headers=headers)
+    _send(client, "POST", f"/api/sessions/{session_id}/chips/undo", json={"seat_no": 1}, headers=headers)
+    purchases = _send(
+        client, "GET", "/api/admin/chip-purchases", params={"session_id": session_id, "seat_no": 1}, headers=headers
+    ).json()
+    assert [(p["amount"], p["payment_type"]) for p in purchases] == [(500, "credit")]
+
+    _assert_within_budget(statements, "POST /api/sessions/{session_id}/chips/undo")
+
+
+def test_assign_player(client, headers, statements):
+    _, session_id = _open_session(client, headers)
+    _buy(client, headers, session_id, 3, 300, "credit")
+    # The seat's credit balance is renamed with it
+    _send(client, "PUT", f"/api/sessions/{session_id}/seats/3", cold=True, json={"player_name": "Dana"}, headers=headers)
+
+    _assert_within_budget(statements, "PUT /api/sessions/{session_id}/seats/{seat_no}")
+
+
+def test_list_seats(client, headers, statements):
+    _, session_id = _open_session(client, headers)
+    _send(client, "GET", f"/api/sessions/{session_id}/seats", cold=True, headers=headers)
+
+    _assert_within_budget(statements, "GET /api/sessions/{session_id}/seats")
+
+
+def test_non_cash_purchases(client, headers, statements):
+    _, session_id = _open_session(client, headers)
+    _buy(client, headers, session_id, 1, 300, "credit")
+    _buy(client, headers, session_id, 2, 200, "credit")
+    _send(client, "GET", f"/api/sessions/{session_id}/non-cash-purchases", cold=True, headers=headers)
+
+    _assert_within_budget(statements, "GET /api/sessions/{session_id}/non-cash-purchases")
+
+
+def test_open_session(client, headers, statements):
+    table_id, _ = _open_session(client, headers)
+    _send(client, "GET", "/api/sessions/open", cold=True, params={"table_id": table_id}, headers=headers)
+
+    _assert_within_budget(statements, "GET /api/sessions/open")
+
+
+def test_close_session(client, headers, statements):
+    _, session_id = _open_session(client, headers, seats_count=8)
+    # Credit on five seats, repaid from their chips on close; seat 3 cashed out
+    # all its chips, so its credit stays open
+    for seat_no in (1, 2, 4, 5, 6):
+        _buy(client, headers, session_id, seat_no, 200, "credit")
+        _buy(client, headers, session_id, seat_no, 100)
+    _buy(client, headers, session_id, 3, 300, "credit")
+    _buy(client, headers, session_id, 3, -300)
+    _buy(client, headers, session_id, 7, 400)
+
+    _send(client, "POST", f"/api/sessions/{session_id}/close", cold=True, headers=_idempotent(headers, "close"))
+
+    _assert_within_budget(statements, "POST /api/sessions/{session_id}/close")
+
+
+def test_close_credit(client, headers, statements):
+    _, session_id = _closed_session_with_credit(client, headers)
+    _send(
+        client, "POST", "/api/admin/close-credit", cold=True,
+        json={"session_id": session_id, "seat_no": 3, "amount": 100}, headers=headers,
+    )
+    _send(
+        client, "POST", "/api/admin/close-credit",
+        json={"session_id": session_id, "seat_no": 3, "amount": 200}, headers=headers,
+    )
+
+    _assert_within_budget(statements, "POST /api/admin/close-credit")
+
+
+def test_closed_sessions(client, headers, statements):
+    table_id, _ = _closed_session_with_credit(client, headers)
+    # Lists the credit still owed
+    _send(client, "GET", "/api/admin/closed-sessions", cold=True, params={"table_id": table_id}, headers=headers)
+
+    _assert_within_budget(statements, "GET /api/admin/closed-sessions")
+
+
+def test_chip_purchases(client, headers, statements):
+    _, session_id = _open_session(client, headers)
+    _buy(client, headers, session_id, 1, 300)
+    _buy(client, headers, session_id, 2, 300, "credit")
+    _send(client, "GET", "/api/admin/chip-purchases", cold=True, params={"session_id": session_id}, headers=headers)
+
+    _assert_within_budget(statements, "GET /api/admin/chip-purchases")
+
+
+def test_balance_adjustments(client, headers, statements):
+    _, session_id = _closed_session_with_credit(client, headers)
+    _send(
+        client, "POST", "/api/admin/close-credit",
+        json={"session_id": session_id, "seat_no": 3, "amount": 300}, headers=headers,
+    )
+    _send(client, "GET", "/api/admin/balance-adjustments", cold=True, headers=headers)
+
+    _assert_within_budget(statements, "GET /api/admin/balance-adjustments")
+
+
+def test_open_debts(client, headers, statements):
+    _closed_session_with_credit(client, headers)
+    _send(client, "GET", "/api/admin/credit/open-debts", cold=True, headers=headers)
+
+    _assert_within_budget(statements, "GET /api/admin/credit/open-debts")
+
+
+def test_credit_ledger(client, headers, statements):
+    _, session_id = _closed_session_with_credit(client, headers)
+    _send(client, "GET", "/api/admin/credit/ledger", cold=True, params={"session_id": session_id}, headers=headers)
+
+    _assert_within_budget(statements, "GET /api/admin/credit/ledger")
+
+
+def test_day_summary(client, headers, statements):
+    _closed_session_with_credit(client, headers, day=REPORT_DAY)
+    _send(client, "GET", "/api/admin/day-summary", cold=True, params={"date": REPORT_DAY.isoformat()}, headers=headers)
+
+    _assert_within_budget(statements, "GET /api/admin/day-summary")
+
+
+def test_export_report(client, headers, statements):
+    _closed_session_with_credit(client, headers, day=REPORT_DAY)
+    # Report cache miss (the day changed since the last report), then a hit
+    _send(client, "GET", "/api/admin/export-report", cold=True, params={"date": REPORT_DAY.isoformat()}, headers=headers)
+    _send(client, "GET", "/api/admin/export-report", params={"date": REPORT_DAY.isoformat()}, headers=headers)
+
+    _assert_within_budget(statements, "GET /api/admin/export-report")
+
+
+def test_every_budget_has_a_test():
+    tested = {
+        name[len("test_"):] for name in globals() if name.startswith("test_") and name != "test_every_budget_has_a_test"
+    }
+    assert len(tested) == len(sql_debug.SQL_STATEMENT_BUDGETS)
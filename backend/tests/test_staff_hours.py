@@ -0,0 +1,106 @@
+import datetime as dt
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.staff_hours_service import StaffHoursService
+
+DAY = dt.date(2026, 3, 1)
+NOW = dt.datetime(2026, 3, 2, 6, 0)
+WINDOW = (dt.datetime(2026, 3, 1, 20, 0), dt.datetime(2026, 3, 2, 18, 0))
+
+
+def at(hour: int, minute: int = 0, day: int = 0) -> dt.datetime:
+    """Time on the working day starting on DAY: hours before 20 fall on the next calendar day."""
+    date = DAY + dt.timedelta(days=day + (0 if hour >= 20 else 1))
+    return dt.datetime.combine(date, dt.time(hour, minute))
+
+
+def session(start, end, dealer_id=None, waiter_id=None):
+    return SimpleNamespace(created_at=start, closed_at=end, dealer_id=dealer_id, waiter_id=waiter_id)
+
+
+def test_dealer_durations_are_summed():
+    hours = StaffHoursService.calculate([
+        session(at(20), at(23), dealer_id=1),
+        session(at(23, 30), at(2), dealer_id=1),
+        session(at(21), at(22), dealer_id=2),
+    ], now=NOW)
+
+    assert hours.hours(1, "dealer") == pytest.approx(5.5)
+    assert hours.hours(2, "dealer") == pytest.approx(1.0)
+    assert hours.hours(3, "dealer") == 0.0
+
+
+def test_overlapping_waiter_intervals_are_merged():
+    hours = StaffHoursService.calculate([
+        session(at(20), at(23), waiter_id=7),
+        session(at(22), at(1), waiter_id=7),  # Overlaps the first
+        session(at(21), at(22), waiter_id=7),  # Inside the first
+        session(at(1), at(2), waiter_id=7),  # Touches the merged end
+        session(at(4), at(5), waiter_id=7),  # Disjoint
+    ], now=NOW)
+
+    # 20:00-02:00 and 04:00-05:00
+    assert hours.hours(7, "waiter") == pytest.approx(7.0)
+
+
+def test_waiter_and_dealer_of_one_session_are_counted_separately():
+    hours = StaffHoursService.calculate([
+        session(at(20), at(22), dealer_id=1, waiter_id=1),
+        session(at(21), at(23), dealer_id=2, waiter_id=1),
+    ], now=NOW)
+
+    assert hours.hours(1, "dealer") == pytest.approx(2.0)
+    assert hours.hours(2, "dealer") == pytest.approx(2.0)
+    assert hours.hours(1, "waiter") == pytest.approx(3.0)
+
+
+def test_intervals_are_clipped_to_the_window():
+    hours = StaffHoursService.calculate([
+        session(at(18, day=-1), at(22), dealer_id=1, waiter_id=5),  # Starts before the window
+        session(at(17), at(19), dealer_id=2, waiter_id=5),  # Ends after it
+        session(at(18, day=-1), at(19, day=-1), dealer_id=3, waiter_id=6),  # Entirely before
+    ], window=WINDOW, now=NOW)
+
+    assert hours.hours(1, "dealer") == pytest.approx(2.0)
+    assert hours.hours(2, "dealer") == pytest.approx(1.0)
+    assert hours.hours(5, "waiter") == pytest.approx(3.0)
+    assert hours.hours(3, "dealer") == 0.0
+    assert hours.hours(6, "waiter") == 0.0
+
+
+def test_open_sessions_count_up_to_now():
+    hours = StaffHoursService.calculate([
+        session(at(2), None, dealer_id=1, waiter_id=2),
+        session(at(5), at(7), dealer_id=3),  # Closed sessions keep their end past `now`
+    ], now=NOW)
+
+    assert hours.hours(1, "dealer") == pytest.approx(4.0)
+    assert hours.hours(2, "waiter") == pytest.approx(4.0)
+    assert hours.hours(3, "dealer") == pytest.approx(2.0)
+
+
+def test_open_session_started_after_now_counts_nothing():
+    hours = StaffHoursService.calculate([session(at(7), None, dealer_id=1, waiter_id=2)], now=NOW)
+
+    assert hours.hours(1, "dealer") == 0.0
+    assert hours.hours(2, "waiter") == 0.0
+
+
+def test_now_and_window_combine_for_open_sessions():
+    # Open session of a finished day: the window end cuts it, not `now`
+    hours = StaffHoursService.calculate(
+        [session(at(16), None, dealer_id=1)],
+        window=WINDOW,
+        now=WINDOW[1] + dt.timedelta(days=3),
+    )
+
+    assert hours.hours(1, "dealer") == pytest.approx(2.0)
+
+
+def test_sessions_without_staff_are_ignored():
+    hours = StaffHoursService.calculate([session(at(20), at(23))], now=NOW)
+
+    assert hours.dealers == {}
+    assert hours.waiters == {}